@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Packer Scaling Benchmark
+
+Times create_zip_from_dir() for a range of --jobs values and checks that every
+run produces byte-identical archives.
+
+Usage:
+    python benchmarks/bench_pack_jobs.py [--source pack] [--jobs 1 2 4] [--repeat 3]
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "utils"))
+
+from pack_resourcespack import create_zip_from_dir  # noqa: E402
+
+
+def default_jobs():
+    cpus = os.cpu_count() or 1
+    jobs = [1]
+    while jobs[-1] * 2 <= cpus:
+        jobs.append(jobs[-1] * 2)
+    if jobs[-1] != cpus:
+        jobs.append(cpus)
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark packer scaling.")
+    parser.add_argument("--source", "-s", default=str(ROOT / "pack"))
+    parser.add_argument("--jobs", "-j", type=int, nargs="+", default=default_jobs())
+    parser.add_argument("--repeat", "-n", type=int, default=3)
+    args = parser.parse_args()
+
+    source = Path(args.source).resolve()
+    logger = logging.getLogger("bench_pack_jobs")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    print(f"Source: {source} (CPUs: {os.cpu_count()})")
+    print(f"{'jobs':>6} {'best s':>10} {'mean s':>10} {'speedup':>8}")
+    baseline = None
+    digests = set()
+    with tempfile.TemporaryDirectory() as tmp:
+        for jobs in args.jobs:
+            times = []
+            for i in range(args.repeat):
+                out = Path(tmp) / f"bench_{jobs}_{i}.zip"
+                start = time.perf_counter()
+                create_zip_from_dir(source, out, logger, jobs=jobs)
+                times.append(time.perf_counter() - start)
+                digests.add(hashlib.sha256(out.read_bytes()).hexdigest())
+                out.unlink()
+            best = min(times)
+            baseline = baseline or best
+            print(
+                f"{jobs:>6} {best:>10.3f} {sum(times) / len(times):>10.3f} "
+                f"{baseline / best:>7.2f}x"
+            )
+    if len(digests) != 1:
+        print("ERROR: archives differ between runs", file=sys.stderr)
+        sys.exit(1)
+    print("All archives byte-identical.")
+
+
+if __name__ == "__main__":
+    main()
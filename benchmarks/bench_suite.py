@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+End-to-End Benchmark Suite
+
+Runs the packer and the extractor on synthetic inputs (see synthetic.py) and
+records wall time, CPU time, bytes written and peak memory per case:
+
+- pack_api:     create_zip_from_dir() on a pack at each --scale
+- pack_cli:     pack_resourcespack.py --non-interactive on the same packs
+- extract_api:  ModAssetsExtractor.run() on a generated modpack
+- extract_cli:  extract_assets_from_mod.py -i ... -o ... on the same modpack
+
+API cases run in a fresh process per repetition and CLI cases are measured
+from the outside like a user would run them. Inputs are generated in a
+separate process too: on Linux a child's peak RSS starts at that of the
+process that started it, so the runner itself must stay small. Everything
+is generated locally and runs offline. Results go to a JSON file that
+--compare reads back to print the change against an earlier run.
+
+Usage:
+    python benchmarks/bench_suite.py [--scale 1 10] [--mods 50] [--repeat 3]
+        [--cases pack_api extract_cli ...] [--data DIR] [--results FILE]
+        [--compare OLD.json]
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "utils"))
+
+from metrics import peak_rss_mb  # noqa: E402
+from synthetic import ensure_modpack, ensure_pack  # noqa: E402
+
+RESULTS_VERSION = 1
+CASES = ("pack_api", "pack_cli", "extract_api", "extract_cli")
+PACKER = ROOT / "utils" / "pack_resourcespack.py"
+EXTRACTOR = ROOT / "utils" / "extract_assets_from_mod.py"
+
+
+def output_size(path: Path):
+    """(files, bytes) under ``path``, a file or a directory tree."""
+    if path.is_file():
+        return 1, path.stat().st_size
+    files = size = 0
+    for dirpath, _, names in os.walk(path):
+        for name in names:
+            files += 1
+            size += os.lstat(os.path.join(dirpath, name)).st_size
+    return files, size
+
+
+def _api_case(case: str, source: str, output: str, jobs: int) -> dict:
+    """Run one API case; executes in a fresh worker process."""
+    start = time.perf_counter()
+    cpu = os.times()
+    if case == "pack_api":
+        from pack_resourcespack import create_zip_from_dir
+
+        logger = logging.getLogger("bench_suite")
+        logger.addHandler(logging.NullHandler())
+        logger.propagate = False
+        create_zip_from_dir(Path(source), Path(output), logger, jobs=jobs)
+    else:
+        from extract_assets_from_mod import ModAssetsExtractor
+
+        # The extractor reports progress on stdout.
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                extractor = ModAssetsExtractor(jobs=jobs)
+                extractor.run(Path(source), Path(output), batch=True)
+            finally:
+                sys.stdout = stdout
+    elapsed = time.perf_counter() - start
+    end = os.times()
+    return {
+        "wall_s": elapsed,
+        "cpu_s": (end.user - cpu.user) + (end.system - cpu.system),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def in_fresh_process(fn, *args):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def run_cli(command: list) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL
+    )
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        cpu = usage.ru_utime + usage.ru_stime
+        rss = round(
+            usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1024), 1
+        )
+    else:
+        proc.wait()
+        elapsed = time.perf_counter() - start
+        cpu = rss = None
+    if proc.returncode:
+        raise RuntimeError(f"exit status {proc.returncode}: {' '.join(command)}")
+    return {"wall_s": elapsed, "cpu_s": cpu, "peak_rss_mb": rss}
+
+
+def run_case(case: str, source: Path, work: Path, jobs: int) -> dict:
+    if case.startswith("pack"):
+        output = work / "out.zip"
+    else:
+        output = work / "out"
+    if output.is_dir():
+        shutil.rmtree(output)
+    elif output.exists():
+        output.unlink()
+
+    if case.endswith("_api"):
+        run = in_fresh_process(_api_case, case, str(source), str(output), jobs)
+    elif case == "pack_cli":
+        run = run_cli(
+            [
+                sys.executable,
+                str(PACKER),
+                "--non-interactive",
+                "-s",
+                str(source),
+                "-o",
+                str(output),
+                "--license",
+                str(source.parent / "LICENSE"),
+                "--no-validate",
+                "--no-cache",
+                "-j",
+                str(jobs),
+            ]
+        )
+    else:
+        run = run_cli(
+            [
+                sys.executable,
+                str(EXTRACTOR),
+                "-i",
+                str(source),
+                "-o",
+                str(output),
+                "-j",
+                str(jobs),
+            ]
+        )
+    run["files"], run["bytes_written"] = output_size(output)
+    return run
+
+
+def summarize(case: str, label: str, jobs: int, runs: list) -> dict:
+    walls = [r["wall_s"] for r in runs]
+    cpus = [r["cpu_s"] for r in runs if r["cpu_s"] is not None]
+    rss = [r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None]
+    return {
+        "case": case,
+        "input": label,
+        "jobs": jobs,
+        "runs": len(runs),
+        "wall_best_s": round(min(walls), 4),
+        "wall_mean_s": round(sum(walls) / len(walls), 4),
+        "cpu_best_s": round(min(cpus), 4) if cpus else None,
+        "peak_rss_mb": max(rss) if rss else None,
+        "files": runs[-1]["files"],
+        "bytes_written": runs[-1]["bytes_written"],
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "zlib": zlib.ZLIB_RUNTIME_VERSION,
+        "commit": commit,
+    }
+
+
+def print_row(result: dict) -> None:
+    cpu = result["cpu_best_s"]
+    rss = result["peak_rss_mb"]
+    print(
+        f"{result['case']:<12} {result['input']:<12} {result['jobs']:>4} "
+        f"{result['wall_best_s']:>9.3f} {result['wall_mean_s']:>9.3f} "
+        f"{cpu if cpu is not None else float('nan'):>9.3f} "
+        f"{result['bytes_written'] / 1048576:>10.1f} "
+        f"{rss if rss is not None else float('nan'):>9.1f}"
+    )
+
+
+def compare(old_path: Path, results: list) -> None:
+    old = json.loads(old_path.read_text(encoding="utf-8"))
+    previous = {(r["case"], r["input"], r["jobs"]): r for r in old["results"]}
+    print(f"\nCompared with {old_path} (commit {old['environment'].get('commit')}):")
+    print(f"{'case':<12} {'input':<12} {'jobs':>4} {'wall':>9} {'cpu':>9} {'rss':>9}")
+
+    def delta(new, before):
+        if new is None or not before:
+            return "n/a"
+        return f"{(new - before) / before * 100:+.1f}%"
+
+    for result in results:
+        before = previous.get((result["case"], result["input"], result["jobs"]))
+        if before is None:
+            continue
+        print(
+            f"{result['case']:<12} {result['input']:<12} {result['jobs']:>4} "
+            f"{delta(result['wall_best_s'], before['wall_best_s']):>9} "
+            f"{delta(result['cpu_best_s'], before['cpu_best_s']):>9} "
+            f"{delta(result['peak_rss_mb'], before['peak_rss_mb']):>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmarks.")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        nargs="+",
+        default=[1, 10],
+        help="Pack sizes as multiples of pack/ (default: 1 10; 100 is ~1 GB)",
+    )
+    parser.add_argument(
+        "--mods", type=int, default=50, help="Mod JARs to generate (default: 50)"
+    )
+    parser.add_argument("--jobs", "-j", type=int, nargs="+", default=[1])
+    parser.add_argument("--repeat", "-n", type=int, default=3)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--data",
+        help="Keep generated inputs in DIR and reuse them on later runs "
+        "(default: a temporary directory)",
+    )
+    parser.add_argument(
+        "--results",
+        default="bench_results.json",
+        help="Write results to FILE (default: bench_results.json)",
+    )
+    parser.add_argument("--compare", metavar="OLD", help="Compare with earlier results")
+    args = parser.parse_args()
+
+    tmp = None
+    if args.data:
+        data = Path(args.data).resolve()
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="bench_suite_")
+        data = Path(tmp.name)
+
+    try:
+        inputs = []
+        if any(case.startswith("pack") for case in args.cases):
+            for scale in args.scale:
+                start = time.perf_counter()
+                source = in_fresh_process(
+                    ensure_pack, data / f"pack-{scale}x", scale, args.seed
+                )
+                print(
+                    f"Input pack-{scale}x ready in {time.perf_counter() - start:.1f}s"
+                )
+                inputs.append(("pack", f"pack-{scale}x", source))
+        if any(case.startswith("extract") for case in args.cases):
+            start = time.perf_counter()
+            label = f"mods-{args.mods}"
+            source = in_fresh_process(
+                ensure_modpack, data / label, args.mods, args.seed
+            )
+            print(f"Input {label} ready in {time.perf_counter() - start:.1f}s")
+            inputs.append(("extract", label, source))
+
+        print(
+            f"\n{'case':<12} {'input':<12} {'jobs':>4} {'best s':>9} {'mean s':>9} "
+            f"{'cpu s':>9} {'written MB':>10} {'peak MB':>9}"
+        )
+        results = []
+        with tempfile.TemporaryDirectory(prefix="bench_out_") as out:
+            for case in args.cases:
+                for kind, label, source in inputs:
+                    if not case.startswith(kind):
+                        continue
+                    for jobs in args.jobs:
+                        runs = [
+                            run_case(case, source, Path(out), jobs)
+                            for _ in range(args.repeat)
+                        ]
+                        results.append(summarize(case, label, jobs, runs))
+                        print_row(results[-1])
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": environment(),
+        "settings": {
+            "scales": args.scale,
+            "mods": args.mods,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    results_path = Path(args.results)
+    results_path.write_text(json.dumps(report, indent=1) + "\n", encoding="utf-8")
+    print(f"\nResults written to {results_path}")
+    if args.compare:
+        compare(Path(args.compare), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Synthetic Benchmark Inputs
+
+Deterministic generators for the benchmark suite, so runs on different
+machines (and offline CI) measure the same work:
+
+- ``generate_pack``: a resource pack shaped like pack/assets (the same mix of
+  large GUI sheets, sprites, .mcmeta, lang and font files), repeated
+  ``scale`` times under distinct namespaces.
+- ``generate_modpack``: a folder of mod JARs with realistic asset counts,
+  class files, sounds and nested META-INF/jars/ libraries, some of them
+  bundled by several mods (like Fabric API modules).
+
+Images are panels of flat color with noisy detail, so PNGs and deflate
+behave roughly like real textures. Every file depends only on the seed, and
+``ensure_*`` reuses a previously generated tree with the same parameters.
+"""
+
+import io
+import json
+import random
+import shutil
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+from typing import List, Tuple
+
+GENERATOR_VERSION = 1
+STAMP_NAME = ".synthetic.json"
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# (width, height, count) of the PNGs in pack/assets, i.e. the 1x shape.
+PACK_TEXTURES = [
+    (1024, 1024, 40),
+    (1024, 512, 1),
+    (768, 512, 1),
+    (512, 512, 1),
+    (584, 304, 1),
+    (640, 128, 1),
+    (256, 256, 2),
+    (124, 170, 2),
+    (128, 128, 3),
+    (318, 48, 5),
+    (256, 64, 2),
+    (96, 72, 2),
+    (80, 80, 18),
+    (64, 64, 7),
+    (60, 97, 4),
+    (48, 48, 6),
+    (32, 32, 2),
+    (19, 19, 6),
+    (8, 8, 5),
+]
+PACK_NAMESPACES = 24
+
+
+def _chunk(ctype: bytes, body: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(body))
+        + ctype
+        + body
+        + struct.pack(">I", zlib.crc32(ctype + body))
+    )
+
+
+def make_png(rng: random.Random, width: int, height: int) -> bytes:
+    """A GUI-like RGBA PNG: a transparent canvas with colored panels."""
+    stride = width * 4
+    rows = [bytearray(stride) for _ in range(height)]
+    for _ in range(rng.randint(2, 6)):
+        x0 = rng.randrange(width)
+        y0 = rng.randrange(height)
+        x1 = rng.randint(x0 + 1, width)
+        y1 = rng.randint(y0 + 1, height)
+        color = bytes(rng.randrange(256) for _ in range(3)) + b"\xff"
+        span = color * (x1 - x0)
+        for y in range(y0, y1):
+            rows[y][x0 * 4 : x1 * 4] = span
+    # Shading and detail: noise over part of a fifth of the rows.
+    for y in rng.sample(range(height), max(1, height // 5)):
+        x0 = rng.randrange(width)
+        x1 = rng.randint(x0 + 1, width)
+        noise = bytearray(rng.randbytes((x1 - x0) * 4))
+        noise[3::4] = b"\xff" * (x1 - x0)
+        rows[y][x0 * 4 : x1 * 4] = noise
+    raw = b"".join(b"\0" + bytes(row) for row in rows)
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return b"".join(
+        [
+            b"\x89PNG\r\n\x1a\n",
+            _chunk(b"IHDR", ihdr),
+            _chunk(b"IDAT", zlib.compress(raw, 6)),
+            _chunk(b"IEND", b""),
+        ]
+    )
+
+
+def _lang(rng: random.Random, namespace: str, keys: int) -> bytes:
+    entries = {
+        f"gui.{namespace}.{i}": " ".join(
+            rng.choice(("Storage", "Terminal", "Craft", "Search", "Sort", "Slot"))
+            for _ in range(rng.randint(1, 4))
+        )
+        for i in range(keys)
+    }
+    return json.dumps(entries, indent=2).encode()
+
+
+def _animation(frames: int) -> bytes:
+    animation = {"animation": {"frametime": 2, "frames": list(range(frames))}}
+    return json.dumps(animation).encode()
+
+
+def _stamp_matches(dest: Path, params: dict) -> bool:
+    try:
+        return json.loads((dest / STAMP_NAME).read_text(encoding="utf-8")) == params
+    except (OSError, ValueError):
+        return False
+
+
+def _write_stamp(dest: Path, params: dict) -> None:
+    (dest / STAMP_NAME).write_text(json.dumps(params), encoding="utf-8")
+
+
+def generate_pack(dest: Path, scale: int = 1, seed: int = 0) -> Tuple[int, int]:
+    """Write a pack/ tree ``scale`` times the size of the real one.
+
+    Returns (files, bytes). A LICENSE is written next to ``dest`` as the
+    packer expects.
+    """
+    rng = random.Random(f"pack:{seed}")
+    if dest.exists():
+        shutil.rmtree(dest)
+    files = size = 0
+
+    def write(rel: str, data: bytes) -> None:
+        nonlocal files, size
+        path = dest / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        files += 1
+        size += len(data)
+
+    write(
+        "pack.mcmeta",
+        json.dumps({"pack": {"pack_format": 34, "description": "bench"}}).encode(),
+    )
+    write("pack.png", make_png(rng, 128, 128))
+    for copy in range(scale):
+        namespaces = [f"mod{copy}_{i}" for i in range(PACK_NAMESPACES)]
+        index = 0
+        for width, height, count in PACK_TEXTURES:
+            for _ in range(count):
+                ns = namespaces[index % len(namespaces)]
+                folder = "sprites/widget" if width <= 80 else "container"
+                rel = f"assets/{ns}/textures/gui/{folder}/t{index}.png"
+                frames = 4 if width <= 32 and index % 3 == 0 else 1
+                write(rel, make_png(rng, width, height * frames))
+                if frames > 1:
+                    write(rel + ".mcmeta", _animation(frames))
+                index += 1
+        for ns in namespaces[:2]:
+            write(f"assets/{ns}/lang/en_us.json", _lang(rng, ns, 40))
+            write(f"assets/{ns}/lang/zh_cn.json", _lang(rng, ns, 40))
+        font = {"providers": [{"type": "bitmap", "file": "x.png", "chars": ["a"]}]}
+        write(f"assets/{namespaces[0]}/font/default.json", json.dumps(font).encode())
+        write(
+            f"assets/{namespaces[0]}/optifine/color.properties",
+            b"screen.loading=1b1b1b\n",
+        )
+    license_path = dest.parent / "LICENSE"
+    license_path.write_text("Synthetic benchmark input.\n", encoding="utf-8")
+    return files, size
+
+
+def _mod_entries(
+    rng: random.Random, modid: str, assets: int
+) -> List[Tuple[str, bytes]]:
+    """Files of one mod: assets, class files and metadata."""
+    entries = [
+        (
+            "fabric.mod.json",
+            json.dumps({"schemaVersion": 1, "id": modid, "version": "1.0"}).encode(),
+        ),
+        ("META-INF/MANIFEST.MF", b"Manifest-Version: 1.0\r\n\r\n"),
+        (f"assets/{modid}/lang/en_us.json", _lang(rng, modid, max(5, assets // 10))),
+    ]
+    for i in range(assets):
+        kind = rng.random()
+        if kind < 0.55:
+            side = rng.choice((16, 16, 16, 32))
+            entries.append(
+                (f"assets/{modid}/textures/item/i{i}.png", make_png(rng, side, side))
+            )
+        elif kind < 0.6:
+            side = rng.choice((176, 256))
+            entries.append(
+                (f"assets/{modid}/textures/gui/g{i}.png", make_png(rng, side, side))
+            )
+        elif kind < 0.9:
+            model = {
+                "parent": "item/generated",
+                "textures": {"layer0": f"{modid}:item/i{i}"},
+            }
+            entries.append(
+                (f"assets/{modid}/models/item/m{i}.json", json.dumps(model).encode())
+            )
+        elif kind < 0.97:
+            state = {"variants": {"": {"model": f"{modid}:block/b{i}"}}}
+            entries.append(
+                (
+                    f"assets/{modid}/blockstates/b{i}.json",
+                    json.dumps(state).encode(),
+                )
+            )
+        else:
+            # Sounds are already compressed: incompressible bytes.
+            entries.append(
+                (
+                    f"assets/{modid}/sounds/s{i}.ogg",
+                    rng.randbytes(rng.randint(8, 64) << 10),
+                )
+            )
+    for i in range(int(assets * 0.8)):
+        # Bytecode deflates to roughly half: mix random and repeated bytes.
+        body = rng.randbytes(rng.randint(256, 4096))
+        entries.append(
+            (f"com/example/{modid}/C{i}.class", body + body[: len(body) // 2])
+        )
+    return entries
+
+
+def _jar_bytes(entries: List[Tuple[str, bytes]]) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in entries:
+            info = zipfile.ZipInfo(name, ZIP_DATE_TIME)
+            # Nested JARs are stored, as Loom and Gradle do.
+            info.compress_type = (
+                zipfile.ZIP_STORED if name.endswith(".jar") else zipfile.ZIP_DEFLATED
+            )
+            zf.writestr(info, data)
+    return buf.getvalue()
+
+
+def generate_modpack(
+    dest: Path, mods: int = 50, seed: int = 0, median_assets: int = 250
+) -> Tuple[int, int]:
+    """Write ``mods`` fake mod JARs into ``dest``; returns (jars, bytes).
+
+    Asset counts are log-normal around ``median_assets`` (a few mods ship
+    thousands). About a third of the mods bundle libraries in META-INF/jars/;
+    libraries come from a shared pool, so identical nested JARs recur, and
+    some libraries nest another JAR themselves.
+    """
+    rng = random.Random(f"modpack:{seed}")
+    if dest.exists():
+        shutil.rmtree(dest)
+    dest.mkdir(parents=True)
+
+    libraries = []
+    for i in range(max(4, mods // 5)):
+        lib_id = f"lib{i}"
+        entries = _mod_entries(rng, lib_id, rng.randint(0, 40))
+        if i % 4 == 3:
+            inner = _jar_bytes(_mod_entries(rng, f"{lib_id}_inner", 5))
+            entries.append((f"META-INF/jars/{lib_id}_inner.jar", inner))
+        libraries.append((f"META-INF/jars/{lib_id}-1.0.jar", _jar_bytes(entries)))
+
+    total = 0
+    for i in range(mods):
+        modid = f"mod{i}"
+        assets = min(5000, max(10, int(rng.lognormvariate(0, 1) * median_assets)))
+        entries = _mod_entries(rng, modid, assets)
+        if rng.random() < 0.35:
+            entries.extend(rng.sample(libraries, rng.randint(1, 4)))
+        data = _jar_bytes(entries)
+        (dest / f"{modid}-1.0.jar").write_bytes(data)
+        total += len(data)
+    return mods, total
+
+
+def ensure_pack(root: Path, scale: int, seed: int = 0) -> Path:
+    """Return ``root``/pack, generating it unless it already matches."""
+    params = {"kind": "pack", "scale": scale, "seed": seed, "v": GENERATOR_VERSION}
+    if not _stamp_matches(root, params):
+        root.mkdir(parents=True, exist_ok=True)
+        generate_pack(root / "pack", scale, seed)
+        _write_stamp(root, params)
+    return root / "pack"
+
+
+def ensure_modpack(root: Path, mods: int, seed: int = 0) -> Path:
+    """Return ``root``/mods, generating it unless it already matches."""
+    params = {"kind": "modpack", "mods": mods, "seed": seed, "v": GENERATOR_VERSION}
+    if not _stamp_matches(root, params):
+        root.mkdir(parents=True, exist_ok=True)
+        generate_modpack(root / "mods", mods, seed)
+        _write_stamp(root, params)
+    return root / "mods"
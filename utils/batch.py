@@ -0,0 +1,199 @@
+"""
+Batch Runner
+
+Runs many packs and extractions listed in one job file in a single process,
+so they share worker pools and build caches and pay for startup once:
+
+    python utils/pack_resourcespack.py --jobs-file jobs.json
+
+A job file (JSON, or YAML when PyYAML is installed) looks like:
+
+    {
+      "workers": 4,
+      "jobs": [
+        {"type": "pack", "source": "pack", "output": "dist/pack.zip",
+         "variants": ["full", "no-panorama"], "reproducible": true},
+        {"type": "pack", "source": "pack", "output": "dist/release.zip",
+         "max_compression": true},
+        {"type": "extract", "input_dir": "mods", "output": "extracted_assets",
+         "include": ["assets/*/textures/gui/**"]}
+      ]
+    }
+
+The other keys of a job are the keyword arguments of pack() or extract();
+relative paths are relative to the job file. ``workers`` sizes the shared
+thread pool (default: one per CPU) and ``name`` labels a job in the log.
+A failed job is reported and the remaining jobs still run.
+"""
+
+import inspect
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from extract_assets_from_mod import extract
+from metrics import Metrics
+from pack_resourcespack import PackError, pack, setup_logger
+
+RUNNERS = {"pack": pack, "extract": extract}
+# Arguments resolved against the job file's directory.
+PATH_ARGS = {"source", "output", "license", "input_dir", "log_file"}
+# Arguments the runner provides itself.
+RESERVED_ARGS = {"jobs", "logger", "metrics", "executor", "process_pool", "caches"}
+
+
+class JobFileError(ValueError):
+    """The job file cannot be read or lists an invalid job."""
+
+
+def setup_logging() -> logging.Logger:
+    logger = logging.getLogger("BatchRunner")
+    logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+    return logger
+
+
+def _parse(path: Path) -> dict:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise JobFileError(
+                f"{path}: install PyYAML to read YAML job files, or use JSON"
+            ) from None
+        try:
+            return yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise JobFileError(f"{path}: {e}") from None
+    try:
+        return json.loads(text)
+    except ValueError as e:
+        raise JobFileError(f"{path}: {e}") from None
+
+
+def load_job_file(path) -> dict:
+    """Read and check a job file; returns {"workers": n, "jobs": [...]}.
+
+    Each job becomes {"type", "name", "args"} with paths made absolute.
+    """
+    path = Path(path).expanduser().resolve()
+    try:
+        data = _parse(path)
+    except OSError as e:
+        raise JobFileError(f"Cannot read job file: {e}") from None
+    if not isinstance(data, dict) or not isinstance(data.get("jobs"), list):
+        raise JobFileError(f"{path}: expected an object with a 'jobs' list")
+    workers = data.get("workers", 0)
+    if not isinstance(workers, int) or workers < 0:
+        raise JobFileError(f"{path}: 'workers' must be a non-negative integer")
+
+    jobs = []
+    for index, raw in enumerate(data["jobs"], 1):
+        if not isinstance(raw, dict):
+            raise JobFileError(f"{path}: job {index} is not an object")
+        args = dict(raw)
+        kind = args.pop("type", None)
+        if kind not in RUNNERS:
+            raise JobFileError(
+                f"{path}: job {index} needs a 'type' of {' or '.join(RUNNERS)}"
+            )
+        name = str(args.pop("name", f"{kind} #{index}"))
+        allowed = set(inspect.signature(RUNNERS[kind]).parameters) - RESERVED_ARGS
+        unknown = sorted(set(args) - allowed)
+        if unknown:
+            raise JobFileError(
+                f"{path}: unknown key(s) in job '{name}': {', '.join(unknown)}"
+            )
+        for key in PATH_ARGS.intersection(args):
+            if args[key]:
+                args[key] = path.parent / Path(str(args[key])).expanduser()
+        jobs.append({"type": kind, "name": name, "args": args})
+    return {"workers": workers or os.cpu_count() or 1, "jobs": jobs}
+
+
+def run_job_file(path, metrics: Optional[Metrics] = None) -> bool:
+    """Run every job of a job file in order; True if all of them succeeded.
+
+    All jobs share one thread pool, one process pool for PNG optimization and
+    the build caches, so a cache directory is loaded once however many packs
+    write next to it. Each job is recorded as a "job" item in ``metrics``.
+    """
+    logger = setup_logging()
+    try:
+        spec = load_job_file(path)
+    except JobFileError as e:
+        logger.error(f"[ERROR] {e}")
+        return False
+    workers = spec["workers"]
+    jobs = spec["jobs"]
+    pack_logger = setup_logger()
+    caches = {}
+    failed: List[str] = []
+    start = time.perf_counter()
+    logger.info(f"[INFO] Running {len(jobs)} job(s) on {workers} worker(s)")
+
+    threads = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    # Worker processes start on first use, so packs without PNG
+    # optimization never spawn any.
+    processes = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for index, job in enumerate(jobs, 1):
+            name = job["name"]
+            logger.info(f"\n[INFO] Job {index}/{len(jobs)}: {name}")
+            job_start = time.perf_counter()
+            try:
+                if job["type"] == "pack":
+                    result = pack(
+                        **job["args"],
+                        jobs=workers,
+                        logger=pack_logger,
+                        executor=threads,
+                        process_pool=processes,
+                        caches=caches,
+                    )
+                    ok = True
+                    detail = ", ".join(
+                        f"{variant}: {result.counts[variant]} files"
+                        + ("" if variant in result.rebuilt else " (up to date)")
+                        for variant in result.outputs
+                    )
+                else:
+                    result = extract(**job["args"], jobs=workers, executor=threads)
+                    ok = result.ok
+                    detail = (
+                        f"{len(result.succeeded)} JAR(s), {result.files} file(s), "
+                        f"{len(result.failed)} failed"
+                    )
+            except (PackError, OSError, TypeError, ValueError) as e:
+                ok = False
+                detail = str(e)
+            seconds = time.perf_counter() - job_start
+            if metrics is not None:
+                metrics.item("job", name, seconds, type=job["type"], ok=ok)
+            if ok:
+                logger.info(f"[INFO] Job '{name}' done in {seconds:.2f}s: {detail}")
+            else:
+                failed.append(name)
+                logger.error(f"[ERROR] Job '{name}' failed: {detail}")
+    finally:
+        for pool in (threads, processes):
+            if pool is not None:
+                pool.shutdown()
+
+    logger.info(
+        f"\n[INFO] {len(jobs) - len(failed)}/{len(jobs)} job(s) succeeded "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    if failed:
+        logger.error(f"[ERROR] Failed: {', '.join(failed)}")
+    return not failed
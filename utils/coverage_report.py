@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Override Coverage Report
+
+Compares the assets shipped by mod JARs with the overrides under
+pack/assets and reports, per namespace:
+
+    missing   mod textures the pack does not override yet
+    stale     overrides whose upstream file changed since they were last edited
+    orphaned  textures in scope that no indexed mod ships any more (a
+              .png.mcmeta only when its texture is gone as well)
+
+Mod JARs are indexed from their ZIP central directories (the same data as
+``extract_assets_from_mod.py --list``) into an SQLite database. Later runs
+only re-read JARs and pack files whose size or modification time changed.
+
+Expected project structure:
+.
+├── pack/
+└── utils/
+    ├── coverage_report.py
+    └── extract_assets_from_mod.py
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from extract_assets_from_mod import ModAssetsExtractor
+
+SCHEMA_VERSION = 1
+DEFAULT_SCOPE = "textures/gui/*"
+DEFAULT_SKIP_NAMESPACES = ("minecraft",)
+TEXTURE_GLOB = "*.png"
+SIDECAR_SUFFIX = ".mcmeta"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS jars (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mod_assets (
+    jar_id INTEGER NOT NULL REFERENCES jars(id) ON DELETE CASCADE,
+    archive TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    crc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mod_assets_key ON mod_assets (namespace, path);
+CREATE INDEX IF NOT EXISTS mod_assets_jar ON mod_assets (jar_id);
+CREATE TABLE IF NOT EXISTS pack_files (
+    namespace TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    baseline_crc TEXT,
+    PRIMARY KEY (namespace, path)
+);
+"""
+
+# Upstream CRC an override is compared against later; several mods may ship
+# the same path, so pick one deterministically.
+_UPSTREAM_CRC = """
+(SELECT min(m.crc) FROM mod_assets m
+ WHERE m.namespace = pack_files.namespace AND m.path = pack_files.path)
+"""
+
+
+def setup_logging() -> logging.Logger:
+    logger = logging.getLogger("CoverageReport")
+    logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+    return logger
+
+
+class CoverageIndex:
+    """Persistent index of mod assets and pack overrides."""
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        row = None
+        try:
+            row = self.conn.execute(
+                "SELECT value FROM meta WHERE key = 'schema'"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            pass
+        if row is not None and row[0] != str(SCHEMA_VERSION):
+            self.conn.executescript(
+                "DROP TABLE IF EXISTS mod_assets; DROP TABLE IF EXISTS jars;"
+                "DROP TABLE IF EXISTS pack_files; DROP TABLE IF EXISTS meta;"
+            )
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),)
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def update_mods(
+        self, mods_dir: Path, extractor: ModAssetsExtractor, logger: logging.Logger
+    ) -> Tuple[int, int, int]:
+        """Re-index new or changed JARs and drop removed ones.
+
+        Returns (indexed, unchanged, removed) counts.
+        """
+        known = {
+            path: (jar_id, size, mtime_ns)
+            for jar_id, path, size, mtime_ns in self.conn.execute(
+                "SELECT id, path, size, mtime_ns FROM jars"
+            )
+        }
+        indexed = unchanged = 0
+        current = set()
+        with self.conn:
+            for jar in extractor.scan_jars(mods_dir):
+                label = jar.relative_to(mods_dir).as_posix()
+                current.add(label)
+                st = jar.stat()
+                old = known.get(label)
+                if old and old[1:] == (st.st_size, st.st_mtime_ns):
+                    unchanged += 1
+                    continue
+                if old:
+                    self.conn.execute("DELETE FROM jars WHERE id = ?", (old[0],))
+                jar_id = self.conn.execute(
+                    "INSERT INTO jars (path, size, mtime_ns) VALUES (?, ?, ?)",
+                    (label, st.st_size, st.st_mtime_ns),
+                ).lastrowid
+                rows = []
+                for record in extractor.inventory_jar(jar, label):
+                    if "error" in record:
+                        logger.warning(f"[WARNING] {record['mod']}: {record['error']}")
+                        continue
+                    for namespace, files in record["namespaces"].items():
+                        rows.extend(
+                            (
+                                jar_id,
+                                record["mod"],
+                                namespace,
+                                f["path"],
+                                f["size"],
+                                f["crc"],
+                            )
+                            for f in files
+                        )
+                self.conn.executemany(
+                    "INSERT INTO mod_assets VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+                indexed += 1
+            removed = set(known) - current
+            self.conn.executemany(
+                "DELETE FROM jars WHERE path = ?", [(path,) for path in removed]
+            )
+        return indexed, unchanged, len(removed)
+
+    def update_pack(self, assets_dir: Path) -> Tuple[int, int, int]:
+        """Re-index changed override files under ``assets_dir``.
+
+        New or edited overrides take the current upstream CRC as their
+        baseline, which is what makes them stale once the mod changes it.
+        Returns (indexed, unchanged, removed) counts.
+        """
+        known = {
+            (namespace, path): (size, mtime_ns)
+            for namespace, path, size, mtime_ns in self.conn.execute(
+                "SELECT namespace, path, size, mtime_ns FROM pack_files"
+            )
+        }
+        changed = []
+        current = set()
+        for root, dirs, files in os.walk(assets_dir):
+            dirs.sort()
+            for name in sorted(files):
+                full = Path(root) / name
+                parts = full.relative_to(assets_dir).as_posix().split("/", 1)
+                if len(parts) != 2:
+                    continue
+                key = (parts[0], parts[1])
+                current.add(key)
+                st = full.stat()
+                if known.get(key) != (st.st_size, st.st_mtime_ns):
+                    changed.append((*key, st.st_size, st.st_mtime_ns))
+        removed = set(known) - current
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM pack_files WHERE namespace = ? AND path = ?", removed
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pack_files VALUES (?, ?, ?, ?, NULL)",
+                changed,
+            )
+            # Also covers overrides made before their mod was first indexed.
+            self.conn.execute(
+                f"UPDATE pack_files SET baseline_crc = {_UPSTREAM_CRC} "
+                "WHERE baseline_crc IS NULL"
+            )
+        return len(changed), len(current) - len(changed), len(removed)
+
+    def accept_stale(self) -> int:
+        """Mark every stale override as reviewed against the current upstream."""
+        with self.conn:
+            return self.conn.execute(
+                f"UPDATE pack_files SET baseline_crc = {_UPSTREAM_CRC} "
+                "WHERE baseline_crc IS NOT NULL AND NOT EXISTS ("
+                "  SELECT 1 FROM mod_assets m WHERE m.namespace = pack_files.namespace"
+                "  AND m.path = pack_files.path AND m.crc = pack_files.baseline_crc"
+                ") AND EXISTS ("
+                "  SELECT 1 FROM mod_assets m WHERE m.namespace = pack_files.namespace"
+                "  AND m.path = pack_files.path)"
+            ).rowcount
+
+    def report(
+        self, scope: str, skip: List[str], namespaces: List[str]
+    ) -> Dict[str, Dict[str, list]]:
+        """Return {namespace: {"missing"|"stale"|"orphaned": [...], ...}}."""
+        conn = self.conn
+        conn.execute("DROP TABLE IF EXISTS temp.wanted")
+        conn.execute("CREATE TEMP TABLE wanted (namespace TEXT PRIMARY KEY)")
+        conn.execute(
+            "INSERT INTO wanted SELECT DISTINCT namespace FROM mod_assets "
+            "UNION SELECT DISTINCT namespace FROM pack_files"
+        )
+        if namespaces:
+            conn.execute(
+                "DELETE FROM wanted WHERE namespace NOT IN (%s)"
+                % ",".join("?" * len(namespaces)),
+                namespaces,
+            )
+        conn.executemany("DELETE FROM wanted WHERE namespace = ?", [(s,) for s in skip])
+
+        result: Dict[str, Dict[str, list]] = {}
+
+        def section(namespace: str) -> Dict[str, list]:
+            return result.setdefault(
+                namespace,
+                {
+                    "textures": 0,
+                    "overridden": 0,
+                    "missing": [],
+                    "stale": [],
+                    "orphaned": [],
+                },
+            )
+
+        for namespace, textures, overridden in conn.execute(
+            "SELECT m.namespace, count(DISTINCT m.path), count(DISTINCT p.path) "
+            "FROM mod_assets m JOIN wanted USING (namespace) "
+            "LEFT JOIN pack_files p ON p.namespace = m.namespace AND p.path = m.path "
+            "WHERE m.path GLOB ? GROUP BY m.namespace",
+            (scope,),
+        ):
+            entry = section(namespace)
+            entry["textures"], entry["overridden"] = textures, overridden
+
+        for namespace, path, archive in conn.execute(
+            "SELECT m.namespace, m.path, min(m.archive) "
+            "FROM mod_assets m JOIN wanted USING (namespace) "
+            "WHERE m.path GLOB ? AND NOT EXISTS ("
+            "  SELECT 1 FROM pack_files p"
+            "  WHERE p.namespace = m.namespace AND p.path = m.path) "
+            "GROUP BY m.namespace, m.path ORDER BY m.namespace, m.path",
+            (scope,),
+        ):
+            section(namespace)["missing"].append({"path": path, "mod": archive})
+
+        for namespace, path, baseline, crcs, archive in conn.execute(
+            "SELECT p.namespace, p.path, p.baseline_crc, group_concat(DISTINCT m.crc), "
+            "min(m.archive) FROM pack_files p JOIN wanted USING (namespace) "
+            "JOIN mod_assets m ON m.namespace = p.namespace AND m.path = p.path "
+            "WHERE p.baseline_crc IS NOT NULL "
+            "GROUP BY p.namespace, p.path HAVING sum(m.crc = p.baseline_crc) = 0 "
+            "ORDER BY p.namespace, p.path"
+        ):
+            section(namespace)["stale"].append(
+                {
+                    "path": path,
+                    "mod": archive,
+                    "baseline_crc": baseline,
+                    "upstream_crc": sorted(crcs.split(",")),
+                }
+            )
+
+        # Only namespaces some indexed mod provides can have orphans; the
+        # rest are simply mods that were not part of this index. A sidecar
+        # belongs to its texture: it is only orphaned once that is gone too.
+        sidecar = TEXTURE_GLOB + SIDECAR_SUFFIX
+        for namespace, path in conn.execute(
+            "SELECT p.namespace, p.path FROM pack_files p JOIN wanted USING (namespace) "
+            "WHERE p.path GLOB ? AND (p.path GLOB ? OR p.path GLOB ?) "
+            "AND p.namespace IN (SELECT namespace FROM mod_assets) AND NOT EXISTS ("
+            "  SELECT 1 FROM mod_assets m"
+            "  WHERE m.namespace = p.namespace AND m.path = p.path) "
+            "AND NOT (p.path GLOB ? AND EXISTS ("
+            "  SELECT 1 FROM mod_assets m WHERE m.namespace = p.namespace"
+            "  AND m.path = substr(p.path, 1, length(p.path) - ?)"
+            "  UNION ALL SELECT 1 FROM pack_files q WHERE q.namespace = p.namespace"
+            "  AND q.path = substr(p.path, 1, length(p.path) - ?))) "
+            "ORDER BY p.namespace, p.path",
+            (
+                scope,
+                TEXTURE_GLOB,
+                sidecar,
+                sidecar,
+                len(SIDECAR_SUFFIX),
+                len(SIDECAR_SUFFIX),
+            ),
+        ):
+            section(namespace)["orphaned"].append({"path": path})
+
+        return dict(sorted(result.items()))
+
+
+def print_report(
+    report: Dict[str, Dict[str, list]], details: bool, logger: logging.Logger
+) -> None:
+    header = f"{'namespace':<28}{'textures':>9}{'overridden':>11}{'missing':>9}{'stale':>7}{'orphaned':>9}"
+    logger.info(header)
+    logger.info("-" * len(header))
+    totals = [0] * 5
+    for namespace, entry in report.items():
+        row = [
+            entry["textures"],
+            entry["overridden"],
+            len(entry["missing"]),
+            len(entry["stale"]),
+            len(entry["orphaned"]),
+        ]
+        totals = [a + b for a, b in zip(totals, row)]
+        logger.info(
+            f"{namespace:<28}{row[0]:>9}{row[1]:>11}{row[2]:>9}{row[3]:>7}{row[4]:>9}"
+        )
+    logger.info("-" * len(header))
+    logger.info(
+        f"{'total':<28}{totals[0]:>9}{totals[1]:>11}{totals[2]:>9}{totals[3]:>7}{totals[4]:>9}"
+    )
+    if not details:
+        return
+    for namespace, entry in report.items():
+        for kind in ("missing", "stale", "orphaned"):
+            for item in entry[kind]:
+                source = f"  ({item['mod']})" if "mod" in item else ""
+                logger.info(f"[{kind.upper()}] {namespace}:{item['path']}{source}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report mod textures that the resource pack does not override yet."
+    )
+    parser.add_argument(
+        "--mods", "-m", required=True, help="Directory containing mod JARs"
+    )
+    parser.add_argument(
+        "--recursive",
+        "-r",
+        action="store_true",
+        help="Recursively scan subdirectories for JAR files",
+    )
+    parser.add_argument(
+        "--pack", default="pack", help="Resource pack directory (default: pack)"
+    )
+    parser.add_argument(
+        "--index",
+        help="SQLite index file (default: .pack_cache/coverage.sqlite next to "
+        "the pack directory)",
+    )
+    parser.add_argument(
+        "--scope",
+        default=DEFAULT_SCOPE,
+        help="Glob (relative to assets/<namespace>/, '*' matches '/') selecting "
+        f"the mod files that should be overridden (default: {DEFAULT_SCOPE})",
+    )
+    parser.add_argument(
+        "--namespace",
+        action="append",
+        default=[],
+        metavar="NS",
+        help="Only report NS (repeatable)",
+    )
+    parser.add_argument(
+        "--skip-namespace",
+        action="append",
+        metavar="NS",
+        help="Leave NS out of the report (repeatable; default: minecraft)",
+    )
+    parser.add_argument(
+        "--details", action="store_true", help="List every missing/stale/orphaned path"
+    )
+    parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON")
+    parser.add_argument(
+        "--accept-stale",
+        action="store_true",
+        help="Mark the current stale overrides as reviewed",
+    )
+    args = parser.parse_args()
+
+    logger = setup_logging()
+    mods_dir = Path(args.mods).expanduser().resolve()
+    pack_dir = Path(args.pack).expanduser().resolve()
+    assets_dir = pack_dir / "assets"
+    if not mods_dir.is_dir():
+        logger.error(f"[ERROR] Mods directory not found: {mods_dir}")
+        sys.exit(1)
+    if not assets_dir.is_dir():
+        logger.error(f"[ERROR] Pack assets not found: {assets_dir}")
+        sys.exit(1)
+    index_path = (
+        Path(args.index).expanduser().resolve()
+        if args.index
+        else pack_dir.parent / ".pack_cache" / "coverage.sqlite"
+    )
+
+    extractor = ModAssetsExtractor(recursive=args.recursive)
+    index = CoverageIndex(index_path)
+    try:
+        jars = index.update_mods(mods_dir, extractor, logger)
+        files = index.update_pack(assets_dir)
+        logger.info(
+            f"[INFO] Indexed {jars[0]} JAR(s) ({jars[1]} unchanged, {jars[2]} removed), "
+            f"{files[0]} pack file(s) ({files[1]} unchanged, {files[2]} removed)"
+        )
+        if args.accept_stale:
+            logger.info(f"[INFO] Accepted {index.accept_stale()} stale override(s)")
+        skip = (
+            args.skip_namespace
+            if args.skip_namespace is not None
+            else list(DEFAULT_SKIP_NAMESPACES)
+        )
+        report = index.report(args.scope, skip, args.namespace)
+    except (FileNotFoundError, sqlite3.Error) as e:
+        logger.error(f"[ERROR] {e}")
+        sys.exit(1)
+    finally:
+        index.close()
+
+    print_report(report, args.details, logger)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=1), encoding="utf-8")
+        logger.info(f"[INFO] Report written to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
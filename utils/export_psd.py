@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+PSD Exporter
+
+Exports every PSD under project/ to the PNG texture it belongs to in pack/:
+
+    project/<namespace>/textures/...psd  ->  pack/assets/<namespace>/textures/...png
+    project/pack.psd                     ->  pack/pack.png
+
+The flattened image Photoshop saves with each PSD is decoded directly (see
+psdtools.py), so the PNGs match "Export As PNG" of the visible layers. PSDs
+saved without it are composited with psd-tools when that is installed.
+
+Translucent pixels are un-matted from the white the composite was flattened
+onto. The composite keeps 8 bits per channel, so the recovered color is
+within +-1 for opaque pixels but only within about 255/alpha for nearly
+transparent ones (up to +-68 at alpha 1-2 on the current sources). A PNG
+that already matches its PSD within that precision (e.g. a hand export) is
+kept as it is rather than rewritten, so the first run does not churn the
+committed textures; --force rewrites it anyway.
+
+Exports run on a process pool. A manifest in .pack_cache/ remembers the
+content hash of each PSD and of the PNG written for it, so unchanged PSDs
+are skipped unless their PNG was edited or deleted since.
+
+Expected project structure:
+.
+├── pack/
+├── project/
+└── utils/
+    ├── export_psd.py
+    ├── psdtools.py
+    └── pngtools.py
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pngtools import PngError, decode_rgba, encode_rgba
+from psdtools import PsdError, PsdUnsupported, decode_composite, load_psd
+
+MANIFEST_VERSION = 1
+# Bump when the exported pixels or encoding change, to re-export everything.
+EXPORTER_VERSION = 1
+SOURCE_SUFFIXES = (".psd", ".psd.xz", ".psb", ".psb.xz")
+# Split sources (xxx.part1.psd) are merged by hand, see CONTRIBUTING.md.
+SPLIT_PART = re.compile(r"\.part\d+\.ps[db](\.xz)?$")
+
+# Sources whose texture lives elsewhere than the mirrored path. Keys ending in
+# "/" rename a directory. Paths are relative to project/ and pack/assets/.
+TARGET_RENAMES = {
+    "authme/textures/gui/sprites/widgets/": "authme/textures/gui/sprites/widget/",
+    "chatpatches/textures/gui/sprites/search_button_focuse.png": (
+        "chatpatches/textures/gui/sprites/search_button_focused.png"
+    ),
+    "chatpatches/textures/gui/sprites/search_button_unfocuse.png": (
+        "chatpatches/textures/gui/sprites/search_button_unfocused.png"
+    ),
+}
+
+
+def setup_logging() -> logging.Logger:
+    logger = logging.getLogger("PsdExporter")
+    logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+    return logger
+
+
+@dataclass(frozen=True)
+class ExportJob:
+    source: Path
+    rel: str  # POSIX path relative to project/
+    target: Path
+    target_rel: str  # POSIX path relative to pack/
+
+
+def target_for(rel: str) -> str:
+    """Map a source path relative to project/ to its PNG relative to pack/."""
+    stem = rel
+    for suffix in SOURCE_SUFFIXES:
+        if stem.lower().endswith(suffix):
+            stem = stem[: -len(suffix)]
+            break
+    png = stem + ".png"
+    if "/" not in png:
+        # Top-level sources are pack files (pack.psd -> pack.png).
+        return png
+    for source, target in TARGET_RENAMES.items():
+        if png == source or (source.endswith("/") and png.startswith(source)):
+            png = target + png[len(source) :]
+            break
+    return f"assets/{png}"
+
+
+def collect_jobs(
+    project_dir: Path, pack_dir: Path, logger: logging.Logger, only: str = None
+) -> List[ExportJob]:
+    jobs = []
+    targets = {}
+    for root, dirs, names in os.walk(project_dir):
+        dirs.sort()
+        for name in sorted(names):
+            if not name.lower().endswith(SOURCE_SUFFIXES):
+                continue
+            source = Path(root) / name
+            rel = source.relative_to(project_dir).as_posix()
+            if SPLIT_PART.search(name.lower()):
+                logger.info(f"[INFO] Skipped split source (merge it first): {rel}")
+                continue
+            if only and not fnmatchcase(rel, only):
+                continue
+            target_rel = target_for(rel)
+            if target_rel in targets:
+                logger.warning(
+                    f"[WARNING] {rel} and {targets[target_rel]} both export to "
+                    f"{target_rel}; skipped {rel}"
+                )
+                continue
+            targets[target_rel] = rel
+            jobs.append(ExportJob(source, rel, pack_dir / target_rel, target_rel))
+    return jobs
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _composite_with_psd_tools(data: bytes) -> Optional[Tuple[int, int, bytes]]:
+    """Render the layers with psd-tools, if installed; None otherwise."""
+    try:
+        from psd_tools import PSDImage
+    except ImportError:
+        return None
+    image = PSDImage.open(io.BytesIO(data)).composite().convert("RGBA")
+    return image.width, image.height, image.tobytes()
+
+
+def matches_export(png: bytes, width: int, height: int, rgba: bytes) -> bool:
+    """True if ``png`` shows ``rgba`` within the precision of the composite.
+
+    Alpha must be identical; color may differ by the rounding that
+    un-matting amplifies (255 // alpha + 1) and is ignored where the pixel is
+    fully transparent.
+    """
+    try:
+        header, existing = decode_rgba(png)
+    except PngError:
+        return False
+    if (header.width, header.height) != (width, height):
+        return False
+    if existing == rgba:
+        return True
+    if existing[3::4] != rgba[3::4]:
+        return False
+    old = memoryview(existing).cast("I")
+    new = memoryview(rgba).cast("I")
+    for i, (a, b) in enumerate(zip(old, new)):
+        if a == b:
+            continue
+        alpha = rgba[i * 4 + 3]
+        if alpha == 0:
+            continue
+        tolerance = 255 // alpha + 1
+        for c in range(i * 4, i * 4 + 3):
+            if abs(existing[c] - rgba[c]) > tolerance:
+                return False
+    return True
+
+
+def export_one(source: Path, target: Path, keep_matching: bool = True) -> dict:
+    """Flatten one PSD to ``target``; returns what the manifest records.
+
+    With ``keep_matching`` an existing PNG that matches the PSD (see
+    matches_export) is left alone and ``"kept"`` is set in the result. Runs
+    in worker processes, so it takes and returns plain values.
+    """
+    raw = source.read_bytes()
+    try:
+        header, rgba = decode_composite(raw)
+        width, height = header.width, header.height
+    except PsdUnsupported as e:
+        rendered = _composite_with_psd_tools(load_psd(raw))
+        if rendered is None:
+            raise PsdError(f"{e}; install psd-tools to render its layers") from None
+        width, height, rgba = rendered
+    if keep_matching:
+        try:
+            existing = target.read_bytes()
+        except OSError:
+            existing = None
+        if existing is not None and matches_export(existing, width, height, rgba):
+            return {
+                "source": _sha256(raw),
+                "png": _sha256(existing),
+                "width": width,
+                "height": height,
+                "kept": True,
+            }
+    png = encode_rgba(width, height, rgba)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.tmp")
+    tmp.write_bytes(png)
+    os.replace(tmp, target)
+    return {
+        "source": _sha256(raw),
+        "png": _sha256(png),
+        "width": width,
+        "height": height,
+        "kept": False,
+    }
+
+
+class ExportManifest:
+    """JSON record of the last export of each source, keyed by its rel path."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            valid = (
+                data.get("version") == MANIFEST_VERSION
+                and data.get("exporter") == EXPORTER_VERSION
+            )
+            self.entries: Dict[str, dict] = data["exports"] if valid else {}
+        except (OSError, ValueError, KeyError, AttributeError):
+            self.entries = {}
+
+    def is_current(self, job: ExportJob) -> bool:
+        """True if the source is unchanged and its PNG is still ours."""
+        entry = self.entries.get(job.rel)
+        if entry is None or entry.get("target") != job.target_rel:
+            return False
+        try:
+            st = job.source.stat()
+            png = job.target.read_bytes()
+        except OSError:
+            return False
+        if _sha256(png) != entry["png"]:
+            return False
+        if (st.st_size, st.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+            return True
+        # Touched but possibly identical (e.g. after a checkout): compare content.
+        if _sha256(job.source.read_bytes()) != entry["source"]:
+            return False
+        entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+        return True
+
+    def record(self, job: ExportJob, result: dict) -> None:
+        st = job.source.stat()
+        self.entries[job.rel] = {
+            **{k: v for k, v in result.items() if k != "kept"},
+            "target": job.target_rel,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+
+    def save(self, keep: List[str]) -> None:
+        entries = {
+            rel: self.entries[rel] for rel in sorted(keep) if rel in self.entries
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "version": MANIFEST_VERSION,
+                    "exporter": EXPORTER_VERSION,
+                    "exports": entries,
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+
+def run_exports(
+    jobs: List[ExportJob],
+    manifest: ExportManifest,
+    workers: int,
+    logger: logging.Logger,
+    force: bool = False,
+    dry_run: bool = False,
+) -> Tuple[int, int, int]:
+    """Export the out-of-date jobs; returns (exported, skipped, failed).
+
+    Out-of-date PNGs that already match their PSD count as skipped. A job
+    that fails for any reason is reported and the others still run.
+    """
+    pending = [job for job in jobs if force or not manifest.is_current(job)]
+    skipped = len(jobs) - len(pending)
+    if dry_run:
+        for job in pending:
+            logger.info(f"[INFO] Would export: {job.rel} -> {job.target_rel}")
+        return 0, skipped, 0
+
+    exported = failed = 0
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if executor:
+            futures = [
+                executor.submit(export_one, job.source, job.target, not force)
+                for job in pending
+            ]
+        for i, job in enumerate(pending):
+            try:
+                if executor:
+                    result = futures[i].result()
+                else:
+                    result = export_one(job.source, job.target, not force)
+            except Exception as e:
+                # Includes psd-tools errors and a broken worker pool.
+                failed += 1
+                logger.error(f"[ERROR] {job.rel}: {type(e).__name__}: {e}")
+                continue
+            manifest.record(job, result)
+            if result["kept"]:
+                skipped += 1
+                logger.info(f"[INFO] Kept (matches its PSD): {job.target_rel}")
+                continue
+            exported += 1
+            logger.info(
+                f"[INFO] Exported: {job.target_rel} "
+                f"({result['width']}x{result['height']})"
+            )
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+    return exported, skipped, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the PSD sources in project/ to the PNG textures in pack/."
+    )
+    parser.add_argument(
+        "--project", default="project", help="PSD source directory (default: project)"
+    )
+    parser.add_argument(
+        "--pack", default="pack", help="Resource pack directory (default: pack)"
+    )
+    parser.add_argument(
+        "--only",
+        metavar="GLOB",
+        help="Only export sources matching GLOB (relative to --project, "
+        "'*' matches '/')",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=0,
+        help="Export on N worker processes (default: 0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Export even if nothing changed"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only list what would be exported"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="Export manifest (default: .pack_cache/psd_export.json next to the "
+        "pack directory)",
+    )
+    args = parser.parse_args()
+
+    logger = setup_logging()
+    project_dir = Path(args.project).expanduser().resolve()
+    pack_dir = Path(args.pack).expanduser().resolve()
+    for path in (project_dir, pack_dir):
+        if not path.is_dir():
+            logger.error(f"[ERROR] Not a directory: {path}")
+            sys.exit(1)
+
+    manifest_path = (
+        Path(args.manifest).expanduser().resolve()
+        if args.manifest
+        else pack_dir.parent / ".pack_cache" / "psd_export.json"
+    )
+    manifest = ExportManifest(manifest_path)
+    workers = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    jobs = collect_jobs(project_dir, pack_dir, logger, args.only)
+    try:
+        exported, skipped, failed = run_exports(
+            jobs, manifest, workers, logger, args.force, args.dry_run
+        )
+    finally:
+        if not args.dry_run:
+            # Entries of sources outside --only are kept for the next full run.
+            manifest.save(
+                [job.rel for job in jobs] if not args.only else list(manifest.entries)
+            )
+    logger.info(
+        f"[INFO] {exported} exported, {skipped} unchanged, {failed} failed "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
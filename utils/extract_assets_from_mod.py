@@ -4,9 +4,17 @@ Minecraft Mod Assets Extractor
 
 Extracts 'assets/' from mod JARs, including nested dependencies.
 
+Tools can call extract() instead of running the script; it never prompts and
+returns an ExtractResult. --jobs-file runs many extractions in one process.
+
 Co-developed with Qwen3-Max
 """
 
+import csv
+import hashlib
+import io
+import json
+import mmap
 import os
 import sys
 import zipfile
@@ -14,17 +22,274 @@ import shutil
 import tempfile
 import logging
 import shlex
+import struct
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Set, Optional
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 import argparse
 
+from metrics import Metrics, profiled
+from ziptools import (
+    CentralEntry,
+    EntryReader,
+    ZipStreamWriter,
+    compress_data,
+    entry_start,
+    iter_central_directory,
+    iter_raw_chunks,
+    read_entry,
+)
+
+DEFAULT_NESTED_MEMORY_MB = 64
+# Bytes copied at a time when writing members out.
+COPY_CHUNK = 1 << 20
+MANIFEST_NAME = ".extract_manifest.json"
+MANIFEST_VERSION = 2
+INVENTORY_VERSION = 1
+DEFAULT_OUTPUT_NAMES = {"dir": "extracted_assets", "zip": "extracted_assets.zip"}
+OBJECTS_DIR_NAME = ".objects"
+
+
+@dataclass
+class _JarRecord:
+    """Output files written for one top-level JAR and the JARs nested in it."""
+
+    files: List[str] = field(default_factory=list)
+    nested: List[str] = field(default_factory=list)  # direct children only
+
+
+@dataclass
+class ExtractResult:
+    """Outcome of one extraction run."""
+
+    output: Path
+    succeeded: List[Path] = field(default_factory=list)  # top-level JARs
+    failed: List[Path] = field(default_factory=list)
+    unchanged: int = 0  # JARs skipped by --incremental
+    removed_jars: int = 0  # JARs gone since the last --incremental run
+    filtered: int = 0  # members skipped by the filters
+    files: int = 0  # files written, nested JARs included
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+@dataclass
+class _QueuedArchive:
+    """An archive waiting on the extraction stack, and where its bytes are.
+
+    Either ``length`` bytes of the file ``path`` from ``start`` (a JAR, a
+    STORED nested JAR inside one, or a spilled temp file) or ``length`` bytes
+    in ``data``, held in memory against the nested memory budget.
+    """
+
+    name: str
+    stem: str
+    depth: int
+    files: List[str]
+    path: Optional[Path] = None
+    start: int = 0
+    length: int = 0
+    data: Optional[io.BytesIO] = None
+    key: Optional[str] = None  # claim key: the path, or content of a nested JAR
+    nested: List[str] = field(default_factory=list)  # keys of direct children
+
+    @contextmanager
+    def opened(self) -> Iterator[BinaryIO]:
+        if self.data is not None:
+            self.data.seek(0)
+            yield self.data
+            return
+        with open(self.path, "rb") as fp:
+            yield _FileSlice(fp, self.start, self.length)
+
+
+class _FileSlice:
+    """Read-only, seekable view of ``length`` bytes of ``fp`` from ``start``.
+
+    Every read seeks first, so views can share a file object with other
+    readers of the parent archive.
+    """
+
+    def __init__(self, fp: BinaryIO, start: int, length: int):
+        self._fp = fp
+        self._start = start
+        self._length = length
+        self._pos = 0
+
+    def seekable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._length
+        if offset < 0:
+            raise OSError("Negative seek position")
+        self._pos = offset
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = max(0, self._length - self._pos)
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        self._fp.seek(self._start + self._pos)
+        data = self._fp.read(size)
+        self._pos += len(data)
+        return data
+
+    def close(self) -> None:
+        pass
+
+
+class _ObjectStore:
+    """Content-addressed store that extracted files are linked into.
+
+    Each distinct member is written once to ``<root>/ab/<sha256>``; output
+    paths become hardlinks to it, or relative symlinks where the filesystem
+    refuses hardlinks.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.files = 0
+        self.symlinks = 0
+        self.total_bytes = 0
+        self.written_bytes = 0
+        self._known: Set[str] = set()
+        self._lock = threading.Lock()
+        # mkstemp files are 0600; objects get what open() would have made.
+        # Read here, before any worker thread, as the umask is process-wide.
+        umask = os.umask(0)
+        os.umask(umask)
+        self.mode = 0o666 & ~umask
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def add(self, src: BinaryIO, target: Path) -> None:
+        """Copy ``src`` into the store and link ``target`` to its object."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter(lambda: src.read(1 << 20), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+                if hasattr(os, "fchmod"):
+                    os.fchmod(f.fileno(), self.mode)
+            key = digest.hexdigest()
+            obj = self._object_path(key)
+            with self._lock:
+                new = key not in self._known and not obj.exists()
+                self._known.add(key)
+                if new:
+                    obj.parent.mkdir(exist_ok=True)
+                    os.replace(tmp, obj)
+                    self.written_bytes += size
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+
+        target.unlink(missing_ok=True)
+        try:
+            os.link(obj, target)
+            symlink = False
+        except OSError:
+            os.symlink(os.path.relpath(obj, target.parent), target)
+            symlink = True
+        with self._lock:
+            self.files += 1
+            self.symlinks += symlink
+            self.total_bytes += size
+
+    def collect_garbage(self, output_path: Path, files: Iterable[str]) -> int:
+        """Delete objects no output file links to; returns how many."""
+        referenced = set()
+        for rel in files:
+            path = output_path / rel
+            if path.is_symlink():
+                referenced.add(Path(os.readlink(path)).name)
+        removed = 0
+        for obj in self.root.glob("*/*"):
+            if obj.name not in referenced and obj.stat().st_nlink == 1:
+                obj.unlink()
+                removed += 1
+        return removed
+
+    def summary(self) -> str:
+        saved = self.total_bytes - self.written_bytes
+        percent = 100 * saved / self.total_bytes if self.total_bytes else 0
+        line = (
+            f"{self.files} file(s) -> {len(self._known)} object(s), "
+            f"{self.written_bytes / 1048576:.1f} MB written for "
+            f"{self.total_bytes / 1048576:.1f} MB of assets ({percent:.0f}% saved)"
+        )
+        if self.symlinks:
+            line += f", {self.symlinks} symlinked"
+        return line
+
 
 class ModAssetsExtractor:
-    def __init__(self, log_file: Optional[str] = None, recursive: bool = False):
+    def __init__(
+        self,
+        log_file: Optional[str] = None,
+        recursive: bool = False,
+        jobs: int = 1,
+        nested_memory_limit: int = DEFAULT_NESTED_MEMORY_MB << 20,
+        incremental: bool = False,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        namespaces: Iterable[str] = (),
+        dedup: bool = False,
+        output_format: str = "dir",
+        metrics: Optional[Metrics] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
         self.recursive = recursive
+        self.dedup = dedup
+        self.output_format = output_format
+        self._store: Optional[_ObjectStore] = None
+        self._archive: Optional[ZipStreamWriter] = None
+        # With jobs > 1, each archive's members are written to a part here
+        # first; see _merge_parts.
+        self._parts_dir: Optional[Path] = None
+        self._parts: Dict[str, Tuple[Path, List[str]]] = {}
+        self.archived_bytes = 0
+        self.recompressed_count = 0
+        self.incremental = incremental
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.namespaces = frozenset(namespaces)
+        self.filtered_count = 0
+        self.jobs = max(1, jobs)
+        self.nested_memory_limit = nested_memory_limit
+        self._memory_in_use = 0
         self.logger = logging.getLogger("ModAssetsExtractor")
         self._setup_logging(log_file)
         self.processed_jars: Set[str] = set()
+        self._nested_files: Dict[str, List[str]] = {}
+        self._nested_links: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.metrics = metrics or Metrics("extract_assets_from_mod")
+        # A thread pool shared with other runs; used instead of our own.
+        self.executor = executor
 
     def _setup_logging(self, log_file: Optional[str]) -> None:
         self.logger.handlers.clear()
@@ -47,6 +312,39 @@ class ModAssetsExtractor:
             self.logger.addHandler(file_handler)
             self.logger.info(f"Logging to file: {log_path}")
 
+    def _log(self, level: int, message: str) -> None:
+        """Log directly, or into the current worker's buffer when one is set."""
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            self.logger.log(level, message)
+        else:
+            buffer.append((level, message))
+
+    def _claim(self, key: str) -> bool:
+        """Atomically mark a JAR as processed; False if it already was."""
+        with self._lock:
+            if key in self.processed_jars:
+                return False
+            self.processed_jars.add(key)
+            return True
+
+    @property
+    def has_filters(self) -> bool:
+        return bool(self.include or self.exclude or self.namespaces)
+
+    def _filter_signature(self) -> List[List[str]]:
+        return [sorted(self.include), sorted(self.exclude), sorted(self.namespaces)]
+
+    def _wanted(self, member: str) -> bool:
+        """Apply --namespace/--include/--exclude to an 'assets/' member name."""
+        if self.namespaces:
+            parts = member.split("/", 2)
+            if len(parts) < 3 or parts[1] not in self.namespaces:
+                return False
+        if self.include and not any(fnmatchcase(member, p) for p in self.include):
+            return False
+        return not any(fnmatchcase(member, p) for p in self.exclude)
+
     @staticmethod
     def _parse_user_path(raw: str) -> str:
         """Safely parse quoted paths from user input."""
@@ -65,84 +363,454 @@ class ModAssetsExtractor:
             return cleaned
 
     @staticmethod
-    def _is_safe_path(basedir: Path, member: str) -> bool:
-        """Prevent Zip Slip."""
-        try:
-            resolved = (basedir / member).resolve()
-            return str(resolved).startswith(str(basedir.resolve()))
-        except Exception:
+    def _is_safe_member(member: str) -> bool:
+        """Prevent Zip Slip, from the member name alone.
+
+        Absolute and drive paths are refused, and '..' may never climb above
+        the folder the member is extracted to. No filesystem access, so the
+        whole central directory is checked without a syscall per member.
+        """
+        if member.startswith(("/", "\\")) or member[1:2] == ":":
             return False
+        depth = 0
+        for part in member.replace("\\", "/").split("/"):
+            if part == "..":
+                depth -= 1
+                if depth < 0:
+                    return False
+            elif part not in ("", "."):
+                depth += 1
+        return depth > 0
+
+    @staticmethod
+    def _is_nested_jar(name: str) -> bool:
+        """Nested JARs worth following: anywhere but META-INF/, or META-INF/jars/."""
+        return name.endswith(".jar") and (
+            not name.startswith("META-INF/") or name.startswith("META-INF/jars/")
+        )
+
+    @staticmethod
+    def _member_path(basedir: Path, member: str) -> Path:
+        """Where ZipFile.extract() writes ``member``: '.' and '..' parts dropped."""
+        parts = [p for p in member.split("/") if p not in ("", ".", "..")]
+        return basedir.joinpath(*parts)
+
+    def _open_member(
+        self, fp: BinaryIO, entry: CentralEntry, fallback: List[zipfile.ZipFile]
+    ) -> BinaryIO:
+        """Stream one member; methods other than stored/deflate go via zipfile.
+
+        ``fallback`` caches the ZipFile for the archive, so its full central
+        directory is only loaded for archives that need it.
+        """
+        try:
+            return EntryReader(fp, entry)
+        except NotImplementedError:
+            if not fallback:
+                zip_kwargs = {}
+                if sys.version_info >= (3, 11):
+                    zip_kwargs["metadata_encoding"] = "utf-8"
+                fallback.append(zipfile.ZipFile(fp, "r", **zip_kwargs))
+            return fallback[0].open(entry.name)
+
+    def _queue_nested(
+        self,
+        fp: BinaryIO,
+        parent: _QueuedArchive,
+        entry: CentralEntry,
+        name: str,
+        key: str,
+        fallback: List[zipfile.ZipFile],
+        spill_dir,
+    ) -> _QueuedArchive:
+        """Make a nested JAR readable once its parent is closed.
+
+        STORED entries inside an archive on disk are just a byte range of it;
+        other entries are inflated into memory while the shared budget allows
+        and spill to a temporary file when it does not.
+        """
+        item = _QueuedArchive(name, Path(name).stem, parent.depth + 1, [], key=key)
+        with self._lock:
+            seen = key in self.processed_jars
+        if seen:
+            return item  # Only logged as skipped when its turn comes.
+        if (
+            parent.path is not None
+            and entry.compress_type == zipfile.ZIP_STORED
+            and not entry.flags & 0x1
+        ):
+            item.path = parent.path
+            item.start = parent.start + entry_start(fp, entry)
+            item.length = entry.compress_size
+            return item
+
+        with self._lock:
+            in_memory = (
+                self._memory_in_use + entry.file_size <= self.nested_memory_limit
+            )
+            if in_memory:
+                self._memory_in_use += entry.file_size
+        if in_memory:
+            # Written in chunks: a joined read would briefly hold two copies.
+            buffer = io.BytesIO()
+            try:
+                with self._open_member(fp, entry, fallback) as src:
+                    shutil.copyfileobj(src, buffer, COPY_CHUNK)
+            except BaseException:
+                self._release(entry.file_size)
+                raise
+            item.data = buffer
+            item.length = entry.file_size
+            return item
+
+        fd, tmp = tempfile.mkstemp(dir=spill_dir(), suffix=".jar")
+        with os.fdopen(fd, "wb") as f, self._open_member(fp, entry, fallback) as src:
+            shutil.copyfileobj(src, f, COPY_CHUNK)
+        item.path = Path(tmp)
+        item.length = entry.file_size
+        return item
+
+    def _release(self, size: int) -> None:
+        with self._lock:
+            self._memory_in_use -= size
+
+    def _archive_member(
+        self,
+        fp: BinaryIO,
+        entry: CentralEntry,
+        arcname: str,
+        fallback: List[zipfile.ZipFile],
+    ) -> bool:
+        """Copy ``entry`` into the output archive; False if the name is taken."""
+        mode = (entry.external_attr >> 16) & 0o777 or 0o644
+        raw = (
+            entry.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+            and not entry.flags & 0x1
+        )
+        if not raw:
+            # Other methods are inflated and deflated again.
+            with self._open_member(fp, entry, fallback) as src:
+                compressed = compress_data(src.read())
+        # A worker's own part archive needs no lock (see _merge_parts).
+        part = getattr(self._local, "archive", None)
+        archive = self._archive if part is None else part
+        with self._lock if part is None else nullcontext():
+            if arcname in archive:
+                return False
+            if raw:
+                # Streamed in chunks: large members never sit in memory.
+                archive.write_raw(
+                    arcname,
+                    iter_raw_chunks(fp, entry),
+                    entry.crc,
+                    entry.file_size,
+                    entry.compress_type,
+                    entry.compress_size,
+                    entry.date_time,
+                    mode,
+                )
+                size = entry.compress_size
+            else:
+                archive.write_entry(arcname, compressed, entry.date_time, mode)
+                size = compressed.compress_size
+        with self._lock:
+            if part is None:
+                self.archived_bytes += size
+            self.recompressed_count += not raw
+        return True
+
+    @contextmanager
+    def _part(self, key: str, files: List[str]) -> Iterator[None]:
+        """Archive the members of one JAR into a part of its own, if in use."""
+        if self._parts_dir is None:
+            yield
+            return
+        with self._lock:
+            path = self._parts_dir / f"{len(self._parts):06d}.zip"
+            self._parts[key] = (path, files)
+        with ZipStreamWriter(path) as part:
+            self._local.archive = part
+            try:
+                yield
+            finally:
+                self._local.archive = None
+
+    def _merge_parts(self, results: List[Tuple[Path, bool, _JarRecord]]) -> None:
+        """Copy the parts into the output archive as a one-job run would.
 
-    def _extract_jar(self, jar_path: Path, output_dir: Path, depth: int = 0) -> bool:
-        """Recursively extract assets from JAR (including nested JARs)."""
-        indent = "  " * depth
-        jar_abs = jar_path.resolve()
-        if str(jar_abs) in self.processed_jars:
-            self.logger.info(f"{indent}Skipping already processed: {jar_path.name}")
+        Workers finish, and claim shared nested JARs, in any order; walking
+        the parts depth-first in JAR order keeps the entry order, and which
+        JAR wins a duplicate path, independent of timing.
+        """
+        merged: Set[str] = set()
+        for jar, _, record in results:
+            top = str(jar.resolve())
+            pending = [top]
+            while pending:
+                key = pending.pop()
+                if key in merged:
+                    continue
+                merged.add(key)
+                if key in self._parts:
+                    self._merge_part(*self._parts.pop(key))
+                if key == top:
+                    children = record.nested
+                else:
+                    children = self._nested_links.get(key, [])
+                pending.extend(reversed(children))
+
+    def _merge_part(self, path: Path, files: List[str]) -> None:
+        with open(path, "rb") as fp:
+            for entry in iter_central_directory(fp):
+                if entry.name in self._archive:
+                    self._log(logging.DEBUG, f"Skipped duplicate path: {entry.name}")
+                    files.remove(entry.name)
+                    continue
+                self._archive.write_raw(
+                    entry.name,
+                    iter_raw_chunks(fp, entry),
+                    entry.crc,
+                    entry.file_size,
+                    entry.compress_type,
+                    entry.compress_size,
+                    entry.date_time,
+                    (entry.external_attr >> 16) & 0o777 or 0o644,
+                )
+                self.archived_bytes += entry.compress_size
+        path.unlink()
+
+    def _extract_jar(
+        self, jar_path: Path, output_dir: Path, record: _JarRecord
+    ) -> bool:
+        """Extract assets from a top-level JAR and the JARs nested in it.
+
+        Nesting is walked depth-first with an explicit stack instead of
+        recursion, and no parent archive stays open while its children are
+        processed, so memory does not grow with the depth of nesting.
+        """
+        key = str(jar_path.resolve())
+        if not self._claim(key):
+            self._log(logging.INFO, f"Skipping already processed: {jar_path.name}")
             return True
-        self.processed_jars.add(str(jar_abs))
+        try:
+            size = jar_path.stat().st_size
+        except OSError as e:
+            self._log(logging.ERROR, f"JAR processing failed: {e}")
+            return False
 
-        jar_type = "Main Mod" if depth == 0 else "Nested Mod"
-        self.logger.info(f"{indent}Processing {jar_type}: {jar_path.name}")
+        start = time.perf_counter()
+        top = _QueuedArchive(
+            jar_path.name,
+            jar_path.stem,
+            0,
+            record.files,
+            jar_path,
+            0,
+            size,
+            key=key,
+            nested=record.nested,
+        )
+        stack = [top]
+        spill: List[tempfile.TemporaryDirectory] = []
 
-        zip_kwargs = {}
-        if sys.version_info >= (3, 11):
-            zip_kwargs["metadata_encoding"] = "utf-8"
+        def spill_dir() -> str:
+            if not spill:
+                spill.append(tempfile.TemporaryDirectory(prefix="extract_nested_"))
+            return spill[0].name
 
+        ok = False
+        top_counters: Dict[str, int] = {}
         try:
-            with zipfile.ZipFile(jar_path, "r", **zip_kwargs) as jar:
-                asset_members = [m for m in jar.namelist() if m.startswith("assets/")]
-                if asset_members:
-                    folder = jar_path.stem if depth == 0 else f"nested_{jar_path.stem}"
-                    mod_out = output_dir / folder
-                    mod_out.mkdir(parents=True, exist_ok=True)
-                    count = 0
-                    for member in asset_members:
-                        if self._is_safe_path(mod_out, member):
-                            jar.extract(member, mod_out)
-                            count += 1
-                        else:
-                            self.logger.warning(
-                                f"{indent}Skipped unsafe path: {member}"
+            while stack:
+                item = stack.pop()
+                try:
+                    if item.depth > 0 and not self._claim(item.key):
+                        indent = "  " * item.depth
+                        self._log(
+                            logging.INFO,
+                            f"{indent}Skipping already processed: {item.name}",
+                        )
+                        continue
+                    if item.depth > 0:
+                        with self._lock:
+                            self._nested_files[item.key] = item.files
+                            self._nested_links[item.key] = item.nested
+                    with self._part(item.key, item.files):
+                        item_ok, counters, children = self._extract_queued(
+                            item, output_dir, record, spill_dir
+                        )
+                finally:
+                    if item.data is not None:
+                        self._release(item.length)
+                        item.data = None
+                if item.depth == 0:
+                    ok, top_counters = item_ok, counters
+                # Reversed, so nested JARs are processed in archive order.
+                stack.extend(reversed(children))
+        finally:
+            for item in stack:
+                if item.data is not None:
+                    self._release(item.length)
+            if spill:
+                spill[0].cleanup()
+            # Includes the time of nested JARs, which also get their own items.
+            self.metrics.item(
+                "jar", top.name, time.perf_counter() - start, depth=0, **top_counters
+            )
+        return ok
+
+    def _extract_queued(
+        self, item: _QueuedArchive, output_dir: Path, record: _JarRecord, spill_dir
+    ) -> Tuple[bool, Dict[str, int], List[_QueuedArchive]]:
+        """Extract one archive; returns (ok, counters, nested JARs to queue)."""
+        indent = "  " * item.depth
+        jar_type = "Main Mod" if item.depth == 0 else "Nested Mod"
+        self._log(logging.INFO, f"{indent}Processing {jar_type}: {item.name}")
+        start = time.perf_counter()
+        counters = {"files": 0, "bytes_in": 0, "bytes_out": 0}
+        children: List[_QueuedArchive] = []
+        try:
+            ok = self._extract_members(
+                item, output_dir, record, counters, children, spill_dir
+            )
+        finally:
+            if item.depth > 0:
+                self.metrics.item(
+                    "nested_jar",
+                    item.name,
+                    time.perf_counter() - start,
+                    depth=item.depth,
+                    **counters,
+                )
+            self.metrics.count(
+                "extract",
+                jars=int(item.depth == 0),
+                nested_jars=int(item.depth > 0),
+                **counters,
+            )
+        return ok, counters, children
+
+    def _extract_members(
+        self,
+        item: _QueuedArchive,
+        output_dir: Path,
+        record: _JarRecord,
+        counters: Dict[str, int],
+        children: List[_QueuedArchive],
+        spill_dir,
+    ) -> bool:
+        indent = "  " * item.depth
+        folder = item.stem if item.depth == 0 else f"nested_{item.stem}"
+        mod_out = output_dir / folder
+        fallback: List[zipfile.ZipFile] = []
+        try:
+            with item.opened() as fp:
+                try:
+                    # One lazy pass over the central directory: assets are
+                    # extracted as they come, nested JARs only noted.
+                    found = wanted = count = filtered = 0
+                    made_dirs: Set[Path] = set()
+                    nested: List[CentralEntry] = []
+                    for entry in iter_central_directory(fp):
+                        member = entry.name
+                        if self._is_nested_jar(member):
+                            nested.append(entry)
+                        if not member.startswith("assets/") or member.endswith("/"):
+                            continue
+                        found += 1
+                        if self.has_filters and not self._wanted(member):
+                            filtered += 1
+                            continue
+                        wanted += 1
+                        if not self._is_safe_member(member):
+                            self._log(
+                                logging.WARNING,
+                                f"{indent}Skipped unsafe path: {member}",
                             )
-                    self.logger.info(f"{indent}Extracted {count} file(s) to: {mod_out}")
-                else:
-                    self.logger.info(f"{indent}No 'assets/' found.")
-
-                # Process nested JARs: allow META-INF/jars/
-                nested = [
-                    m
-                    for m in jar.namelist()
-                    if m.endswith(".jar")
-                    and (
-                        not m.startswith("META-INF/") or m.startswith("META-INF/jars/")
-                    )
-                ]
-                if nested:
-                    self.logger.info(f"{indent}Found {len(nested)} nested JAR(s).")
-                    with tempfile.TemporaryDirectory() as tmp:
-                        for nj in nested:
-                            safe_name = nj.replace("/", "_").replace("\\", "_")
-                            nested_path = Path(tmp) / safe_name
-                            with jar.open(nj) as src, open(nested_path, "wb") as dst:
-                                shutil.copyfileobj(src, dst)
-                            self._extract_jar(nested_path, output_dir, depth + 1)
-                elif depth > 0:
-                    self.logger.info(f"{indent}Finished nested JAR.")
+                            continue
+                        target = self._member_path(mod_out, member)
+                        rel = target.relative_to(output_dir).as_posix()
+                        if self._archive is not None:
+                            if not self._archive_member(fp, entry, rel, fallback):
+                                self._log(
+                                    logging.DEBUG,
+                                    f"{indent}Skipped duplicate path: {rel}",
+                                )
+                                continue
+                        else:
+                            # Other workers may share this folder, so create
+                            # parents race-free, but once per directory.
+                            if target.parent not in made_dirs:
+                                target.parent.mkdir(parents=True, exist_ok=True)
+                                made_dirs.add(target.parent)
+                            with self._open_member(fp, entry, fallback) as src:
+                                if self._store is None:
+                                    with open(target, "wb") as dst:
+                                        shutil.copyfileobj(src, dst, COPY_CHUNK)
+                                else:
+                                    self._store.add(src, target)
+                        item.files.append(rel)
+                        count += 1
+                        counters["bytes_in"] += entry.compress_size
+                        counters["bytes_out"] += entry.file_size
+                    counters["files"] += count
+                    if filtered:
+                        with self._lock:
+                            self.filtered_count += filtered
 
-                return True
+                    if wanted:
+                        where = (
+                            f"{folder}/ in the archive"
+                            if self._archive is not None
+                            else str(mod_out)
+                        )
+                        self._log(
+                            logging.INFO,
+                            f"{indent}Extracted {count} file(s) to: {where}",
+                        )
+                    elif found:
+                        self._log(logging.INFO, f"{indent}No assets match the filters.")
+                    else:
+                        self._log(logging.INFO, f"{indent}No 'assets/' found.")
 
-        except (zipfile.BadZipFile, zipfile.LargeZipFile, RuntimeError, OSError) as e:
-            self.logger.error(f"{indent}JAR processing failed: {e}")
+                    # Nested JARs: anywhere but META-INF/, or META-INF/jars/
+                    if nested:
+                        self._log(
+                            logging.INFO,
+                            f"{indent}Found {len(nested)} nested JAR(s).",
+                        )
+                    elif item.depth > 0:
+                        self._log(logging.INFO, f"{indent}Finished nested JAR.")
+                    for entry in nested:
+                        safe_name = entry.name.replace("/", "_").replace("\\", "_")
+                        # Temp paths differ per run, so dedup by content.
+                        key = f"nested:{entry.crc:08x}:{entry.file_size}"
+                        if key not in item.nested:
+                            item.nested.append(key)
+                        children.append(
+                            self._queue_nested(
+                                fp, item, entry, safe_name, key, fallback, spill_dir
+                            )
+                        )
+                finally:
+                    for zf in fallback:
+                        zf.close()
+            return True
+
+        except (
+            zipfile.BadZipFile,
+            zipfile.LargeZipFile,
+            NotImplementedError,
+            RuntimeError,
+            OSError,
+        ) as e:
+            self._log(logging.ERROR, f"{indent}JAR processing failed: {e}")
             return False
         except Exception as e:
-            self.logger.error(f"{indent}Unexpected error: {e}")
+            self._log(logging.ERROR, f"{indent}Unexpected error: {e}")
             return False
 
-    def validate_paths(
-        self, input_str: str, output_str: Optional[str], batch: bool
-    ) -> tuple[Path, Path]:
-        """Expand ~, validate existence, type, and permissions."""
+    def validate_input(self, input_str: str) -> Path:
         input_path = Path(self._parse_user_path(input_str)).expanduser().resolve()
         if not input_path.exists():
             raise FileNotFoundError(f"Input path does not exist: {input_path}")
@@ -150,13 +818,20 @@ class ModAssetsExtractor:
             raise NotADirectoryError(f"Input is not a directory: {input_path}")
         if not os.access(input_path, os.R_OK):
             raise PermissionError(f"No read permission on: {input_path}")
+        return input_path
+
+    def validate_paths(
+        self, input_str: str, output_str: Optional[str], batch: bool
+    ) -> tuple[Path, Path]:
+        """Expand ~, validate existence, type, and permissions."""
+        input_path = self.validate_input(input_str)
 
         output_path = (
             Path(self._parse_user_path(output_str) if output_str else "")
             .expanduser()
             .resolve()
             if output_str
-            else (input_path / "extracted_assets")
+            else (input_path / DEFAULT_OUTPUT_NAMES[self.output_format])
         )
 
         parent = output_path.parent
@@ -167,11 +842,17 @@ class ModAssetsExtractor:
         if output_path.exists() and not os.access(output_path, os.W_OK):
             raise PermissionError(f"Output dir not writable: {output_path}")
 
-        if output_path.exists():
-            msg = f"[WARNING] Output directory exists. Clear it?"
+        if output_path.exists() and not self.incremental:
+            if self.output_format == "zip":
+                if output_path.is_dir():
+                    raise IsADirectoryError(f"Output is a directory: {output_path}")
+                msg = f"[WARNING] Output archive exists. Overwrite it?"
+            else:
+                msg = f"[WARNING] Output directory exists. Clear it?"
             if not (batch or self._confirm_action(msg)):
                 raise SystemExit("Operation cancelled.")
-            shutil.rmtree(output_path)
+            if output_path.is_dir():
+                shutil.rmtree(output_path)
 
         return input_path, output_path
 
@@ -212,39 +893,470 @@ class ModAssetsExtractor:
             except (FileNotFoundError, NotADirectoryError, PermissionError) as e:
                 print(f"[ERROR] {e}\nPlease try again.\n")
 
-    def run(self, input_path: Path, output_path: Path, batch: bool = False):
-        output_path.mkdir(parents=True, exist_ok=True)
+    def _process_top_level(
+        self, index: int, total: int, jar: Path, output_path: Path
+    ) -> Tuple[Path, bool, _JarRecord]:
+        header = f"\n--- Processing {index}/{total} ---"
+        record = _JarRecord()
+        if self.jobs == 1:
+            print(header)
+            return jar, self._extract_jar(jar, output_path, record), record
+
+        # Buffer this JAR's log lines and emit them as one block.
+        self._local.buffer = []
+        try:
+            return jar, self._extract_jar(jar, output_path, record), record
+        finally:
+            buffer, self._local.buffer = self._local.buffer, None
+            with self._lock:
+                print(header)
+                for level, message in buffer:
+                    self.logger.log(level, message)
+
+    def _process_jars(
+        self, jars: List[Path], output_path: Path
+    ) -> List[Tuple[Path, bool, _JarRecord]]:
+        """Extract top-level JARs, on a thread pool when jobs > 1."""
+        total = len(jars)
+        if self.jobs == 1:
+            return [
+                self._process_top_level(i, total, jar, output_path)
+                for i, jar in enumerate(jars, 1)
+            ]
+        if self.executor is not None:
+            return self._run_on(self.executor, jars, output_path)
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            return self._run_on(pool, jars, output_path)
+
+    def _run_on(
+        self, pool: ThreadPoolExecutor, jars: List[Path], output_path: Path
+    ) -> List[Tuple[Path, bool, _JarRecord]]:
+        futures = [
+            pool.submit(self._process_top_level, i, len(jars), jar, output_path)
+            for i, jar in enumerate(jars, 1)
+        ]
+        # In submission order, so summaries and logs do not depend on timing.
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
 
+    @staticmethod
+    def _load_manifest(output_path: Path) -> dict:
+        try:
+            data = json.loads((output_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+            if data.get("version") == MANIFEST_VERSION:
+                return data
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {"version": MANIFEST_VERSION, "jars": {}, "nested": {}}
+
+    def _is_unchanged(self, jar: Path, entry: dict) -> bool:
+        """Compare a JAR with its manifest entry; hash only if mtime moved."""
+        st = jar.stat()
+        if not entry.get("ok") or st.st_size != entry["size"]:
+            return False
+        if st.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if entry["sha256"] is None or self._hash_file(jar) != entry["sha256"]:
+            return False
+        entry["mtime_ns"] = st.st_mtime_ns
+        return True
+
+    @staticmethod
+    def _remove_outputs(output_path: Path, paths: Set[str]) -> None:
+        """Delete stale output files and any directories left empty."""
+        for rel in sorted(paths):
+            target = output_path / rel
+            try:
+                target.unlink()
+            except FileNotFoundError:
+                pass
+            parent = target.parent
+            while parent != output_path:
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break
+                parent = parent.parent
+
+    def _update_manifest(
+        self,
+        input_path: Path,
+        output_path: Path,
+        old: dict,
+        unchanged: Dict[str, dict],
+        results: List[Tuple[Path, bool, _JarRecord]],
+    ) -> int:
+        """Write the manifest for this run and remove outputs nobody owns.
+
+        Returns the number of JARs that disappeared since the last run.
+        """
+        jars = dict(unchanged)
+        for jar, ok, record in results:
+            st = jar.stat()
+            jars[jar.relative_to(input_path).as_posix()] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                # Only --incremental runs compare hashes; without a hash a
+                # touched JAR is simply extracted again.
+                "sha256": self._hash_file(jar) if ok and self.incremental else None,
+                "ok": ok,
+                "files": sorted(record.files),
+                "nested": sorted(record.nested),
+            }
+        # A nested JAR is walked (and its children recorded) only by the first
+        # JAR that bundles it, so follow the links from every remaining JAR.
+        nested = {}
+        pending = [key for entry in jars.values() for key in entry["nested"]]
+        while pending:
+            key = pending.pop()
+            if key in nested:
+                continue
+            if key in self._nested_files:
+                nested[key] = {
+                    "files": sorted(self._nested_files[key]),
+                    "nested": sorted(self._nested_links[key]),
+                }
+            elif key in old["nested"]:
+                nested[key] = old["nested"][key]
+            else:
+                continue
+            pending.extend(nested[key]["nested"])
+        nested = dict(sorted(nested.items()))
+
+        def owned(manifest: dict) -> Set[str]:
+            paths = set()
+            for group in ("jars", "nested"):
+                for entry in manifest[group].values():
+                    paths.update(entry["files"])
+            return paths
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "filters": self._filter_signature(),
+            "jars": jars,
+            "nested": nested,
+        }
+        self._remove_outputs(output_path, owned(old) - owned(manifest))
+        if self._store is not None:
+            self._store.collect_garbage(output_path, owned(manifest))
+        tmp = output_path / (MANIFEST_NAME + ".tmp")
+        tmp.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+        os.replace(tmp, output_path / MANIFEST_NAME)
+        return len(set(old["jars"]) - set(jars))
+
+    def scan_jars(self, input_path: Path) -> List[Path]:
         # Scan JARs: recursive or top-level only
         if self.recursive:
-            jars = list(input_path.rglob("*.jar"))
+            jars = sorted(input_path.rglob("*.jar"))
         else:
-            jars = list(input_path.glob("*.jar"))
+            jars = sorted(input_path.glob("*.jar"))
 
         if not jars:
             raise FileNotFoundError("No '.jar' files found.")
+        return jars
+
+    def _inventory_archive(
+        self,
+        buf,
+        label: str,
+        parent: Optional[str],
+        records: List[dict],
+        seen: Set[str],
+    ) -> None:
+        """Append records for the archive in ``buf`` and the JARs nested in it."""
+        record = {"mod": label, "parent": parent, "files": 0, "bytes": 0}
+        namespaces: Dict[str, List[dict]] = {}
+        records.append(record)
+        try:
+            entries = list(iter_central_directory(buf))
+        except (zipfile.BadZipFile, struct.error) as e:
+            record["error"] = str(e)
+            return
+
+        nested = []
+        for entry in entries:
+            if not entry.name.startswith("assets/"):
+                if entry.name.endswith(".jar") and self._is_nested_jar(entry.name):
+                    nested.append(entry)
+                continue
+            if entry.name.endswith("/"):
+                continue
+            if self.has_filters and not self._wanted(entry.name):
+                self.filtered_count += 1
+                continue
+            parts = entry.name.split("/", 2)
+            namespace, path = (
+                (parts[1], parts[2]) if len(parts) == 3 else ("", parts[1])
+            )
+            namespaces.setdefault(namespace, []).append(
+                {
+                    "path": path,
+                    "size": entry.file_size,
+                    "compressed_size": entry.compress_size,
+                    "crc": f"{entry.crc:08x}",
+                }
+            )
+            record["files"] += 1
+            record["bytes"] += entry.file_size
+        record["namespaces"] = namespaces
+
+        for entry in nested:
+            key = f"nested:{entry.crc:08x}:{entry.file_size}"
+            if key in seen:
+                continue
+            seen.add(key)
+            nested_label = f"{label}!/{entry.name}"
+            try:
+                with memoryview(read_entry(buf, entry)) as data:
+                    self._inventory_archive(data, nested_label, label, records, seen)
+            except (zipfile.BadZipFile, NotImplementedError, struct.error) as e:
+                records.append({"mod": nested_label, "parent": label, "error": str(e)})
+
+    def inventory_jar(
+        self, jar: Path, label: str, seen: Optional[Set[str]] = None
+    ) -> List[dict]:
+        """Inventory one JAR and its nested JARs (see ``inventory``).
+
+        Nested JARs whose content is already in ``seen`` are skipped.
+        """
+        records: List[dict] = []
+        try:
+            with open(jar, "rb") as fp, mmap.mmap(
+                fp.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm:
+                self._inventory_archive(
+                    mm, label, None, records, set() if seen is None else seen
+                )
+        except (OSError, ValueError) as e:
+            records.append({"mod": label, "parent": None, "error": str(e)})
+        return records
+
+    def inventory(self, input_path: Path) -> List[dict]:
+        """List assets in every JAR from the ZIP central directories alone.
+
+        Archives are memory-mapped; only nested JARs are ever decompressed,
+        and only to read their own central directories.
+        """
+        records: List[dict] = []
+        seen: Set[str] = set()
+        with self.metrics.phase("scan"):
+            jars = self.scan_jars(input_path)
+        with self.metrics.phase("inventory"):
+            for jar in jars:
+                label = jar.relative_to(input_path).as_posix()
+                start = time.perf_counter()
+                found = self.inventory_jar(jar, label, seen)
+                self.metrics.item(
+                    "jar",
+                    label,
+                    time.perf_counter() - start,
+                    archives=len(found),
+                    files=sum(r.get("files", 0) for r in found),
+                    bytes_in=jar.stat().st_size,
+                )
+                records.extend(found)
+        self.metrics.count("inventory", jars=len(jars), archives=len(records))
+        return records
+
+    @staticmethod
+    def write_inventory(records: List[dict], dest: str, fmt: str) -> None:
+        """Write ``records`` as JSON or one CSV row per asset ('-' = stdout)."""
+        if fmt == "json":
+            # No indent: the C encoder only handles compact output.
+            text = json.dumps(
+                {"version": INVENTORY_VERSION, "mods": records}, separators=(",", ":")
+            )
+            text += "\n"
+        else:
+            out = io.StringIO()
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(
+                ["mod", "parent", "namespace", "path", "size", "compressed_size", "crc"]
+            )
+            for record in records:
+                for namespace, files in record.get("namespaces", {}).items():
+                    for f in files:
+                        writer.writerow(
+                            [
+                                record["mod"],
+                                record["parent"] or "",
+                                namespace,
+                                f["path"],
+                                f["size"],
+                                f["compressed_size"],
+                                f["crc"],
+                            ]
+                        )
+            text = out.getvalue()
+        if dest == "-":
+            sys.stdout.write(text)
+        else:
+            Path(dest).write_text(text, encoding="utf-8")
+
+    def run(
+        self, input_path: Path, output_path: Path, batch: bool = False
+    ) -> ExtractResult:
+        if self.output_format == "dir":
+            output_path.mkdir(parents=True, exist_ok=True)
+
+        with self.metrics.phase("scan"):
+            jars = self.scan_jars(input_path)
+        self.metrics.count("scan", jars=len(jars))
+
+        old = self._load_manifest(output_path)
+        unchanged: Dict[str, dict] = {}
+        filters_changed = old.get("filters", [[], [], []]) != self._filter_signature()
+        if self.incremental and filters_changed and old["jars"]:
+            print("[INFO] Filters changed since the last run; re-extracting all.")
+        if self.incremental and not filters_changed:
+            pending = []
+            with self.metrics.phase("check_unchanged"):
+                for jar in jars:
+                    entry = old["jars"].get(jar.relative_to(input_path).as_posix())
+                    if entry and self._is_unchanged(jar, entry):
+                        unchanged[jar.relative_to(input_path).as_posix()] = entry
+                    else:
+                        pending.append(jar)
+            self.metrics.count("check_unchanged", unchanged=len(unchanged))
+            jars = pending
+            # Nested JARs already on disk stay there unless no JAR uses them.
+            self.processed_jars.update(old["nested"])
 
         if not batch:
-            print(f"\n[INFO] Found {len(jars)} JAR(s).")
+            skipped = f" ({len(unchanged)} unchanged)" if self.incremental else ""
+            print(f"\n[INFO] Found {len(jars)} JAR(s) to extract{skipped}.")
             if not self._confirm_action("Proceed?", batch):
                 raise SystemExit("Cancelled.")
 
+        if self.dedup:
+            self._store = _ObjectStore(output_path / OBJECTS_DIR_NAME)
+
         print("\n[INFO] Starting extraction...\n")
-        success = error = 0
-        for i, jar in enumerate(jars, 1):
-            print(f"\n--- Processing {i}/{len(jars)} ---")
-            if self._extract_jar(jar, output_path):
-                success += 1
-            else:
-                error += 1
+        if self.output_format == "zip":
+            # Build next to the target so a failed run keeps the old archive.
+            tmp = output_path.with_name(output_path.name + ".tmp")
+            self._archive = ZipStreamWriter(tmp)
+            try:
+                with self.metrics.phase("extract"):
+                    if self.jobs > 1:
+                        with tempfile.TemporaryDirectory(
+                            prefix=".parts_", dir=output_path.parent
+                        ) as parts:
+                            self._parts_dir = Path(parts)
+                            try:
+                                results = self._process_jars(jars, output_path)
+                                self._merge_parts(results)
+                            finally:
+                                self._parts_dir = None
+                    else:
+                        results = self._process_jars(jars, output_path)
+                with self.metrics.phase("finalize"):
+                    entries = len(self._archive)
+                    self._archive.close()
+            except BaseException:
+                self._archive.abort()
+                raise
+            finally:
+                self._archive = None
+            os.replace(tmp, output_path)
+            removed = 0
+        else:
+            with self.metrics.phase("extract"):
+                results = self._process_jars(jars, output_path)
+            with self.metrics.phase("finalize"):
+                removed = self._update_manifest(
+                    input_path, output_path, old, unchanged, results
+                )
+        success = sum(ok for _, ok, _ in results)
+        error = len(results) - success
 
         print("\n" + "=" * 40)
         print("Extraction completed.")
         print(f"Successful: {success}")
         print(f"Failed:     {error}")
+        if self.has_filters:
+            print(f"Filtered:   {self.filtered_count} member(s)")
+        if self.incremental:
+            print(f"Unchanged:  {len(unchanged)}")
+            print(f"Removed:    {removed}")
+        if self._store is not None:
+            print(f"Dedup:      {self._store.summary()}")
+        if self.output_format == "zip":
+            print(
+                f"Archive:    {entries} file(s), "
+                f"{self.archived_bytes / 1048576:.1f} MB "
+                f"({self.recompressed_count} recompressed)"
+            )
         print(f"Assets saved to: {output_path}")
         print("=" * 40)
 
+        return ExtractResult(
+            output_path,
+            [jar for jar, ok, _ in results if ok],
+            [jar for jar, ok, _ in results if not ok],
+            len(unchanged),
+            removed,
+            self.filtered_count,
+            sum(len(record.files) for _, _, record in results)
+            + sum(len(files) for files in self._nested_files.values()),
+        )
+
+
+def extract(
+    input_dir,
+    output=None,
+    output_format: str = "dir",
+    recursive: bool = False,
+    jobs: int = 1,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    namespaces: Iterable[str] = (),
+    incremental: bool = False,
+    dedup: bool = False,
+    nested_memory_limit: int = DEFAULT_NESTED_MEMORY_MB,
+    log_file: Optional[str] = None,
+    metrics: Optional[Metrics] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> ExtractResult:
+    """Extract the assets of the JARs in ``input_dir`` without prompting.
+
+    Same as ``-i input_dir -o output`` on the command line: an existing
+    output is replaced unless ``incremental``. ``nested_memory_limit`` is in
+    MB. Bad paths raise FileNotFoundError, NotADirectoryError or
+    PermissionError; ``executor`` is a thread pool of ``jobs`` workers to
+    share between calls.
+    """
+    if output_format == "zip" and (incremental or dedup):
+        raise ValueError("incremental and dedup need output_format 'dir'")
+    extractor = ModAssetsExtractor(
+        log_file=log_file,
+        recursive=recursive,
+        jobs=jobs,
+        nested_memory_limit=nested_memory_limit << 20,
+        incremental=incremental,
+        include=include,
+        exclude=exclude,
+        namespaces=namespaces,
+        dedup=dedup,
+        output_format=output_format,
+        metrics=metrics,
+        executor=executor,
+    )
+    # validate_paths() parses shell-style input; quote so any path survives.
+    inp, out = extractor.validate_paths(
+        shlex.quote(str(input_dir)),
+        shlex.quote(str(output)) if output else None,
+        batch=True,
+    )
+    return extractor.run(inp, out, batch=True)
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -261,13 +1373,145 @@ def main():
         action="store_true",
         help="Recursively scan subdirectories for JAR files",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Process top-level JARs on N worker threads (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Only extract members matching GLOB, e.g. 'assets/*/textures/gui/**' "
+        "('*' also matches '/'; repeatable)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Skip members matching GLOB (repeatable)",
+    )
+    parser.add_argument(
+        "--namespace",
+        action="append",
+        default=[],
+        metavar="NS",
+        help="Only extract assets/<NS>/ (repeatable)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep the output directory and only re-extract new or changed JARs",
+    )
+    parser.add_argument(
+        "--list",
+        metavar="FILE",
+        help="Write an inventory of assets per mod and namespace to FILE ('-' for "
+        "stdout) from the JAR directories alone, without extracting",
+    )
+    parser.add_argument(
+        "--list-format",
+        choices=("json", "csv"),
+        help="Inventory format (default: from the FILE extension, else json)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=sorted(DEFAULT_OUTPUT_NAMES),
+        default="dir",
+        help="'dir' writes loose files; 'zip' copies members, still compressed, "
+        "into one archive with the same folder layout (default: dir)",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Store each distinct file once under "
+        f"<output>/{OBJECTS_DIR_NAME} and hardlink the mod folders to it "
+        "(edit copies, not the links)",
+    )
+    parser.add_argument(
+        "--nested-memory-limit",
+        type=int,
+        default=DEFAULT_NESTED_MEMORY_MB,
+        help="MB of compressed nested JARs to hold in memory before "
+        f"spilling to temp files (default: {DEFAULT_NESTED_MEMORY_MB})",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Write per-phase and per-JAR timings, byte counts and peak memory "
+        "as JSON",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Write cProfile data of the run to FILE (main thread only; use "
+        "--jobs 1 to see the extraction itself)",
+    )
+    parser.add_argument(
+        "--jobs-file",
+        metavar="FILE",
+        help="Run the pack and extract jobs listed in a JSON or YAML file in "
+        "this process (see batch.py); other options are ignored",
+    )
     parser.add_argument("--log-file", help="Enable detailed logging to a file")
     args = parser.parse_args()
+    if args.output_format == "zip" and (args.incremental or args.dedup):
+        parser.error("--incremental and --dedup need --output-format dir")
+
+    metrics = Metrics("extract_assets_from_mod")
+    try:
+        with profiled(args.profile):
+            _run(parser, args, metrics)
+    finally:
+        if args.metrics:
+            metrics.write(args.metrics)
 
-    extractor = ModAssetsExtractor(log_file=args.log_file, recursive=args.recursive)
+
+def _run(parser, args, metrics):
+    if args.jobs_file:
+        from batch import run_job_file  # batch imports this module
+
+        sys.exit(0 if run_job_file(args.jobs_file, metrics) else 1)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    extractor = ModAssetsExtractor(
+        log_file=args.log_file,
+        recursive=args.recursive,
+        jobs=jobs,
+        nested_memory_limit=args.nested_memory_limit << 20,
+        incremental=args.incremental,
+        include=args.include,
+        exclude=args.exclude,
+        namespaces=args.namespace,
+        dedup=args.dedup,
+        output_format=args.output_format,
+        metrics=metrics,
+    )
 
     try:
-        if args.interactive:
+        if args.list:
+            if not args.input:
+                parser.error("--list needs --input")
+            fmt = args.list_format or (
+                "csv" if args.list.lower().endswith(".csv") else "json"
+            )
+            start = time.perf_counter()
+            records = extractor.inventory(extractor.validate_input(args.input))
+            extractor.write_inventory(records, args.list, fmt)
+            failed = sum("error" in r for r in records)
+            files = sum(r.get("files", 0) for r in records)
+            size = sum(r.get("bytes", 0) for r in records)
+            print(
+                f"[INFO] Listed {len(records)} archive(s) ({failed} failed), "
+                f"{files} asset(s), {size / 1048576:.1f} MB "
+                f"in {time.perf_counter() - start:.2f}s",
+                file=sys.stderr,
+            )
+        elif args.interactive:
             inp, out = extractor.interactive_mode(args.input, args.output)
             extractor.run(inp, out, batch=False)
         elif args.input:
@@ -0,0 +1,166 @@
+"""
+Build Metrics
+
+Lightweight instrumentation shared by the build tools: wall and CPU time and
+counters per phase, plus one record per processed item (a JAR, an archive
+variant). ``--metrics FILE`` writes it all as JSON so runs can be
+compared over time; ``--profile FILE`` wraps the run in cProfile.
+
+Counters named ``bytes_in`` and ``bytes_out`` get a derived ``ratio`` (out / in)
+and input throughput in the report.
+
+Memory is only tracked for the whole process: a phase's
+``process_peak_rss_mb`` is the process peak so far when the phase ended, so it
+never drops, and a phase that raised it shows up as a step over the previous
+one.
+"""
+
+import cProfile
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_VERSION = 2
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Peak resident set size of this process (or its reaped children)."""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def _cpu_time() -> float:
+    """CPU seconds of this process and its reaped children (worker pools)."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def _derived(record: dict) -> dict:
+    seconds = record.get("seconds", 0.0)
+    bytes_in = record.get("bytes_in")
+    bytes_out = record.get("bytes_out")
+    if bytes_in and bytes_out is not None:
+        record["ratio"] = round(bytes_out / bytes_in, 4)
+    if bytes_in and seconds > 0:
+        record["throughput_mb_s"] = round(bytes_in / seconds / (1 << 20), 2)
+    return record
+
+
+class Metrics:
+    """Phase timers, counters and per-item records for one tool run.
+
+    Safe to update from worker threads. Phases may repeat (times add up) and
+    nest (an outer phase includes the time of inner ones).
+    """
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self._lock = threading.Lock()
+        self._phases: Dict[str, dict] = {}
+        self._items: List[dict] = []
+        self._started = time.time()
+        self._start = time.perf_counter()
+        self._cpu_start = _cpu_time()
+
+    def _phase(self, name: str) -> dict:
+        record = self._phases.get(name)
+        if record is None:
+            record = self._phases[name] = {"seconds": 0.0, "cpu_seconds": 0.0}
+        return record
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block; CPU time covers all threads and finished workers."""
+        start = time.perf_counter()
+        cpu = _cpu_time()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            cpu_elapsed = _cpu_time() - cpu
+            with self._lock:
+                record = self._phase(name)
+                record["seconds"] += elapsed
+                record["cpu_seconds"] += cpu_elapsed
+                record["process_peak_rss_mb"] = peak_rss_mb()
+
+    def count(self, phase: str, **counters) -> None:
+        """Add ``counters`` (e.g. files=1, bytes_in=n) to ``phase``."""
+        with self._lock:
+            record = self._phase(phase)
+            for key, value in counters.items():
+                record[key] = record.get(key, 0) + value
+
+    def item(self, kind: str, name: str, seconds: float, **fields) -> None:
+        """Record one processed item, e.g. a JAR with its own counters."""
+        with self._lock:
+            self._items.append(
+                _derived({"kind": kind, "name": name, "seconds": seconds, **fields})
+            )
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            phases = {
+                name: _derived(
+                    {
+                        k: round(v, 4) if isinstance(v, float) else v
+                        for k, v in record.items()
+                    }
+                )
+                for name, record in self._phases.items()
+            }
+            items = [
+                dict(item, seconds=round(item["seconds"], 4)) for item in self._items
+            ]
+        return {
+            "version": METRICS_VERSION,
+            "tool": self.tool,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self._started)),
+            "seconds": round(time.perf_counter() - self._start, 4),
+            "cpu_seconds": round(_cpu_time() - self._cpu_start, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_children_mb": peak_rss_mb(children=True),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "phases": phases,
+            "items": items,
+        }
+
+    def write(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.as_dict(), indent=1) + "\n", encoding="utf-8")
+
+
+@contextmanager
+def profiled(path):
+    """Run the block under cProfile and dump pstats data to ``path``.
+
+    Only the calling thread is profiled; worker threads show up as waits.
+    Does nothing when ``path`` is empty.
+    """
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -0,0 +1,142 @@
+"""
+Object Cache
+
+A size-bounded, content-addressed on-disk store used by the build tools to
+remember expensive results (compressed entries, optimized images) between runs.
+
+Layout:
+    <root>/index.json          key -> {"size", "crc", "used", "meta"}
+    <root>/objects/ab/abcd...  raw bytes for each key
+
+Least recently used objects are evicted when the index is saved. Objects are
+read and written outside the lock, so worker threads only wait on each other
+for the index bookkeeping, and every hit is checked against the CRC-32 of the
+bytes that were stored.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+INDEX_VERSION = 2
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class ObjectCache:
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        try:
+            data = json.loads((self.root / "index.json").read_text(encoding="utf-8"))
+            if data.get("version") == INDEX_VERSION:
+                return data["objects"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return {}
+
+    def _object_path(self, key: str) -> Path:
+        return self.root / "objects" / key[:2] / key
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._index
+
+    def get(self, key: str) -> Optional[Tuple[dict, bytes]]:
+        """Return (meta, data) for key, or None on a miss.
+
+        A missing, truncated or corrupt object counts as a miss and is
+        dropped from the index.
+        """
+        with self._lock:
+            record = self._index.get(key)
+        data = None
+        if record is not None:
+            try:
+                data = self._object_path(key).read_bytes()
+            except OSError:
+                pass
+            if data is not None and (
+                len(data) != record["size"] or zlib.crc32(data) != record["crc"]
+            ):
+                data = None
+        with self._lock:
+            if data is not None:
+                record["used"] = time.time()
+                self.hits += 1
+                return record["meta"], data
+            if record is not None and self._index.get(key) is record:
+                del self._index[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, data: bytes, meta: dict) -> None:
+        if len(data) > self.max_bytes:
+            return
+        # Writes are atomic and keys name their content, so threads storing
+        # the same key at once write the same bytes.
+        _atomic_write(self._object_path(key), data)
+        record = {
+            "size": len(data),
+            "crc": zlib.crc32(data),
+            "used": time.time(),
+            "meta": meta,
+        }
+        with self._lock:
+            self._index[key] = record
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(record["size"] for record in self._index.values())
+
+    def save(self) -> int:
+        """Evict least recently used objects over the limit and write the index.
+
+        Returns the number of evicted objects.
+        """
+        with self._lock:
+            total = self.total_bytes
+            evicted = 0
+            for key, record in sorted(
+                self._index.items(), key=lambda kv: kv[1]["used"]
+            ):
+                if total <= self.max_bytes:
+                    break
+                self._object_path(key).unlink(missing_ok=True)
+                del self._index[key]
+                total -= record["size"]
+                evicted += 1
+            payload = {"version": INDEX_VERSION, "objects": self._index}
+            _atomic_write(
+                self.root / "index.json",
+                json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+            )
+            return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            if self.root.exists():
+                shutil.rmtree(self.root)
+            self._index = {}
@@ -9,19 +9,87 @@ Expected project structure:
 ├── LICENSE
 ├── pack/
 └── utils/
-    └── pack_resourcepack.py
+    ├── pack_resourcepack.py
+    ├── batch.py
+    ├── metrics.py
+    ├── object_cache.py
+    ├── pack_validator.py
+    ├── pngtools.py
+    ├── watcher.py
+    └── ziptools.py
+
+Tools can call pack() instead of running the script; it never prompts and
+returns a PackResult. --jobs-file runs many packs in one process.
 
 Co-developed with Qwen3-Max
 """
 
 import sys
-import zipfile
-import shutil
 import logging
 import os
 import shlex
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import argparse
+import hashlib
+import json
+import time
+import zipfile
+import zlib
+from functools import partial
+
+from metrics import Metrics, profiled
+from object_cache import ObjectCache
+from pack_validator import validate_pack
+import pngtools
+from watcher import DirectoryWatcher
+from ziptools import (
+    DEFAULT_LEVEL,
+    CompressedEntry,
+    ZipStreamWriter,
+    compress_data,
+    dos_date_time,
+)
+
+CACHE_DIR_NAME = ".pack_cache"
+DEFAULT_CACHE_MB = 512
+# Quiet period before --watch applies a burst of changes.
+DEFAULT_DEBOUNCE_MS = 150
+BUILD_MANIFEST_NAME = "builds.json"
+BUILD_MANIFEST_VERSION = 1
+
+# Entry metadata of --reproducible builds (see source_date_time()).
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+REPRODUCIBLE_MODE = 0o644
+
+PANORAMA_DIR = "assets/minecraft/textures/gui/title/background"
+
+# Exclusion profiles selectable with --variant. Patterns are matched against
+# POSIX archive paths with fnmatch, so "*" also crosses "/".
+VARIANT_PROFILES = {
+    "full": {"include": (), "exclude": ()},
+    "no-panorama": {"include": (), "exclude": (PANORAMA_DIR + "/*",)},
+}
+
+
+@dataclass
+class PackVariant:
+    """One output archive and the rules selecting its entries."""
+
+    name: str
+    output_path: Path
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+
+    def accepts(self, arcname: str) -> bool:
+        if self.include and not any(fnmatchcase(arcname, p) for p in self.include):
+            return False
+        return not any(fnmatchcase(arcname, p) for p in self.exclude)
 
 
 def setup_logger(log_file=None):
@@ -66,27 +134,1007 @@ def parse_user_path(raw):
     return Path(os.path.expanduser(path_str)).resolve()
 
 
-def copy_directory(src, dst):
-    """Recursively copy directory (safe, Python <3.8 compatible)."""
-    dst.mkdir(parents=True, exist_ok=True)
-    for item in src.iterdir():
-        if item.is_dir():
-            copy_directory(item, dst / item.name)
+class CompressionPolicy:
+    """Pick STORED or a deflate level for each entry.
+
+    Formats that are compressed already (PNG, OGG) are trial-compressed on a
+    sample first; if deflate would save less than ``MIN_SAVING`` they are
+    stored, which also spares the client from inflating them on load.
+    With ``max_compression`` a sample of each deflated entry is also tried at
+    level 9, and the entry only gets level 9 if that beats the default level
+    by ``MIN_LEVEL9_GAIN``; elsewhere level 9 costs CPU for nothing.
+    """
+
+    STORE_EXTENSIONS = {".ogg", ".jpg", ".jpeg"}
+    SAMPLE_EXTENSIONS = {".png"}
+    SAMPLE_SIZE = 64 * 1024
+    MIN_SAVING = 0.05
+    MIN_LEVEL9_GAIN = 0.01
+    LEVEL_SAMPLE_SIZE = 16 * 1024
+
+    def __init__(self, max_compression=False):
+        self.max_compression = max_compression
+        self.level = DEFAULT_LEVEL
+
+    @property
+    def signature(self):
+        """Settings string; part of every cache key."""
+        signature = f"adaptive-{self.level}-{self.MIN_SAVING}-{self.SAMPLE_SIZE}"
+        if self.max_compression:
+            signature += f"-max{self.MIN_LEVEL9_GAIN}-{self.LEVEL_SAMPLE_SIZE}"
+        return signature
+
+    @staticmethod
+    def _sample(data, size):
+        if len(data) > size:
+            start = (len(data) - size) // 2
+            data = data[start : start + size]
+        return data
+
+    @staticmethod
+    def _deflated_size(data, level):
+        trial = zlib.compressobj(level, zlib.DEFLATED, -15)
+        return len(trial.compress(data)) + len(trial.flush())
+
+    def _worth_deflating(self, data):
+        data = self._sample(data, self.SAMPLE_SIZE)
+        if not data:
+            return False
+        return self._deflated_size(data, 1) <= len(data) * (1 - self.MIN_SAVING)
+
+    def _deflate(self, data):
+        if not self.max_compression:
+            return compress_data(data, zipfile.ZIP_DEFLATED, self.level)
+        if len(data) <= self.LEVEL_SAMPLE_SIZE:
+            # The trial would be the whole entry: keep its result.
+            default = compress_data(data, zipfile.ZIP_DEFLATED, self.level)
+            best = compress_data(data, zipfile.ZIP_DEFLATED, 9)
+            if best.compress_size <= default.compress_size * (1 - self.MIN_LEVEL9_GAIN):
+                return best
+            return default
+        sample = self._sample(data, self.LEVEL_SAMPLE_SIZE)
+        default = self._deflated_size(sample, self.level)
+        best = self._deflated_size(sample, 9)
+        level = 9 if best <= default * (1 - self.MIN_LEVEL9_GAIN) else self.level
+        return compress_data(data, zipfile.ZIP_DEFLATED, level)
+
+    def compress(self, arcname, data):
+        ext = os.path.splitext(arcname)[1].lower()
+        if ext in self.STORE_EXTENSIONS or (
+            ext in self.SAMPLE_EXTENSIONS and not self._worth_deflating(data)
+        ):
+            return compress_data(data, zipfile.ZIP_STORED)
+        entry = self._deflate(data)
+        if entry.compress_size >= entry.file_size:
+            return compress_data(data, zipfile.ZIP_STORED)
+        return entry
+
+
+def format_compression_stats(stats):
+    """Render {ext: [files, raw, packed, cpu]} as a text table."""
+    lines = [
+        f"{'ext':<10} {'files':>6} {'raw KB':>10} {'zip KB':>10} "
+        f"{'saved KB':>10} {'CPU s':>8} {'KB/CPU-s':>10}"
+    ]
+    for ext, (files, raw, packed, cpu) in sorted(stats.items()):
+        saved = raw - packed
+        rate = f"{saved / 1024 / cpu:>10.0f}" if cpu > 0 else f"{'-':>10}"
+        lines.append(
+            f"{ext:<10} {files:>6} {raw / 1024:>10.1f} {packed / 1024:>10.1f} "
+            f"{saved / 1024:>10.1f} {cpu:>8.3f} {rate}"
+        )
+    return "\n".join(lines)
+
+
+class PngOptimizer:
+    """Optional stage that losslessly re-encodes PNGs before compression.
+
+    Results are keyed by the SHA-256 of the input, so unchanged textures are
+    only optimized once. The encoder is pure Python, so ``prepare`` spreads
+    uncached files over a process pool: ``pool`` when given, else one of
+    its own per call.
+    """
+
+    VERSION = "pngopt-1"
+
+    def __init__(self, cache=None, pool=None):
+        self.cache = cache
+        self.pool = pool
+        self._results = {}
+        self.computed = 0
+        self.optimized = 0
+        self.saved = 0
+
+    def _key(self, data):
+        digest = hashlib.sha256(self.VERSION.encode() + b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _store(self, key, result):
+        if self.cache is None:
+            self._results[key] = result
+        else:
+            self.cache.put(key, result or b"", {"optimized": result is not None})
+
+    def _known(self, key):
+        return key in self._results or (self.cache is not None and key in self.cache)
+
+    def prepare(self, paths, jobs, logger):
+        """Optimize every path whose result is not cached yet."""
+        pending = {}
+        for path in paths:
+            key = self._key(path.read_bytes())
+            if not self._known(key):
+                pending.setdefault(key, path)
+        if not pending:
+            return
+        logger.info(f"Optimizing {len(pending)} PNG file(s)...")
+        if self.pool is not None and len(pending) > 1:
+            self._store_all(self.pool, pending)
+        elif jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                self._store_all(pool, pending)
+        else:
+            for key, path in pending.items():
+                self._store(key, pngtools.optimize_png_file(path))
+        self.computed += len(pending)
+        if self.cache is not None:
+            self.cache.save()
+
+    def _store_all(self, pool, pending):
+        results = pool.map(pngtools.optimize_png_file, pending.values())
+        for key, result in zip(pending, results):
+            self._store(key, result)
+
+    def apply(self, data):
+        """Return the optimized bytes for data (or data itself)."""
+        key = self._key(data)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is None:
+                result = pngtools.optimize_png(data)
+                self._store(key, result)
+            else:
+                meta, payload = cached
+                result = payload if meta["optimized"] else None
+        else:
+            if key not in self._results:
+                self._store(key, pngtools.optimize_png(data))
+            result = self._results[key]
+        if result is None:
+            return data
+        self.optimized += 1
+        self.saved += len(data) - len(result)
+        return result
+
+    def report(self, logger):
+        logger.info(
+            f"PNG optimization: {self.optimized} file(s) smaller, "
+            f"saved {self.saved / 1024:.1f} KB ({self.computed} newly optimized)"
+        )
+        if self.cache is not None:
+            self.cache.save()
+
+
+def source_date_time():
+    """Entry timestamp of reproducible builds.
+
+    Honors SOURCE_DATE_EPOCH (https://reproducible-builds.org/specs/
+    source-date-epoch/), read as UTC so the result does not depend on the
+    build machine's timezone; defaults to the ZIP epoch.
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if not epoch:
+        return ZIP_EPOCH
+    return max(tuple(time.gmtime(int(epoch))[:6]), ZIP_EPOCH)
+
+
+def entry_stamp(st, fixed_date_time=None):
+    """(date_time, mode) to record for a file; fixed when reproducible."""
+    if fixed_date_time is not None:
+        return fixed_date_time, REPRODUCIBLE_MODE
+    return dos_date_time(st.st_mtime), st.st_mode & 0o777
+
+
+class BuildManifest:
+    """Remembers what each archive was built from, to skip no-op rebuilds.
+
+    A build's fingerprint hashes its settings and, per entry, the arcname,
+    content SHA-256, timestamp and mode. Content hashes are reused while a
+    file's size and mtime are unchanged, so checking an unchanged pack reads
+    no file contents. An archive is up to date if its fingerprint matches and
+    the file on disk is still the one that build wrote.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") != BUILD_MANIFEST_VERSION:
+                raise ValueError("old manifest")
+            self._files = data["files"]
+            self._outputs = data["outputs"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            self._files = {}
+            self._outputs = {}
+        self._live = set()
+
+    def file_digest(self, file_path, st):
+        key = str(file_path)
+        known = self._files.get(key)
+        if known is not None and known[:2] == [st.st_size, st.st_mtime_ns]:
+            return known[2]
+        digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        self._files[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    @staticmethod
+    def fingerprint(settings, entries):
+        """Hash settings and (arcname, digest, date_time, mode) entries."""
+        digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode())
+        for entry in entries:
+            digest.update(json.dumps(entry).encode() + b"\n")
+        return digest.hexdigest()
+
+    def up_to_date(self, output_path, fingerprint):
+        record = self._outputs.get(str(output_path))
+        if record is None or record["fingerprint"] != fingerprint:
+            return False
+        try:
+            st = output_path.stat()
+        except OSError:
+            return False
+        return [st.st_size, st.st_mtime_ns] == [record["size"], record["mtime_ns"]]
+
+    def entry_count(self, output_path):
+        return self._outputs[str(output_path)]["entries"]
+
+    def record(self, output_path, fingerprint, entries):
+        st = output_path.stat()
+        digest = hashlib.sha256()
+        with open(output_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        self._outputs[str(output_path)] = {
+            "fingerprint": fingerprint,
+            "sha256": digest.hexdigest(),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "entries": entries,
+        }
+
+    def save(self, live_files):
+        """Write the manifest, forgetting files that are no longer inputs.
+
+        Inputs of every build saved through this instance stay live, so
+        several packs can share one manifest within a process.
+        """
+        self._live.update(str(path) for path in live_files)
+        self._files = {k: v for k, v in self._files.items() if k in self._live}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "version": BUILD_MANIFEST_VERSION,
+                    "files": self._files,
+                    "outputs": self._outputs,
+                },
+                sort_keys=True,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+
+def make_variants(names, output_path):
+    """Build variants for profile names; extra variants get a name suffix."""
+    variants = []
+    for name in dict.fromkeys(names):
+        profile = VARIANT_PROFILES[name]
+        path = output_path
+        if len(names) > 1 and name != "full":
+            path = output_path.with_name(
+                f"{output_path.stem}_{name}{output_path.suffix}"
+            )
+        variants.append(
+            PackVariant(
+                name, path, tuple(profile["include"]), tuple(profile["exclude"])
+            )
+        )
+    return variants
+
+
+def collect_pack_files(
+    source_dir: Path, logger, extra_files: Optional[Dict[str, Path]] = None
+) -> List[Tuple[str, Path]]:
+    """List (arcname, path) pairs under source_dir, sorted by arcname."""
+    files = {}
+    for root, dirs, names in os.walk(source_dir):
+        dirs.sort()
+        for name in names:
+            file_path = Path(root) / name
+            if not file_path.is_file():
+                continue
+            arcname = file_path.relative_to(source_dir).as_posix()
+            # Basic Zip Slip protection
+            if ".." in arcname.split("/") or arcname.startswith("/"):
+                logger.warning(f"Skipped unsafe path in ZIP: {arcname}")
+                continue
+            files[arcname] = file_path
+    files.update(extra_files or {})
+    return sorted(files.items())
+
+
+def run_validation(
+    source_dir: Path,
+    logger,
+    jobs: int = 1,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> bool:
+    """Validate textures and .mcmeta files; False if any error was found."""
+    start = time.perf_counter()
+    names = [name for name, _ in collect_pack_files(source_dir, logger)]
+    textures = [name for name in names if name.lower().endswith(".png")]
+    metas = [name for name in names if name.endswith(".mcmeta")]
+    issues = validate_pack(source_dir, textures, metas, jobs, executor)
+    errors = 0
+    for issue in issues:
+        if issue.severity == "error":
+            errors += 1
+            logger.error(str(issue))
         else:
-            shutil.copy2(item, dst / item.name)
+            logger.warning(str(issue))
+    logger.info(
+        f"Validated {len(textures)} texture(s) and {len(metas)} .mcmeta file(s) "
+        f"in {time.perf_counter() - start:.2f}s: {errors} error(s), "
+        f"{len(issues) - errors} warning(s)"
+    )
+    return errors == 0
+
+
+def _read_and_compress(item, policy, cache=None, png_optimizer=None):
+    """Return (stat, entry, CPU seconds spent compressing) for one file."""
+    arcname, file_path = item
+    st = file_path.stat()
+    data = file_path.read_bytes()
+    if png_optimizer is not None and arcname.lower().endswith(".png"):
+        data = png_optimizer.apply(data)
+    if cache is not None:
+        digest = hashlib.sha256(policy.signature.encode() + b"\0")
+        digest.update(data)
+        key = digest.hexdigest()
+        cached = cache.get(key)
+        if cached is not None:
+            meta, payload = cached
+            return (
+                st,
+                CompressedEntry(
+                    meta["crc"], meta["file_size"], meta["compress_type"], payload
+                ),
+                0.0,
+            )
+
+    start = time.thread_time()
+    entry = policy.compress(arcname, data)
+    cpu = time.thread_time() - start
+    if cache is not None:
+        cache.put(
+            key,
+            entry.payload,
+            {
+                "crc": entry.crc,
+                "file_size": entry.file_size,
+                "compress_type": entry.compress_type,
+            },
+        )
+    return st, entry, cpu
+
+
+def _ordered_map(executor, fn, items, window):
+    """Like executor.map, but with at most ``window`` tasks in flight."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def pack_variants(
+    source_dir,
+    variants,
+    logger,
+    extra_files=None,
+    jobs=1,
+    cache=None,
+    policy=None,
+    png_optimizer=None,
+    reproducible=False,
+    manifest=None,
+    metrics=None,
+    executor=None,
+):
+    """Read each source file once and write it into every variant accepting it.
+
+    Entries are compressed a single time; the same compressed bytes are
+    written to all matching archives. With ``jobs`` > 1 entries are compressed
+    on a thread pool (zlib releases the GIL) and still written in sorted
+    order, so the output does not depend on the job count. Given an
+    ObjectCache, unchanged files reuse their previously compressed bytes.
+    ``policy`` defaults to CompressionPolicy(); a PngOptimizer re-encodes
+    PNGs losslessly before they are compressed.
+
+    ``reproducible`` fixes entry timestamps (see source_date_time()) and
+    permissions, so the archives depend on file contents only. Given a
+    BuildManifest, variants whose inputs and settings are unchanged since
+    their last build are left untouched. Phase timings and counters are
+    added to ``metrics`` when given. A shared ``executor`` (a thread pool of
+    ``jobs`` workers) is used instead of a pool of its own and left running.
+    Returns ({variant name: entry count}, names of the variants written);
+    variants left untouched as up to date are only in the counts.
+    """
+    policy = policy or CompressionPolicy()
+    metrics = metrics or Metrics("pack")
+    fixed_date_time = source_date_time() if reproducible else None
+    stats = {}
+    counts = {}
+    work = []
+    with metrics.phase("scan"):
+        for arcname, file_path in collect_pack_files(source_dir, logger, extra_files):
+            targets = [v.name for v in variants if v.accepts(arcname)]
+            if targets:
+                work.append((arcname, file_path, targets))
+        metrics.count("scan", files=len(work))
+
+    inputs = [file_path for _, file_path, _ in work]
+    fingerprints = {}
+    if manifest is not None:
+        with metrics.phase("fingerprint"):
+            stale = _stale_variants(
+                variants,
+                work,
+                manifest,
+                {
+                    "policy": policy.signature,
+                    "png": png_optimizer.VERSION if png_optimizer else None,
+                    "zlib": zlib.ZLIB_RUNTIME_VERSION,
+                    "date_time": fixed_date_time,
+                },
+                fixed_date_time,
+                fingerprints,
+            )
+        for variant in variants:
+            if variant not in stale:
+                counts[variant.name] = manifest.entry_count(variant.output_path)
+                logger.info(
+                    f"Up to date: {variant.output_path.name} "
+                    f"({counts[variant.name]} files, variant: {variant.name})"
+                )
+        if not stale:
+            manifest.save(inputs)
+            return counts, []
+        names = {v.name for v in stale}
+        work = [
+            (arcname, file_path, [t for t in targets if t in names])
+            for arcname, file_path, targets in work
+            if names.intersection(targets)
+        ]
+        variants = stale
+
+    if png_optimizer is not None:
+        with metrics.phase("optimize_png"):
+            png_optimizer.prepare(
+                [path for arcname, path, _ in work if arcname.lower().endswith(".png")],
+                jobs,
+                logger,
+            )
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
+    writers = {}
+    own_executor = executor is None and jobs > 1
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=jobs)
+    start = time.perf_counter()
+    try:
+        with metrics.phase("compress"):
+            for variant in variants:
+                # Built next to the target, so a failed build keeps the old archive.
+                writers[variant.name] = ZipStreamWriter(_temp_path(variant.output_path))
+            items = [(arcname, file_path) for arcname, file_path, _ in work]
+            load = partial(
+                _read_and_compress,
+                policy=policy,
+                cache=cache,
+                png_optimizer=png_optimizer,
+            )
+            if executor:
+                results = _ordered_map(executor, load, items, max(1, jobs) * 4)
+            else:
+                results = map(load, items)
+            for (arcname, _, targets), (st, entry, cpu) in zip(work, results):
+                ext = os.path.splitext(arcname)[1].lower() or "(none)"
+                row = stats.setdefault(ext, [0, 0, 0, 0.0])
+                row[0] += 1
+                row[1] += entry.file_size
+                row[2] += entry.compress_size
+                row[3] += cpu
+                date_time, mode = entry_stamp(st, fixed_date_time)
+                for name in targets:
+                    writers[name].write_entry(arcname, entry, date_time, mode)
+            for variant in variants:
+                writer = writers[variant.name]
+                counts[variant.name] = len(writer)
+                writer.close()
+                os.replace(writer.path, variant.output_path)
+                del writers[variant.name]
+    except BaseException:
+        # Only unfinished archives; variants already in place are complete.
+        for writer in writers.values():
+            writer.abort()
+            writer.path.unlink(missing_ok=True)  # closed, not yet moved
+        raise
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+    elapsed = time.perf_counter() - start
+    metrics.count(
+        "compress",
+        files=sum(row[0] for row in stats.values()),
+        bytes_in=sum(row[1] for row in stats.values()),
+        bytes_out=sum(row[2] for row in stats.values()),
+        compress_cpu_seconds=sum(row[3] for row in stats.values()),
+    )
+
+    for variant in variants:
+        size = variant.output_path.stat().st_size
+        metrics.item(
+            "archive",
+            variant.output_path.name,
+            elapsed,
+            variant=variant.name,
+            files=counts[variant.name],
+            bytes_out=size,
+        )
+        if manifest is not None:
+            manifest.record(
+                variant.output_path, fingerprints[variant.name], counts[variant.name]
+            )
+        logger.info(
+            f"Successfully created: {variant.output_path.name} "
+            f"({counts[variant.name]} files, variant: {variant.name})"
+        )
+    logger.info(format_compression_stats(stats))
+    if png_optimizer is not None:
+        png_optimizer.report(logger)
+    with metrics.phase("save_state"):
+        if cache is not None:
+            logger.info(
+                f"Cache: {cache.hits - hits} hit(s), {cache.misses - misses} miss(es)"
+            )
+            metrics.count(
+                "compress",
+                cache_hits=cache.hits - hits,
+                cache_misses=cache.misses - misses,
+            )
+            evicted = cache.save()
+            if evicted:
+                logger.info(f"Cache: evicted {evicted} least recently used entries")
+        if manifest is not None:
+            manifest.save(inputs)
+    return counts, [variant.name for variant in variants]
+
+
+def _temp_path(output_path):
+    return output_path.with_name(output_path.name + ".tmp")
+
+
+def _stale_variants(variants, work, manifest, settings, fixed_date_time, fingerprints):
+    """Fill ``fingerprints`` and return the variants that need rebuilding."""
+    entries = []
+    for arcname, file_path, targets in work:
+        st = file_path.stat()
+        date_time, mode = entry_stamp(st, fixed_date_time)
+        entry = [arcname, manifest.file_digest(file_path, st), date_time, mode]
+        entries.append((entry, targets))
+    stale = []
+    for variant in variants:
+        fingerprints[variant.name] = manifest.fingerprint(
+            settings,
+            [entry for entry, targets in entries if variant.name in targets],
+        )
+        if not manifest.up_to_date(variant.output_path, fingerprints[variant.name]):
+            stale.append(variant)
+    return stale
+
+
+def _scan_sources(source_dir, variant, logger, extra_files=None):
+    """Map each arcname the variant accepts to (size, mtime_ns, path)."""
+    snapshot = {}
+    for arcname, file_path in collect_pack_files(source_dir, logger, extra_files):
+        if not variant.accepts(arcname):
+            continue
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            continue
+        snapshot[arcname] = (st.st_size, st.st_mtime_ns, file_path)
+    return snapshot
+
+
+def _diff_snapshots(old, new):
+    """Return (changed arcnames, removed arcnames) going from old to new."""
+    changed = [
+        name
+        for name, (size, mtime, _) in new.items()
+        if name not in old or old[name][:2] != (size, mtime)
+    ]
+    removed = [name for name in old if name not in new]
+    return sorted(changed), sorted(removed)
+
+
+def _textures_to_check(source_dir, changed, extra_files):
+    """PNGs among ``changed``, plus textures whose .mcmeta changed."""
+    textures = set()
+    for name in changed:
+        if name in extra_files:
+            continue
+        if name.lower().endswith(".png"):
+            textures.add(name)
+        elif name.lower().endswith(".png.mcmeta"):
+            texture = name[: -len(".mcmeta")]
+            if (source_dir / texture).is_file():
+                textures.add(texture)
+    return sorted(textures)
+
+
+def _sync_mirror(mirror_dir, snapshot, changed, removed):
+    """Copy changed files into the mirror and delete removed ones."""
+    for arcname in changed:
+        target = mirror_dir / arcname
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.tmp")
+        shutil.copy2(snapshot[arcname][2], tmp)
+        os.replace(tmp, target)
+    for arcname in removed:
+        target = mirror_dir / arcname
+        target.unlink(missing_ok=True)
+        parent = target.parent
+        while parent != mirror_dir and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+
+
+def _mirror_snapshot(mirror_dir):
+    """Snapshot an existing mirror in the same shape as _scan_sources."""
+    snapshot = {}
+    for root, _, names in os.walk(mirror_dir):
+        for name in names:
+            file_path = Path(root) / name
+            st = file_path.stat()
+            arcname = file_path.relative_to(mirror_dir).as_posix()
+            snapshot[arcname] = (st.st_size, st.st_mtime_ns, file_path)
+    return snapshot
+
+
+def _update_archive(
+    output_path, snapshot, changed, removed, load, fixed_date_time=None
+):
+    """Rewrite changed entries of an existing archive in place.
+
+    Returns the dead bytes left in the archive afterwards.
+    """
+    results = [load((arcname, snapshot[arcname][2])) for arcname in changed]
+    with ZipStreamWriter(output_path, append=True) as writer:
+        for arcname, (st, entry, _) in zip(changed, results):
+            date_time, mode = entry_stamp(st, fixed_date_time)
+            writer.write_entry(arcname, entry, date_time, mode, replace=True)
+        for arcname in removed:
+            writer.remove(arcname)
+        return writer.dead_bytes
 
 
-def create_zip_from_dir(source_dir, zip_path, logger):
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for file_path in source_dir.rglob("*"):
-            if file_path.is_file():
-                arcname = file_path.relative_to(source_dir)
-                # Basic Zip Slip protection
-                if ".." in str(arcname) or str(arcname).startswith("/"):
-                    logger.warning(f"Skipped unsafe path in ZIP: {arcname}")
+def watch_pack(
+    source_dir,
+    variant,
+    logger,
+    extra_files=None,
+    mirror_dir=None,
+    jobs=1,
+    cache=None,
+    policy=None,
+    png_optimizer=None,
+    debounce=DEFAULT_DEBOUNCE_MS / 1000,
+    polling=False,
+    reproducible=False,
+    metrics=None,
+):
+    """Keep ``variant``'s archive (or an unpacked ``mirror_dir``) up to date.
+
+    After one full build, every burst of changes under ``source_dir`` is
+    applied incrementally: changed entries are appended to the archive and
+    the central directory rewritten, so an update costs about as much as the
+    changed files. Once superseded entries outweigh the live ones the archive
+    is rebuilt from scratch (cheap with a warm cache). Changed textures are
+    validated and reported, but never block an update. Runs until Ctrl+C.
+    """
+    extra_files = extra_files or {}
+    policy = policy or CompressionPolicy()
+    metrics = metrics or Metrics("pack")
+    load = partial(
+        _read_and_compress, policy=policy, cache=cache, png_optimizer=png_optimizer
+    )
+
+    def rebuild():
+        pack_variants(
+            source_dir,
+            [variant],
+            logger,
+            extra_files,
+            jobs,
+            cache,
+            policy,
+            png_optimizer,
+            reproducible,
+            metrics=metrics,
+        )
+
+    fixed_date_time = source_date_time() if reproducible else None
+    snapshot = _scan_sources(source_dir, variant, logger, extra_files)
+    if mirror_dir is not None:
+        mirror_dir.mkdir(parents=True, exist_ok=True)
+        changed, removed = _diff_snapshots(_mirror_snapshot(mirror_dir), snapshot)
+        _sync_mirror(mirror_dir, snapshot, changed, removed)
+        logger.info(
+            f"Mirror ready: {mirror_dir} ({len(changed)} copied, "
+            f"{len(removed)} removed, {len(snapshot)} files)"
+        )
+        target = mirror_dir
+    else:
+        rebuild()
+        target = variant.output_path
+
+    with DirectoryWatcher(source_dir, polling=polling) as watcher:
+        logger.info(f"Watching {source_dir} ({watcher.backend}); press Ctrl+C to stop.")
+        try:
+            while True:
+                if not watcher.wait():
+                    continue
+                watcher.settle(debounce)
+                start = time.perf_counter()
+                watcher.update_dirs(
+                    Path(dirpath) for dirpath, _, _ in os.walk(source_dir)
+                )
+                current = _scan_sources(source_dir, variant, logger, extra_files)
+                changed, removed = _diff_snapshots(snapshot, current)
+                if not changed and not removed:
                     continue
-                zf.write(file_path, arcname)
-    logger.info(f"Successfully created: {zip_path.name}")
+                try:
+                    if mirror_dir is not None:
+                        _sync_mirror(mirror_dir, current, changed, removed)
+                    else:
+                        dead = _update_archive(
+                            variant.output_path,
+                            current,
+                            changed,
+                            removed,
+                            load,
+                            fixed_date_time,
+                        )
+                        if dead > variant.output_path.stat().st_size // 2:
+                            logger.info("Compacting archive...")
+                            rebuild()
+                        elif cache is not None:
+                            cache.save()
+                except OSError as e:
+                    # Typically a file still being written; retried on the next
+                    # change since the snapshot is left as it was.
+                    logger.warning(f"Update failed, will retry: {e}")
+                    continue
+                snapshot = current
+                for issue in validate_pack(
+                    source_dir, _textures_to_check(source_dir, changed, extra_files), []
+                ):
+                    logger.warning(str(issue))
+                elapsed = time.perf_counter() - start
+                metrics.item(
+                    "update",
+                    target.name,
+                    elapsed,
+                    files=len(changed),
+                    removed=len(removed),
+                )
+                logger.info(
+                    f"[{time.strftime('%H:%M:%S')}] Updated {target.name}: "
+                    f"{len(changed)} changed, {len(removed)} removed "
+                    f"in {elapsed * 1000:.0f} ms"
+                )
+        except KeyboardInterrupt:
+            logger.info("Stopped watching.")
+
+
+def create_zip_from_dir(
+    source_dir,
+    zip_path,
+    logger,
+    extra_files=None,
+    jobs=1,
+    cache=None,
+    policy=None,
+    png_optimizer=None,
+    reproducible=False,
+    manifest=None,
+):
+    pack_variants(
+        source_dir,
+        [PackVariant("full", zip_path)],
+        logger,
+        extra_files,
+        jobs,
+        cache,
+        policy,
+        png_optimizer,
+        reproducible,
+        manifest,
+    )
+
+
+class PackError(Exception):
+    """A pack() input is unusable or the pack failed validation."""
+
+
+@dataclass
+class PackResult:
+    """What one pack() call produced."""
+
+    outputs: Dict[str, Path]  # variant name -> archive
+    counts: Dict[str, int]  # variant name -> entries in the archive
+    rebuilt: List[str]  # variants written by this call; the rest were up to date
+    seconds: float
+
+
+def resolve_pack_paths(source, output, license=None):
+    """Check the paths of a pack; returns (source_dir, license_path, output_path).
+
+    The LICENSE defaults to the one next to ``source``; the output gets a
+    .zip suffix and its directory is created. Raises PackError.
+    """
+    source_dir = Path(os.path.expanduser(str(source))).resolve()
+    if not source_dir.is_dir():
+        raise PackError(f"Invalid source: {source_dir}")
+    if not os.access(source_dir, os.R_OK):
+        raise PackError(f"No read permission on source: {source_dir}")
+
+    if license:
+        license_path = Path(os.path.expanduser(str(license))).resolve()
+    else:
+        license_path = source_dir.parent / "LICENSE"
+    if not license_path.exists():
+        raise PackError(f"LICENSE not found: {license_path}")
+    if not os.access(license_path, os.R_OK):
+        raise PackError(f"Cannot read LICENSE: {license_path}")
+
+    output_path = Path(os.path.expanduser(str(output))).resolve()
+    if not output_path.suffix.lower() == ".zip":
+        output_path = output_path.with_suffix(".zip")
+    output_parent = output_path.parent
+    try:
+        output_parent.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        raise PackError(f"Cannot create output directory: {e}") from None
+    if not os.access(output_parent, os.W_OK):
+        raise PackError(f"No write permission in: {output_parent}")
+    return source_dir, license_path, output_path
+
+
+def open_caches(
+    cache_root, cache_size=DEFAULT_CACHE_MB, clear=False, logger=None, shared=None
+):
+    """Return the (deflate cache, PNG cache, BuildManifest) under cache_root.
+
+    Given the same ``shared`` dict, later calls for a cache root reuse the
+    objects of the first instead of loading the indexes again.
+    """
+    key = str(cache_root)
+    if shared is not None and key in shared and not clear:
+        return shared[key]
+    limit = cache_size << 20
+    cache = ObjectCache(cache_root / "deflate", limit)
+    png_cache = ObjectCache(cache_root / "png", limit)
+    if clear:
+        cache.clear()
+        png_cache.clear()
+        (cache_root / BUILD_MANIFEST_NAME).unlink(missing_ok=True)
+        if logger is not None:
+            logger.info(f"Cleared build cache: {cache_root}")
+    caches = (cache, png_cache, BuildManifest(cache_root / BUILD_MANIFEST_NAME))
+    if shared is not None:
+        shared[key] = caches
+    return caches
+
+
+def pack(
+    source,
+    output,
+    variants=None,
+    license=None,
+    include_panorama=False,
+    jobs=1,
+    max_compression=False,
+    optimize_png=False,
+    use_cache=True,
+    cache_size=DEFAULT_CACHE_MB,
+    clear_cache=False,
+    reproducible=False,
+    validate=True,
+    logger=None,
+    metrics=None,
+    executor=None,
+    process_pool=None,
+    caches=None,
+):
+    """Pack ``source`` like the non-interactive CLI; returns a PackResult.
+
+    ``variants`` are VARIANT_PROFILES names (default: "full" with
+    ``include_panorama``, else "no-panorama"). Never prompts or exits:
+    unusable paths and failed validation raise PackError.
+
+    To run many packs in one process, pass every call the same thread pool
+    of ``jobs`` workers as ``executor``, a ProcessPoolExecutor for
+    ``optimize_png`` as ``process_pool`` and one dict as ``caches``.
+    """
+    start = time.perf_counter()
+    logger = logger or logging.getLogger("ResourcePackPacker")
+    metrics = metrics or Metrics("pack")
+    names = list(variants or ["full" if include_panorama else "no-panorama"])
+    unknown = [name for name in names if name not in VARIANT_PROFILES]
+    if unknown:
+        raise PackError(f"Unknown variant(s): {', '.join(unknown)}")
+    if reproducible:
+        try:
+            source_date_time()
+        except (ValueError, OverflowError):
+            raise PackError("SOURCE_DATE_EPOCH must be an integer timestamp") from None
+    source_dir, license_path, output_path = resolve_pack_paths(source, output, license)
+    targets = make_variants(names, output_path)
+
+    if validate:
+        with metrics.phase("validate"):
+            valid = run_validation(source_dir, logger, jobs, executor)
+        if not valid:
+            raise PackError("Validation failed; nothing was packed.")
+
+    cache = png_cache = manifest = None
+    if use_cache or clear_cache:
+        cache, png_cache, manifest = open_caches(
+            output_path.parent / CACHE_DIR_NAME, cache_size, clear_cache, logger, caches
+        )
+    if not use_cache:
+        cache = png_cache = manifest = None
+    png_optimizer = PngOptimizer(png_cache, process_pool) if optimize_png else None
+
+    logger.info("Packing resource pack files...")
+    counts, rebuilt = pack_variants(
+        source_dir,
+        targets,
+        logger,
+        {"LICENSE": license_path},
+        jobs,
+        cache,
+        CompressionPolicy(max_compression=max_compression),
+        png_optimizer,
+        reproducible,
+        manifest,
+        metrics,
+        executor,
+    )
+    return PackResult(
+        {v.name: v.output_path for v in targets},
+        counts,
+        rebuilt,
+        time.perf_counter() - start,
+    )
 
 
 def confirm_choice(prompt, default=False):
@@ -189,87 +1237,246 @@ def main():
     parser.add_argument(
         "--include-panorama", action="store_true", help="Include panorama"
     )
+    parser.add_argument(
+        "--variant",
+        action="append",
+        choices=sorted(VARIANT_PROFILES),
+        help="Variant to build (repeatable, all built in one pass; "
+        "overrides --include-panorama)",
+    )
     parser.add_argument("--license", type=str, help="Path to LICENSE file")
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Compress entries on N threads (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--max-compression",
+        action="store_true",
+        help="Release mode: deflate entries at level 9 where a trial on a "
+        "sample shows it saves at least 1%%",
+    )
+    parser.add_argument(
+        "--optimize-png",
+        action="store_true",
+        help="Losslessly re-encode PNGs (strip metadata, reduce colors, refilter)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not use the build cache ({CACHE_DIR_NAME} next to the output)",
+    )
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="Empty the build cache first"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_MB,
+        help=f"Size limit per build cache in MB (default: {DEFAULT_CACHE_MB})",
+    )
+    parser.add_argument(
+        "--reproducible",
+        action="store_true",
+        help="Byte-identical archives for identical contents: fixed entry "
+        "timestamps (SOURCE_DATE_EPOCH or 1980-01-01) and permissions",
+    )
+    parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Skip the texture/.mcmeta validation run before packing",
+    )
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Only validate --source (fast enough for an on-save hook)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Build once, then apply every change under --source to the "
+        "archive in place until Ctrl+C (first variant only)",
+    )
+    parser.add_argument(
+        "--mirror",
+        type=str,
+        metavar="DIR",
+        help="With --watch: keep an unpacked copy in DIR instead of an archive "
+        "(e.g. a folder in the game's resourcepacks directory); without "
+        "--output the build cache goes to dist/ next to --source",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch: poll for changes instead of using inotify",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=int,
+        default=DEFAULT_DEBOUNCE_MS,
+        metavar="MS",
+        help="With --watch: wait for MS quiet milliseconds before updating "
+        f"(default: {DEFAULT_DEBOUNCE_MS})",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Write per-phase timings, byte counts and peak memory as JSON",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Write cProfile data of the run to FILE (main thread only)",
+    )
+    parser.add_argument(
+        "--jobs-file",
+        metavar="FILE",
+        help="Run the pack and extract jobs listed in a JSON or YAML file in "
+        "this process (see batch.py); other options are ignored",
+    )
     parser.add_argument("--log-file", type=str, help="Log to file")
     parser.add_argument("--non-interactive", action="store_true", help="Batch mode")
     args = parser.parse_args()
 
-    logger = setup_logger(args.log_file)
+    metrics = Metrics("pack_resourcespack")
+    try:
+        with profiled(args.profile):
+            _run(parser, args, metrics)
+    finally:
+        if args.metrics:
+            metrics.write(args.metrics)
 
-    if not args.non_interactive:
-        source_dir, license_path, include_panorama, output_path = interactive_mode(
-            logger
-        )
-    else:
-        if not args.source or not args.output:
+
+def _run(parser, args, metrics):
+    if args.jobs_file:
+        from batch import run_job_file  # batch imports this module
+
+        sys.exit(0 if run_job_file(args.jobs_file, metrics) else 1)
+
+    if args.mirror and not args.watch:
+        parser.error("--mirror requires --watch")
+    if args.reproducible:
+        try:
+            source_date_time()
+        except (ValueError, OverflowError):
+            parser.error("SOURCE_DATE_EPOCH must be an integer timestamp")
+
+    logger = setup_logger(args.log_file)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    mirror_dir = parse_user_path(args.mirror) if args.mirror else None
+    if mirror_dir is not None and mirror_dir.is_dir():
+        # The mirror is synced destructively; never adopt an unrelated folder.
+        if any(mirror_dir.iterdir()) and not (mirror_dir / "pack.mcmeta").is_file():
             logger.error(
-                "Error: --source and --output required in non-interactive mode."
+                f"Error: {mirror_dir} is not empty and has no pack.mcmeta; "
+                "refusing to use it as a mirror."
             )
             sys.exit(1)
 
+    if args.validate_only:
+        if not args.source:
+            logger.error("Error: --source required with --validate-only.")
+            sys.exit(1)
         source_dir = parse_user_path(args.source)
-        if not source_dir.exists() or not source_dir.is_dir():
+        if not source_dir.is_dir():
             logger.error(f"Error: Invalid source: {source_dir}")
             sys.exit(1)
-        if not os.access(source_dir, os.R_OK):
-            logger.error(f"Error: No read permission on source: {source_dir}")
-            sys.exit(1)
+        with metrics.phase("validate"):
+            valid = run_validation(source_dir, logger, jobs)
+        sys.exit(0 if valid else 1)
 
-        license_path = (
-            parse_user_path(args.license)
-            if args.license
-            else source_dir.parent / "LICENSE"
+    if not args.non_interactive:
+        source_dir, license_path, include_panorama, output_path = interactive_mode(
+            logger
         )
-        if not license_path.exists():
-            logger.error(f"Error: LICENSE not found: {license_path}")
-            sys.exit(1)
-        if not os.access(license_path, os.R_OK):
-            logger.error(f"Error: Cannot read LICENSE: {license_path}")
+    else:
+        if not args.source or not (args.output or mirror_dir):
+            logger.error(
+                "Error: --source and --output required in non-interactive mode."
+            )
             sys.exit(1)
 
-        output_path = parse_user_path(args.output)
-        if not output_path.suffix.lower() == ".zip":
-            output_path = output_path.with_suffix(".zip")
-        output_parent = output_path.parent
-        if not output_parent.exists():
-            output_parent.mkdir(parents=True, exist_ok=True)
-        if not os.access(output_parent, os.W_OK):
-            logger.error(f"Error: No write permission in: {output_parent}")
+        # A watched mirror needs no archive, but the build cache goes next to
+        # one. Keep both in dist/ beside the source rather than in the
+        # game's resourcepacks folder, where the zip would show up as a pack.
+        source = parse_user_path(args.source)
+        if args.output:
+            output = parse_user_path(args.output)
+        else:
+            output = source.resolve().parent / "dist" / (mirror_dir.name + ".zip")
+        try:
+            source_dir, license_path, output_path = resolve_pack_paths(
+                source,
+                output,
+                parse_user_path(args.license) if args.license else None,
+            )
+        except PackError as e:
+            logger.error(f"Error: {e}")
             sys.exit(1)
 
         include_panorama = args.include_panorama
 
-    # Packing
-    temp_dir = output_path.parent / ".temp_pack"
-    try:
-        logger.info("Copying resource pack files...")
-        copy_directory(source_dir, temp_dir)
-        shutil.copy2(license_path, temp_dir / "LICENSE")
-
-        if not include_panorama:
-            panorama_dir = (
-                temp_dir
-                / "assets"
-                / "minecraft"
-                / "textures"
-                / "gui"
-                / "title"
-                / "background"
+    if args.variant:
+        variant_names = args.variant
+    else:
+        variant_names = ["full" if include_panorama else "no-panorama"]
+
+    if not args.watch:
+        try:
+            result = pack(
+                source_dir,
+                output_path,
+                variant_names,
+                license_path,
+                jobs=jobs,
+                max_compression=args.max_compression,
+                optimize_png=args.optimize_png,
+                use_cache=not args.no_cache,
+                cache_size=args.cache_size,
+                clear_cache=args.clear_cache,
+                reproducible=args.reproducible,
+                validate=not args.no_validate,
+                logger=logger,
+                metrics=metrics,
             )
-            if panorama_dir.exists():
-                shutil.rmtree(panorama_dir)
-                logger.info("Panorama background removed.")
-            else:
-                logger.info("No panorama background found.")
+        except PackError as e:
+            logger.error(f"Error: {e}")
+            sys.exit(1)
+        logger.info(f"\nPacking complete! ({', '.join(result.outputs)})")
+        for output in result.outputs.values():
+            logger.info(f"Output: {output}")
+        return
 
-        create_zip_from_dir(temp_dir, output_path, logger)
-        mode = "with panorama" if include_panorama else "without panorama"
-        logger.info(f"\nPacking complete! ({mode})")
-        logger.info(f"Output: {output_path}")
+    variant = make_variants(variant_names, output_path)[0]
+    if not args.no_validate:
+        with metrics.phase("validate"):
+            valid = run_validation(source_dir, logger, jobs)
+        if not valid:
+            logger.error("Validation failed; nothing was packed (see --no-validate).")
+            sys.exit(1)
 
-    finally:
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+    cache, png_cache, _ = open_caches(
+        output_path.parent / CACHE_DIR_NAME, args.cache_size, args.clear_cache, logger
+    )
+    if args.no_cache:
+        cache = png_cache = None
+    watch_pack(
+        source_dir,
+        variant,
+        logger,
+        {"LICENSE": license_path},
+        mirror_dir,
+        jobs,
+        cache,
+        CompressionPolicy(max_compression=args.max_compression),
+        PngOptimizer(png_cache) if args.optimize_png else None,
+        max(0, args.debounce) / 1000,
+        args.poll,
+        args.reproducible,
+        metrics,
+    )
 
 
 if __name__ == "__main__":
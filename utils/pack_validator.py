@@ -0,0 +1,244 @@
+"""
+Pack Validator
+
+Catches broken textures before they reach the game. Only PNG headers are
+read (the first 33 bytes hold the IHDR chunk), so a full pack is checked in
+well under a second:
+
+- every .png parses and every .png.mcmeta is valid JSON next to a texture
+- animation frames divide the texture and frame indices exist
+- nine-slice borders fit inside the gui.scaling size, which should keep the
+  texture's aspect ratio (a warning: the game stretches the sprite to fit)
+- mipmapped textures (blocks, items, particles) are powers of two
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from pngtools import PngError, read_header
+
+# Textures stitched into mipmapped atlases.
+POWER_OF_TWO_DIRS = ("textures/block/", "textures/item/", "textures/particle/")
+SCALING_TYPES = ("stretch", "tile", "nine_slice")
+
+
+@dataclass(frozen=True)
+class Issue:
+    severity: str  # "error" or "warning"
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"[{self.severity.upper()}] {self.path}: {self.message}"
+
+
+def _positive_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _is_power_of_two(value: int) -> bool:
+    return value > 0 and value & (value - 1) == 0
+
+
+def _check_animation(
+    animation, width: int, height: int, issue
+) -> Optional[Tuple[int, int]]:
+    """Validate an "animation" section; returns the frame size when usable."""
+    if not isinstance(animation, dict):
+        issue("error", "animation must be an object")
+        return None
+    frame_w = animation.get("width")
+    frame_h = animation.get("height")
+    for name, value in (("width", frame_w), ("height", frame_h)):
+        if value is not None and not _positive_int(value):
+            issue("error", f"animation.{name} must be a positive integer")
+            return None
+    # Same defaults as the game: square frames as wide as the shorter side.
+    if frame_w is None and frame_h is None:
+        frame_w = frame_h = min(width, height)
+    frame_w = frame_w or width
+    frame_h = frame_h or height
+    if width % frame_w or height % frame_h:
+        issue(
+            "error",
+            f"{width}x{height} texture is not a whole number of "
+            f"{frame_w}x{frame_h} animation frames",
+        )
+        return None
+
+    frametime = animation.get("frametime", 1)
+    if not _positive_int(frametime):
+        issue("error", "animation.frametime must be a positive integer")
+    count = (width // frame_w) * (height // frame_h)
+    frames = animation.get("frames")
+    if frames is not None:
+        if not isinstance(frames, list) or not frames:
+            issue("error", "animation.frames must be a non-empty list")
+        else:
+            for frame in frames:
+                index = frame.get("index") if isinstance(frame, dict) else frame
+                if isinstance(frame, dict) and "time" in frame:
+                    if not _positive_int(frame["time"]):
+                        issue("error", f"frame {index}: time must be positive")
+                if not isinstance(index, int) or not 0 <= index < count:
+                    issue(
+                        "error",
+                        f"animation frame {index!r} does not exist "
+                        f"({count} frame(s) of {frame_w}x{frame_h})",
+                    )
+    return frame_w, frame_h
+
+
+def _check_scaling(scaling, frame_w: int, frame_h: int, issue) -> None:
+    if not isinstance(scaling, dict):
+        issue("error", "gui.scaling must be an object")
+        return
+    kind = scaling.get("type")
+    if kind not in SCALING_TYPES:
+        issue("error", f"unknown gui.scaling type {kind!r}")
+        return
+    if kind == "stretch":
+        return
+
+    width, height = scaling.get("width"), scaling.get("height")
+    if not (_positive_int(width) and _positive_int(height)):
+        issue("error", f"{kind} scaling needs positive integer width and height")
+        return
+    if frame_w * height != frame_h * width:
+        # The game stretches to fit, so this only distorts the sprite.
+        issue(
+            "warning",
+            f"{frame_w}x{frame_h} texture does not match the {width}x{height} "
+            f"{kind} size (uneven scale)",
+        )
+    elif frame_w % width:
+        issue(
+            "warning",
+            f"{frame_w}x{frame_h} texture is a fractional scale of {width}x{height}",
+        )
+
+    if kind == "nine_slice":
+        border = scaling.get("border")
+        if isinstance(border, int) and not isinstance(border, bool):
+            border = dict.fromkeys(("left", "top", "right", "bottom"), border)
+        if not isinstance(border, dict):
+            issue("error", "nine_slice border must be an integer or an object")
+            return
+        sides = {}
+        for side in ("left", "top", "right", "bottom"):
+            value = border.get(side)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                issue("error", f"nine_slice border.{side} must be >= 0")
+                return
+            sides[side] = value
+        if sides["left"] + sides["right"] > width:
+            issue(
+                "error",
+                f"nine_slice left+right border ({sides['left']}+{sides['right']}) "
+                f"exceeds width {width}",
+            )
+        if sides["top"] + sides["bottom"] > height:
+            issue(
+                "error",
+                f"nine_slice top+bottom border ({sides['top']}+{sides['bottom']}) "
+                f"exceeds height {height}",
+            )
+
+
+def check_texture(source_dir: Path, rel: str) -> List[Issue]:
+    """Validate one texture (POSIX path relative to the pack) and its .mcmeta."""
+    issues: List[Issue] = []
+
+    def issue(severity: str, message: str, path: str = rel) -> None:
+        issues.append(Issue(severity, path, message))
+
+    try:
+        with open(source_dir / rel, "rb") as f:
+            header = read_header(f.read(33))
+    except (OSError, PngError) as e:
+        issue("error", f"unreadable PNG header: {e}")
+        return issues
+
+    frame_w, frame_h = header.width, header.height
+    meta_rel = rel + ".mcmeta"
+    meta_path = source_dir / meta_rel
+    if meta_path.is_file():
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8-sig"))
+        except (OSError, ValueError) as e:
+            issue("error", f"invalid JSON: {e}", meta_rel)
+            return issues
+        if not isinstance(meta, dict):
+            issue("error", "top level must be an object", meta_rel)
+            return issues
+
+        def meta_issue(severity: str, message: str) -> None:
+            issue(severity, message, meta_rel)
+
+        if "animation" in meta:
+            frame = _check_animation(
+                meta["animation"], header.width, header.height, meta_issue
+            )
+            if frame is None:
+                return issues
+            frame_w, frame_h = frame
+        gui = meta.get("gui")
+        if gui is not None:
+            if not isinstance(gui, dict):
+                meta_issue("error", "gui must be an object")
+            elif "scaling" in gui:
+                _check_scaling(gui["scaling"], frame_w, frame_h, meta_issue)
+
+    if any(f"/{d}" in rel for d in POWER_OF_TWO_DIRS):
+        if not (_is_power_of_two(frame_w) and _is_power_of_two(frame_h)):
+            issue(
+                "warning",
+                f"{frame_w}x{frame_h} is not a power of two (breaks mipmaps)",
+            )
+    return issues
+
+
+def validate_pack(
+    source_dir: Path,
+    textures: List[str],
+    metas: List[str],
+    jobs: int = 1,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> List[Issue]:
+    """Check ``textures`` and ``metas`` (POSIX paths relative to the pack).
+
+    Returns the issues sorted by path; the checks only read PNG headers and
+    .mcmeta files, on ``jobs`` threads or on ``executor`` when given.
+    """
+    issues: List[Issue] = []
+    texture_set = set(textures)
+    for meta in metas:
+        if meta[: -len(".mcmeta")] not in texture_set and meta != "pack.mcmeta":
+            issues.append(Issue("error", meta, "no texture next to this .mcmeta"))
+
+    if "pack.mcmeta" in metas:
+        try:
+            pack = json.loads(
+                (source_dir / "pack.mcmeta").read_text(encoding="utf-8-sig")
+            )["pack"]
+            if not _positive_int(pack.get("pack_format")):
+                issues.append(
+                    Issue("error", "pack.mcmeta", "pack.pack_format must be set")
+                )
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            issues.append(Issue("error", "pack.mcmeta", f"invalid pack metadata: {e}"))
+
+    def check(rel: str) -> List[Issue]:
+        return check_texture(source_dir, rel)
+
+    if executor is not None:
+        for found in executor.map(check, textures):
+            issues.extend(found)
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            for found in pool.map(check, textures):
+                issues.extend(found)
+    return sorted(issues, key=lambda i: (i.path, i.severity, i.message))
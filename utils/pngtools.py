@@ -0,0 +1,532 @@
+"""
+PNG Tools
+
+Pure-Python PNG reading and lossless re-encoding for the build tools.
+
+Only non-interlaced images with bit depths up to 8 are decoded; anything else
+(16-bit, interlaced, APNG) is reported as unsupported and left alone by
+``optimize_png``. Filtering uses SWAR arithmetic on Python integers so whole
+images are processed per operation instead of per byte where the filter
+allows it.
+"""
+
+import struct
+import zlib
+from collections import Counter
+from itertools import accumulate
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Channels per color type.
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Chunks that can change decoded pixels; everything else is ancillary.
+_KEEP_CHUNKS = {b"IHDR", b"PLTE", b"tRNS", b"IDAT", b"IEND"}
+# Animated PNGs must keep their frame chunks, so they are never re-encoded.
+_ANIMATION_CHUNKS = {b"acTL", b"fcTL", b"fdAT"}
+
+_ABS_TABLE = bytes(min(v, 256 - v) for v in range(256))
+
+
+class PngError(ValueError):
+    """Raised for malformed or unsupported PNG data."""
+
+
+@dataclass(frozen=True)
+class PngHeader:
+    width: int
+    height: int
+    bit_depth: int
+    color_type: int
+    interlace: int
+
+    @property
+    def channels(self) -> int:
+        return CHANNELS[self.color_type]
+
+
+def _parse_ihdr(body: bytes) -> PngHeader:
+    if len(body) != 13:
+        raise PngError("Invalid IHDR chunk")
+    width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", body)
+    if color not in CHANNELS or width == 0 or height == 0:
+        raise PngError("Invalid IHDR values")
+    return PngHeader(width, height, depth, color, interlace)
+
+
+def read_header(data: bytes) -> PngHeader:
+    """Parse the IHDR chunk from the first 33 bytes of a PNG."""
+    if data[:8] != PNG_SIGNATURE:
+        raise PngError("Not a PNG file")
+    if len(data) < 33 or data[12:16] != b"IHDR":
+        raise PngError("Missing IHDR chunk")
+    return _parse_ihdr(data[16:29])
+
+
+def iter_chunks(data: bytes):
+    """Yield (type, body) for every chunk, checking CRCs."""
+    if data[:8] != PNG_SIGNATURE:
+        raise PngError("Not a PNG file")
+    pos = 8
+    while pos < len(data):
+        if pos + 8 > len(data):
+            raise PngError("Truncated chunk header")
+        length, ctype = struct.unpack(">I4s", data[pos : pos + 8])
+        body = data[pos + 8 : pos + 8 + length]
+        crc_bytes = data[pos + 8 + length : pos + 12 + length]
+        if len(body) != length or len(crc_bytes) != 4:
+            raise PngError(f"Truncated {ctype!r} chunk")
+        if zlib.crc32(ctype + body) != struct.unpack(">I", crc_bytes)[0]:
+            raise PngError(f"CRC mismatch in {ctype!r} chunk")
+        yield ctype, body
+        pos += 12 + length
+        if ctype == b"IEND":
+            return
+    raise PngError("Missing IEND chunk")
+
+
+# --- SWAR byte arithmetic -------------------------------------------------
+
+_MASKS = {}
+
+
+def _masks(n: int) -> Tuple[int, int]:
+    masks = _MASKS.get(n)
+    if masks is None:
+        masks = (
+            int.from_bytes(b"\x80" * n, "big"),
+            int.from_bytes(b"\x7f" * n, "big"),
+        )
+        if len(_MASKS) < 64:
+            _MASKS[n] = masks
+    return masks
+
+
+def _swar_add(a: bytes, b: bytes) -> bytes:
+    """Bytewise (a + b) mod 256."""
+    high, low = _masks(len(a))
+    x, y = int.from_bytes(a, "big"), int.from_bytes(b, "big")
+    return (((x & low) + (y & low)) ^ ((x ^ y) & high)).to_bytes(len(a), "big")
+
+
+def _swar_sub(a: bytes, b: bytes) -> bytes:
+    """Bytewise (a - b) mod 256."""
+    high, low = _masks(len(a))
+    x, y = int.from_bytes(a, "big"), int.from_bytes(b, "big")
+    return (((x | high) - (y & low)) ^ ((x ^ ~y) & high)).to_bytes(len(a), "big")
+
+
+def _swar_avg(a: bytes, b: bytes) -> bytes:
+    """Bytewise floor((a + b) / 2)."""
+    x, y = int.from_bytes(a, "big"), int.from_bytes(b, "big")
+    lsb_clear = int.from_bytes(b"\xfe" * len(a), "big")
+    return ((x & y) + (((x ^ y) & lsb_clear) >> 1)).to_bytes(len(a), "big")
+
+
+# --- Decoding ---------------------------------------------------------------
+
+
+def _unfilter(raw: bytes, height: int, stride: int, bpp: int) -> bytearray:
+    if len(raw) < height * (stride + 1):
+        raise PngError("Truncated image data")
+    out = bytearray(height * stride)
+    prev = bytes(stride)
+    pos = 0
+    for y in range(height):
+        ftype = raw[pos]
+        line = raw[pos + 1 : pos + 1 + stride]
+        pos += stride + 1
+        if ftype == 0:
+            cur = line
+        elif ftype == 1:
+            cur = bytearray(line)
+            for i in range(bpp, stride):
+                cur[i] = (cur[i] + cur[i - bpp]) & 0xFF
+        elif ftype == 2:
+            cur = _swar_add(line, prev)
+        elif ftype == 3:
+            cur = bytearray(line)
+            for i in range(bpp):
+                cur[i] = (cur[i] + (prev[i] >> 1)) & 0xFF
+            for i in range(bpp, stride):
+                cur[i] = (cur[i] + ((cur[i - bpp] + prev[i]) >> 1)) & 0xFF
+        elif ftype == 4:
+            cur = bytearray(line)
+            for i in range(bpp):
+                cur[i] = (cur[i] + prev[i]) & 0xFF
+            for i in range(bpp, stride):
+                a, b, c = cur[i - bpp], prev[i], prev[i - bpp]
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                if pa <= pb and pa <= pc:
+                    pred = a
+                elif pb <= pc:
+                    pred = b
+                else:
+                    pred = c
+                cur[i] = (cur[i] + pred) & 0xFF
+        else:
+            raise PngError(f"Invalid filter type {ftype}")
+        out[y * stride : (y + 1) * stride] = cur
+        prev = cur
+    return out
+
+
+def _unpack_bits(rows: bytearray, header: PngHeader, stride: int) -> bytearray:
+    """Expand 1/2/4-bit samples to one byte per sample."""
+    depth = header.bit_depth
+    per_byte = 8 // depth
+    mask = (1 << depth) - 1
+    shifts = [8 - depth * (k + 1) for k in range(per_byte)]
+    width = header.width
+    out = bytearray()
+    for y in range(header.height):
+        row = rows[y * stride : (y + 1) * stride]
+        samples = bytearray((b >> s) & mask for b in row for s in shifts)
+        out += samples[:width]
+    return out
+
+
+def decode_rgba(data: bytes) -> Tuple[PngHeader, bytes]:
+    """Decode a PNG to 8-bit RGBA pixels."""
+    header = None
+    palette = b""
+    trns = None
+    idat = []
+    for ctype, body in iter_chunks(data):
+        if ctype == b"IHDR":
+            header = _parse_ihdr(body)
+        elif ctype == b"PLTE":
+            palette = body
+        elif ctype == b"tRNS":
+            trns = body
+        elif ctype == b"IDAT":
+            idat.append(body)
+        elif ctype in _ANIMATION_CHUNKS:
+            raise PngError("Animated PNGs are not supported")
+    if header is None or not idat:
+        raise PngError("Missing IHDR or IDAT")
+    if header.interlace:
+        raise PngError("Interlaced PNGs are not supported")
+    if header.bit_depth > 8:
+        raise PngError("16-bit PNGs are not supported")
+
+    bits = header.channels * header.bit_depth
+    stride = (header.width * bits + 7) // 8
+    bpp = max(1, bits // 8)
+    try:
+        raw = zlib.decompress(b"".join(idat))
+    except zlib.error as e:
+        raise PngError(f"Corrupt image data: {e}") from None
+    samples = _unfilter(raw, header.height, stride, bpp)
+    if header.bit_depth < 8:
+        samples = _unpack_bits(samples, header, stride)
+
+    n = header.width * header.height
+    rgba = bytearray(n * 4)
+    color = header.color_type
+    if color == 6:
+        rgba[:] = samples
+    elif color == 2:
+        for c in range(3):
+            rgba[c::4] = samples[c::3]
+        rgba[3::4] = b"\xff" * n
+        if trns is not None and len(trns) == 6:
+            key = bytes(trns[1::2])
+            for i in range(n):
+                if rgba[i * 4 : i * 4 + 3] == key:
+                    rgba[i * 4 + 3] = 0
+    elif color == 0:
+        if header.bit_depth < 8:
+            scale = 255 // ((1 << header.bit_depth) - 1)
+            samples = bytes(v * scale for v in samples)
+        for c in range(3):
+            rgba[c::4] = samples
+        rgba[3::4] = b"\xff" * n
+        if trns is not None and len(trns) == 2:
+            key = trns[1]
+            if header.bit_depth < 8:
+                key = (struct.unpack(">H", trns)[0] * scale) & 0xFF
+            for i in range(n):
+                if rgba[i * 4] == key:
+                    rgba[i * 4 + 3] = 0
+    elif color == 4:
+        for c in range(3):
+            rgba[c::4] = samples[0::2]
+        rgba[3::4] = samples[1::2]
+    else:
+        entries = len(palette) // 3
+        alpha = (trns or b"")[:entries] + b"\xff" * (entries - len(trns or b""))
+        table = [palette[i * 3 : i * 3 + 3] + alpha[i : i + 1] for i in range(entries)]
+        try:
+            rgba[:] = b"".join([table[v] for v in samples])
+        except IndexError:
+            raise PngError("Palette index out of range") from None
+    return header, bytes(rgba)
+
+
+# --- Encoding ---------------------------------------------------------------
+
+
+def _chunk(ctype: bytes, body: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(body))
+        + ctype
+        + body
+        + struct.pack(">I", zlib.crc32(ctype + body))
+    )
+
+
+def _paeth(raw: bytes, left: bytes, prior: bytes, upleft: bytes) -> bytes:
+    paeth = bytearray(len(raw))
+    for i, (x, a, b, c) in enumerate(zip(raw, left, prior, upleft)):
+        # pa = |p - a|, pb = |p - b|, pc = |p - c| with p = a + b - c
+        pa = b - c
+        pb = a - c
+        pc = pa + pb
+        if pa < 0:
+            pa = -pa
+        if pb < 0:
+            pb = -pb
+        if pc < 0:
+            pc = -pc
+        if pa <= pb and pa <= pc:
+            paeth[i] = (x - a) & 0xFF
+        elif pb <= pc:
+            paeth[i] = (x - b) & 0xFF
+        else:
+            paeth[i] = (x - c) & 0xFF
+    return bytes(paeth)
+
+
+def _filter_candidates(
+    raw: bytes, height: int, stride: int, bpp: int, paeth: bool = True
+):
+    """Return {strategy: filtered scanlines} for the standard strategies.
+
+    Paeth is computed per byte and dominates the cost on large images; pass
+    ``paeth=False`` to try only the filters done with SWAR arithmetic.
+    """
+    prior = bytes(stride) + raw[: -stride or None]
+    left = b"".join(
+        bytes(bpp) + raw[y * stride : (y + 1) * stride - bpp] for y in range(height)
+    )
+    upleft = b"".join(
+        bytes(bpp) + prior[y * stride : (y + 1) * stride - bpp] for y in range(height)
+    )
+    filtered = {
+        0: raw,
+        1: _swar_sub(raw, left),
+        2: _swar_sub(raw, prior),
+        3: _swar_sub(raw, _swar_avg(left, prior)),
+    }
+    if paeth:
+        filtered[4] = _paeth(raw, left, prior, upleft)
+
+    def rows(ftype):
+        data = filtered[ftype]
+        return [data[y * stride : (y + 1) * stride] for y in range(height)]
+
+    split = {ftype: rows(ftype) for ftype in filtered}
+    strategies = {
+        f"filter{ftype}": b"".join(bytes([ftype]) + row for row in split[ftype])
+        for ftype in split
+    }
+    # Minimum sum of absolute differences, chosen per row.
+    adaptive = []
+    for y in range(height):
+        best = min(split, key=lambda f: sum(split[f][y].translate(_ABS_TABLE)))
+        adaptive.append(bytes([best]) + split[best][y])
+    strategies["adaptive"] = b"".join(adaptive)
+    return strategies
+
+
+def _pack_bits(indices: bytes, width: int, height: int, depth: int) -> bytes:
+    per_byte = 8 // depth
+    out = bytearray()
+    for y in range(height):
+        row = indices[y * width : (y + 1) * width]
+        for x in range(0, width, per_byte):
+            value = 0
+            group = row[x : x + per_byte]
+            for k, v in enumerate(group):
+                value |= v << (8 - depth * (k + 1))
+            out.append(value)
+    return bytes(out)
+
+
+def _color_candidates(width: int, height: int, rgba: bytes):
+    """Yield (color_type, bit_depth, samples, PLTE, tRNS) lossless encodings."""
+    n = width * height
+    alpha = rgba[3::4]
+    opaque = alpha.count(255) == n
+    red = rgba[0::4]
+    gray = red == rgba[1::4] == rgba[2::4]
+
+    if gray and opaque:
+        yield 0, 8, red, None, None
+    elif gray:
+        samples = bytearray(n * 2)
+        samples[0::2] = red
+        samples[1::2] = alpha
+        yield 4, 8, bytes(samples), None, None
+    elif opaque:
+        samples = bytearray(n * 3)
+        for c in range(3):
+            samples[c::3] = rgba[c::4]
+        yield 2, 8, bytes(samples), None, None
+    else:
+        yield 6, 8, rgba, None, None
+
+    pixels = struct.unpack(f">{n}I", rgba)
+    counts = Counter(pixels)
+    if len(counts) > 256:
+        return
+    # Translucent entries first keeps tRNS short; then most frequent first.
+    order = sorted(counts, key=lambda p: ((p & 0xFF) == 0xFF, -counts[p], p))
+    index = {p: i for i, p in enumerate(order)}
+    plte = b"".join(struct.pack(">I", p)[:3] for p in order)
+    alphas = bytes(p & 0xFF for p in order)
+    trns = alphas.rstrip(b"\xff") or None
+    indices = bytes(map(index.__getitem__, pixels))
+    depth = 8
+    for bits in (1, 2, 4):
+        if len(order) <= 1 << bits:
+            depth = bits
+            break
+    if depth < 8:
+        indices = _pack_bits(indices, width, height, depth)
+    yield 3, depth, indices, plte, trns
+
+
+def encode_candidates(
+    width: int, height: int, rgba: bytes, level: int = 9, keep: int = 1
+):
+    """Yield the lossless PNG encodings tried by ``optimize_png``.
+
+    Every color/filter combination is ranked with a fast level-1 deflate and
+    only the ``keep`` smallest are compressed at ``level``.
+    """
+    ranked = []
+    for color, depth, samples, plte, trns in _color_candidates(width, height, rgba):
+        bits = CHANNELS[color] * depth
+        stride = (width * bits + 7) // 8
+        bpp = max(1, bits // 8)
+        ihdr = struct.pack(">IIBBBBB", width, height, depth, color, 0, 0, 0)
+        strategies = _filter_candidates(samples, height, stride, bpp)
+        if color == 3 or depth < 8:
+            # Filtering rarely helps indexed or packed data.
+            strategies = {k: strategies[k] for k in ("filter0", "adaptive")}
+        for scanlines in strategies.values():
+            trial = len(zlib.compress(scanlines, 1))
+            ranked.append((trial, len(ranked), ihdr, plte, trns, scanlines))
+    ranked.sort(key=lambda item: item[:2])
+    for _, _, ihdr, plte, trns, scanlines in ranked[:keep]:
+        yield _assemble(ihdr, plte, trns, scanlines, level)
+
+
+def _assemble(ihdr: bytes, plte, trns, scanlines: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9)
+    idat = compressor.compress(scanlines) + compressor.flush()
+    parts = [PNG_SIGNATURE, _chunk(b"IHDR", ihdr)]
+    if plte is not None:
+        parts.append(_chunk(b"PLTE", plte))
+    if trns is not None:
+        parts.append(_chunk(b"tRNS", trns))
+    parts += [_chunk(b"IDAT", idat), _chunk(b"IEND", b"")]
+    return b"".join(parts)
+
+
+def encode_rgba(width: int, height: int, rgba: bytes, level: int = 6) -> bytes:
+    """Encode 8-bit RGBA pixels as a truecolor-with-alpha PNG, quickly.
+
+    The filter strategy is ranked as in ``encode_candidates`` but without
+    Paeth, and the color type is kept. ``optimize_png`` can shrink the result
+    further when packing.
+    """
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    strategies = _filter_candidates(rgba, height, width * 4, 4, paeth=False)
+    scanlines = min(strategies.values(), key=lambda s: len(zlib.compress(s, 1)))
+    return _assemble(ihdr, None, None, scanlines, level)
+
+
+def optimize_png(data: bytes) -> Optional[bytes]:
+    """Return a smaller, pixel-identical re-encoding of ``data``, or None.
+
+    Ancillary chunks (text, color management, timestamps) are dropped;
+    Minecraft ignores them when loading textures.
+    """
+    try:
+        header, rgba = decode_rgba(data)
+    except PngError:
+        # Unsupported layouts can still lose their ancillary chunks.
+        try:
+            stripped = strip_ancillary(data)
+        except PngError:
+            return None
+        return stripped if len(stripped) < len(data) else None
+    best = None
+    for candidate in encode_candidates(header.width, header.height, rgba):
+        if len(candidate) < len(best or data):
+            best = candidate
+    if best is None:
+        return None
+    try:
+        if decode_rgba(best)[1] != rgba:
+            return None
+    except PngError:
+        return None
+    return best
+
+
+def _spans(n: int, parts: int) -> List[Tuple[int, int]]:
+    """Split range(n) into ``parts`` spans; spans repeat indices when n < parts."""
+    return [
+        (i * n // parts, max(i * n // parts + 1, (i + 1) * n // parts))
+        for i in range(parts)
+    ]
+
+
+def perceptual_hash(width: int, height: int, rgba: bytes) -> int:
+    """64-bit difference hash of an image composited over black.
+
+    The image is box-filtered to 9x8 grey cells and each bit records whether
+    a cell is darker than its right neighbour, so re-encoding, small colour
+    tweaks and scaling keep the hash within a few bits.
+    """
+    grey = [
+        (r * 299 + g * 587 + b * 114) * a // 255000
+        for r, g, b, a in zip(rgba[0::4], rgba[1::4], rgba[2::4], rgba[3::4])
+    ]
+    columns = _spans(width, 9)
+    row_cells = []
+    for y in range(height):
+        prefix = [0, *accumulate(grey[y * width : (y + 1) * width])]
+        row_cells.append([prefix[end] - prefix[start] for start, end in columns])
+
+    value = 0
+    for start, end in _spans(height, 8):
+        sums = [sum(cell) for cell in zip(*row_cells[start:end])]
+        means = [total / (b - a) for total, (a, b) in zip(sums, columns)]
+        for left, right in zip(means, means[1:]):
+            value = value << 1 | (left < right)
+    return value
+
+
+def strip_ancillary(data: bytes) -> bytes:
+    """Drop chunks that do not affect decoded pixels, keeping IDAT as is."""
+    chunks: List[bytes] = [PNG_SIGNATURE]
+    for ctype, body in iter_chunks(data):
+        if ctype in _ANIMATION_CHUNKS:
+            return data
+        if ctype in _KEEP_CHUNKS:
+            chunks.append(_chunk(ctype, body))
+    return b"".join(chunks)
+
+
+def optimize_png_file(path) -> Optional[bytes]:
+    """``optimize_png`` for a file path; picklable for process pools."""
+    with open(path, "rb") as f:
+        return optimize_png(f.read())
@@ -0,0 +1,234 @@
+"""
+PSD Tools
+
+Pure-Python reading of the flattened image Photoshop stores in every PSD/PSB
+saved with "Maximize PSD and PSB File Compatibility" (the default). That
+composite is what "Export As PNG" produces from the visible layers (up to
+color-management rounding), so textures can be exported without rendering
+layers, masks and effects.
+
+Only 8-bit RGB and grayscale documents are supported; anything else raises
+``PsdUnsupported``. Files compressed with xz (see CONTRIBUTING.md) are
+accepted.
+"""
+
+import lzma
+import re
+import struct
+from dataclasses import dataclass
+from typing import List, Tuple
+
+PSD_SIGNATURE = b"8BPS"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+
+# Header color modes.
+GRAYSCALE = 1
+RGB = 3
+
+# Image resource holding the "has real merged data" flag.
+_VERSION_INFO_ID = 1057
+
+_HEADER = struct.Struct(">4sH6xHIIHH")
+
+
+class PsdError(ValueError):
+    """Raised for malformed or unsupported PSD data."""
+
+
+class PsdUnsupported(PsdError):
+    """A valid PSD this module cannot flatten (a full renderer might)."""
+
+
+@dataclass(frozen=True)
+class PsdHeader:
+    version: int  # 1 = PSD, 2 = PSB (large document)
+    channels: int
+    height: int
+    width: int
+    depth: int
+    color_mode: int
+
+
+def load_psd(data: bytes) -> bytes:
+    """Return the PSD bytes, decompressing xz-packed files."""
+    if data.startswith(XZ_MAGIC):
+        try:
+            return lzma.decompress(data)
+        except lzma.LZMAError as e:
+            raise PsdError(f"bad xz data: {e}") from None
+    return data
+
+
+def read_header(data: bytes) -> PsdHeader:
+    if len(data) < _HEADER.size:
+        raise PsdError("truncated header")
+    signature, version, channels, height, width, depth, mode = _HEADER.unpack_from(data)
+    if signature != PSD_SIGNATURE or version not in (1, 2):
+        raise PsdError("not a PSD file")
+    return PsdHeader(version, channels, height, width, depth, mode)
+
+
+def _section(data: bytes, pos: int, size_bytes: int = 4) -> Tuple[bytes, int]:
+    """Return (body, end) of a length-prefixed section starting at ``pos``."""
+    fmt = ">I" if size_bytes == 4 else ">Q"
+    if pos + size_bytes > len(data):
+        raise PsdError("truncated file")
+    (length,) = struct.unpack_from(fmt, data, pos)
+    start = pos + size_bytes
+    if start + length > len(data):
+        raise PsdError("truncated file")
+    return data[start : start + length], start + length
+
+
+def _has_merged_data(resources: bytes) -> bool:
+    pos = 0
+    while pos + 12 <= len(resources):
+        if resources[pos : pos + 4] != b"8BIM":
+            break
+        (rid,) = struct.unpack_from(">H", resources, pos + 4)
+        name_len = resources[pos + 6]
+        pos += 7 + name_len + ((name_len + 1) & 1)  # Pascal string, even size
+        if pos + 4 > len(resources):
+            break
+        (size,) = struct.unpack_from(">I", resources, pos)
+        body = resources[pos + 4 : pos + 4 + size]
+        if rid == _VERSION_INFO_ID and len(body) >= 5:
+            return body[4] != 0
+        pos += 4 + size + (size & 1)
+    # Files written before the flag existed always carry the composite.
+    return True
+
+
+def _has_merged_alpha(layers: bytes, header: PsdHeader) -> bool:
+    """True if the layer info flags the first extra channel as transparency.
+
+    Photoshop marks this with a negative layer count; without it any extra
+    channels are saved alpha or selection channels, not part of the image.
+    """
+    size = 4 if header.version == 1 else 8
+    if len(layers) < size + 2 or not int.from_bytes(layers[:size], "big"):
+        return False  # no layer info
+    (count,) = struct.unpack_from(">h", layers, size)
+    return count < 0
+
+
+def _unpack_bits(src: bytes, size: int) -> bytes:
+    """Decode one PackBits-compressed row of ``size`` bytes."""
+    out = bytearray()
+    pos = 0
+    end = len(src)
+    while len(out) < size and pos < end:
+        n = src[pos]
+        pos += 1
+        if n < 128:
+            out += src[pos : pos + n + 1]
+            pos += n + 1
+        elif n > 128:
+            out += src[pos : pos + 1] * (257 - n)
+            pos += 1
+    if len(out) < size:
+        raise PsdError("truncated RLE row")
+    return bytes(out[:size])
+
+
+def _read_planes(data: bytes, pos: int, header: PsdHeader, count: int) -> List[bytes]:
+    """Decode the first ``count`` channel planes of the merged image."""
+    if pos + 2 > len(data):
+        raise PsdError("missing image data")
+    (compression,) = struct.unpack_from(">H", data, pos)
+    pos += 2
+    width, height = header.width, header.height
+    plane_size = width * height
+    if compression == 0:
+        planes = []
+        for _ in range(count):
+            plane = data[pos : pos + plane_size]
+            if len(plane) < plane_size:
+                raise PsdError("truncated image data")
+            planes.append(plane)
+            pos += plane_size
+        return planes
+    if compression != 1:
+        raise PsdUnsupported(f"unsupported image compression {compression}")
+
+    # Row byte counts for every channel precede the RLE data.
+    fmt = "H" if header.version == 1 else "I"
+    rows = header.channels * height
+    table = struct.Struct(f">{rows}{fmt}")
+    if pos + table.size > len(data):
+        raise PsdError("truncated RLE table")
+    counts = table.unpack_from(data, pos)
+    pos += table.size
+    planes = []
+    for channel in range(count):
+        plane = []
+        for n in counts[channel * height : (channel + 1) * height]:
+            plane.append(_unpack_bits(data[pos : pos + n], width))
+            pos += n
+        planes.append(b"".join(plane))
+    return planes
+
+
+# Alpha -> color mask byte: transparent pixels lose their (white) color.
+_CLEAR_MASK = bytes([0] + [255] * 255)
+_TRANSLUCENT = re.compile(rb"[\x01-\xfe]")
+
+
+def _unmatte(rgba: bytearray, alpha: bytes) -> bytearray:
+    """Undo Photoshop's compositing of translucent pixels over white."""
+    if alpha.count(255) == len(alpha):
+        return rgba
+    mask = bytearray(b"\xff" * len(rgba))
+    keep = alpha.translate(_CLEAR_MASK)
+    for c in range(3):
+        mask[c::4] = keep
+    # Whole-image AND on big integers instead of a loop over pixels.
+    rgba = bytearray(
+        (int.from_bytes(rgba, "big") & int.from_bytes(mask, "big")).to_bytes(
+            len(rgba), "big"
+        )
+    )
+    for match in _TRANSLUCENT.finditer(alpha):
+        i = match.start()
+        a = alpha[i]
+        white = 255 * (255 - a)
+        for c in range(i * 4, i * 4 + 3):
+            value = ((rgba[c] * 255 - white) * 255 + a * 127) // (a * 255)
+            rgba[c] = 0 if value < 0 else 255 if value > 255 else value
+    return rgba
+
+
+def decode_composite(data: bytes) -> Tuple[PsdHeader, bytes]:
+    """Decode the flattened image of a PSD/PSB to 8-bit RGBA pixels."""
+    data = load_psd(data)
+    header = read_header(data)
+    if header.depth != 8:
+        raise PsdUnsupported(f"unsupported bit depth {header.depth}")
+    if header.color_mode == RGB:
+        colors = 3
+    elif header.color_mode == GRAYSCALE:
+        colors = 1
+    else:
+        raise PsdUnsupported(f"unsupported color mode {header.color_mode}")
+    if header.channels < colors:
+        raise PsdError("missing color channels")
+
+    _, pos = _section(data, _HEADER.size)  # color mode data
+    resources, pos = _section(data, pos)
+    if not _has_merged_data(resources):
+        raise PsdUnsupported(
+            "no flattened image saved (enable Maximize PSD Compatibility)"
+        )
+    layers, pos = _section(data, pos, 4 if header.version == 1 else 8)
+
+    has_alpha = header.channels > colors and _has_merged_alpha(layers, header)
+    planes = _read_planes(data, pos, header, colors + has_alpha)
+    n = header.width * header.height
+    rgba = bytearray(b"\xff" * (n * 4))
+    for c in range(3):
+        rgba[c::4] = planes[min(c, colors - 1)]
+    if has_alpha:
+        alpha = planes[colors]
+        rgba[3::4] = alpha
+        rgba = _unmatte(rgba, alpha)
+    return header, bytes(rgba)
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Upstream Texture Diff
+
+Compares the textures of two versions of a mod (or two mod folders) and lists
+the ones that changed, moved or were resized, with their dimensions. By
+default only textures overridden under pack/assets are reported, so the
+output is the list of overrides that need redrawing after a mod update.
+
+Textures are located through the ZIP central directories, so identical
+entries (same CRC-32 and size) are never read. The pixel and perceptual
+hashes of everything that does get decoded are cached by CRC, which means a
+texture version is decoded at most once across runs.
+
+Expected project structure:
+.
+├── pack/
+└── utils/
+    ├── texture_diff.py
+    ├── extract_assets_from_mod.py
+    ├── pngtools.py
+    └── ziptools.py
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from extract_assets_from_mod import ModAssetsExtractor
+from pngtools import PngError, decode_rgba, perceptual_hash, read_header
+
+CACHE_VERSION = 1
+DEFAULT_SCOPE = "textures/gui/*.png"
+# Hamming distance between perceptual hashes still treated as the same image.
+DEFAULT_MOVE_DISTANCE = 6
+# Cached hashes unused for this long are dropped when the cache is saved.
+CACHE_TTL_DAYS = 180
+
+Key = Tuple[str, str]  # (namespace, path inside assets/<namespace>/)
+
+
+def setup_logging() -> logging.Logger:
+    logger = logging.getLogger("TextureDiff")
+    logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+    return logger
+
+
+@dataclass(frozen=True)
+class TextureRef:
+    """Where one texture version lives, as listed by the central directory."""
+
+    jar: Path
+    archive: str  # inventory label, e.g. "mod.jar!/META-INF/jars/lib.jar"
+    namespace: str
+    path: str
+    crc: str
+    size: int
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.crc}:{self.size}"
+
+    @property
+    def member(self) -> str:
+        return f"assets/{self.namespace}/{self.path}"
+
+
+def texture_hashes(data: bytes) -> dict:
+    """Dimensions, pixel hash and perceptual hash of a PNG.
+
+    Layouts ``pngtools`` cannot decode fall back to hashing the file bytes
+    and have no perceptual hash.
+    """
+    header = read_header(data)
+    try:
+        header, rgba = decode_rgba(data)
+    except PngError:
+        return {
+            "width": header.width,
+            "height": header.height,
+            "pixels": hashlib.sha1(data).hexdigest(),
+            "phash": None,
+        }
+    return {
+        "width": header.width,
+        "height": header.height,
+        "pixels": hashlib.sha1(rgba).hexdigest(),
+        "phash": f"{perceptual_hash(header.width, header.height, rgba):016x}",
+    }
+
+
+def _safe_hashes(data: bytes) -> Optional[dict]:
+    try:
+        return texture_hashes(data)
+    except PngError:
+        return None
+
+
+class HashCache:
+    """JSON cache of ``texture_hashes`` results keyed by "crc:size"."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._today = int(time.time() // 86400)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self._entries = (
+                data["hashes"] if data.get("version") == CACHE_VERSION else {}
+            )
+        except (OSError, ValueError, KeyError, AttributeError):
+            self._entries = {}
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["used"] = self._today
+        return entry
+
+    def put(self, key: str, hashes: dict) -> None:
+        self._entries[key] = {**hashes, "used": self._today}
+
+    def save(self) -> None:
+        oldest = self._today - CACHE_TTL_DAYS
+        entries = {k: v for k, v in self._entries.items() if v["used"] >= oldest}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": CACHE_VERSION, "hashes": entries}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+
+def collect_textures(
+    source: Path, extractor: ModAssetsExtractor, scope: str, logger: logging.Logger
+) -> Dict[Key, TextureRef]:
+    """Map (namespace, path) to the texture found in a JAR or folder of JARs.
+
+    When several archives ship the same path, the first in sorted order wins.
+    """
+    if source.is_dir():
+        jars = [
+            (jar, jar.relative_to(source).as_posix())
+            for jar in extractor.scan_jars(source)
+        ]
+    else:
+        jars = [(source, source.name)]
+    textures: Dict[Key, TextureRef] = {}
+    seen: Set[str] = set()
+    for jar, label in jars:
+        for record in extractor.inventory_jar(jar, label, seen):
+            if "error" in record:
+                logger.warning(f"[WARNING] {record['mod']}: {record['error']}")
+                continue
+            for namespace, files in record["namespaces"].items():
+                for f in files:
+                    if not namespace or not fnmatchcase(f["path"], scope):
+                        continue
+                    textures.setdefault(
+                        (namespace, f["path"]),
+                        TextureRef(
+                            jar,
+                            record["mod"],
+                            namespace,
+                            f["path"],
+                            f["crc"],
+                            f["size"],
+                        ),
+                    )
+    return textures
+
+
+def read_textures(
+    refs: List[TextureRef], logger: logging.Logger
+) -> Iterator[Tuple[TextureRef, Optional[bytes]]]:
+    """Yield the file bytes of each texture, opening every archive once.
+
+    Members that cannot be read are yielded with None; so is every member of
+    an archive that cannot be opened, which is reported and skipped.
+    """
+    by_archive: Dict[Tuple[Path, str], List[TextureRef]] = {}
+    for ref in refs:
+        by_archive.setdefault((ref.jar, ref.archive), []).append(ref)
+    for (jar, archive), members in sorted(
+        by_archive.items(), key=lambda item: (str(item[0][0]), item[0][1])
+    ):
+        with ExitStack() as stack:
+            try:
+                zf = stack.enter_context(zipfile.ZipFile(jar))
+                # Nested archives are labelled "outer.jar!/inner.jar!/...".
+                for name in archive.split("!/")[1:]:
+                    inner = zipfile.ZipFile(io.BytesIO(zf.read(name)))
+                    zf = stack.enter_context(inner)
+            except (KeyError, zipfile.BadZipFile, NotImplementedError, OSError) as e:
+                logger.warning(f"[WARNING] Skipping {archive}: {e}")
+                zf = None
+            for ref in members:
+                data = None
+                if zf is not None:
+                    try:
+                        data = zf.read(ref.member)
+                    except (KeyError, zipfile.BadZipFile, NotImplementedError, OSError):
+                        pass
+                yield ref, data
+
+
+def resolve_hashes(
+    refs: List[TextureRef],
+    cache: HashCache,
+    jobs: int,
+    logger: logging.Logger,
+) -> Dict[str, dict]:
+    """Return hashes for ``refs`` by cache key, decoding only cache misses."""
+    result: Dict[str, dict] = {}
+    pending: Dict[str, TextureRef] = {}
+    for ref in refs:
+        if ref.cache_key in result or ref.cache_key in pending:
+            continue
+        hashes = cache.get(ref.cache_key)
+        if hashes is None:
+            pending[ref.cache_key] = ref
+        else:
+            result[ref.cache_key] = hashes
+
+    if not pending:
+        return result
+    logger.info(f"[INFO] Decoding {len(pending)} texture(s)...")
+    pairs = [
+        (ref, data)
+        for ref, data in read_textures(list(pending.values()), logger)
+        if data is not None
+    ]
+    if jobs > 1 and len(pairs) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            computed = list(
+                pool.map(_safe_hashes, [data for _, data in pairs], chunksize=4)
+            )
+    else:
+        computed = [_safe_hashes(data) for _, data in pairs]
+    decoded = zip((ref for ref, _ in pairs), computed)
+    for ref, hashes in decoded:
+        if hashes is None:
+            logger.warning(f"[WARNING] Not a valid PNG: {ref.archive}:{ref.member}")
+            continue
+        cache.put(ref.cache_key, hashes)
+        result[ref.cache_key] = hashes
+    return result
+
+
+def _distance(a: Optional[str], b: Optional[str]) -> Optional[int]:
+    if a is None or b is None:
+        return None
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def _dims(hashes: dict) -> str:
+    return f"{hashes['width']}x{hashes['height']}"
+
+
+def diff_textures(
+    old: Dict[Key, TextureRef],
+    new: Dict[Key, TextureRef],
+    interesting: Optional[Set[Key]],
+    cache: HashCache,
+    jobs: int,
+    move_distance: int,
+    logger: logging.Logger,
+) -> Dict[str, list]:
+    """Classify how the textures in ``interesting`` (None = all) changed."""
+    report: Dict[str, list] = {
+        "changed": [],
+        "resized": [],
+        "moved": [],
+        "removed": [],
+        "added": [],
+    }
+
+    def wanted(key: Key) -> bool:
+        return interesting is None or key in interesting
+
+    modified = [
+        key
+        for key in sorted(old.keys() & new.keys())
+        if wanted(key)
+        and (old[key].crc, old[key].size) != (new[key].crc, new[key].size)
+    ]
+    gone = [key for key in sorted(old.keys() - new.keys()) if wanted(key)]
+    fresh = sorted(new.keys() - old.keys())
+
+    # Anything with an identical CRC and size moved without changing and
+    # needs no decoding at all.
+    fresh_by_crc: Dict[str, List[Key]] = {}
+    for key in fresh:
+        fresh_by_crc.setdefault(new[key].cache_key, []).append(key)
+    moved: Dict[Key, Key] = {}
+    claimed: Set[Key] = set()
+    for key in gone:
+        for candidate in fresh_by_crc.get(old[key].cache_key, []):
+            if candidate not in claimed:
+                moved[key] = candidate
+                claimed.add(candidate)
+                break
+
+    unmatched = [key for key in gone if key not in moved]
+    to_hash = [old[k] for k in modified] + [new[k] for k in modified]
+    if unmatched:
+        to_hash += [old[k] for k in unmatched]
+        to_hash += [new[k] for k in fresh if k not in claimed]
+    hashes = resolve_hashes(to_hash, cache, jobs, logger)
+
+    for key in modified:
+        before = hashes.get(old[key].cache_key)
+        after = hashes.get(new[key].cache_key)
+        if before is None or after is None:
+            continue
+        item = {"namespace": key[0], "path": key[1], "mod": new[key].archive}
+        if (before["width"], before["height"]) != (after["width"], after["height"]):
+            report["resized"].append(
+                {**item, "old": _dims(before), "new": _dims(after)}
+            )
+        elif before["pixels"] != after["pixels"]:
+            report["changed"].append(
+                {
+                    **item,
+                    "size": _dims(after),
+                    "distance": _distance(before["phash"], after["phash"]),
+                }
+            )
+
+    # Fall back to pixel, then perceptual matches for the remaining moves.
+    candidates = [
+        (key, hashes[new[key].cache_key])
+        for key in fresh
+        if key not in claimed and new[key].cache_key in hashes
+    ]
+    for key in unmatched:
+        before = hashes.get(old[key].cache_key)
+        if before is None:
+            continue
+        best = None
+        for candidate, after in candidates:
+            if candidate in claimed:
+                continue
+            if after["pixels"] == before["pixels"]:
+                best = (0, candidate)
+                break
+            if (after["width"], after["height"]) != (before["width"], before["height"]):
+                continue
+            distance = _distance(before["phash"], after["phash"])
+            if distance is not None and distance <= move_distance:
+                if best is None or distance < best[0]:
+                    best = (distance, candidate)
+        if best is not None:
+            moved[key] = best[1]
+            claimed.add(best[1])
+
+    for key in gone:
+        if key in moved:
+            target = moved[key]
+            after = hashes.get(new[target].cache_key)
+            report["moved"].append(
+                {
+                    "namespace": key[0],
+                    "path": key[1],
+                    "new_namespace": target[0],
+                    "new_path": target[1],
+                    "mod": new[target].archive,
+                    "size": _dims(after) if after else None,
+                }
+            )
+        else:
+            report["removed"].append(
+                {"namespace": key[0], "path": key[1], "mod": old[key].archive}
+            )
+    if interesting is None:
+        report["added"] = [
+            {"namespace": key[0], "path": key[1], "mod": new[key].archive}
+            for key in fresh
+            if key not in claimed
+        ]
+    return report
+
+
+def print_report(report: Dict[str, list], logger: logging.Logger) -> None:
+    for item in report["changed"]:
+        distance = item["distance"]
+        detail = "" if distance is None else f", perceptual distance {distance}"
+        logger.info(
+            f"[CHANGED] {item['namespace']}:{item['path']} ({item['size']}{detail})"
+        )
+    for item in report["resized"]:
+        logger.info(
+            f"[RESIZED] {item['namespace']}:{item['path']} "
+            f"({item['old']} -> {item['new']})"
+        )
+    for item in report["moved"]:
+        size = f" ({item['size']})" if item["size"] else ""
+        logger.info(
+            f"[MOVED]   {item['namespace']}:{item['path']} -> "
+            f"{item['new_namespace']}:{item['new_path']}{size}"
+        )
+    for item in report["removed"]:
+        logger.info(f"[REMOVED] {item['namespace']}:{item['path']}")
+    for item in report["added"]:
+        logger.info(f"[ADDED]   {item['namespace']}:{item['path']}")
+
+
+def pack_overrides(assets_dir: Path) -> Set[Key]:
+    overrides = set()
+    for root, _, files in os.walk(assets_dir):
+        for name in files:
+            parts = (Path(root) / name).relative_to(assets_dir).as_posix().split("/", 1)
+            if len(parts) == 2:
+                overrides.add((parts[0], parts[1]))
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="List textures that changed between two versions of a mod."
+    )
+    parser.add_argument("old", help="Previous mod JAR, or a folder of JARs")
+    parser.add_argument("new", help="Updated mod JAR, or a folder of JARs")
+    parser.add_argument(
+        "--recursive",
+        "-r",
+        action="store_true",
+        help="Recursively scan subdirectories for JAR files",
+    )
+    parser.add_argument(
+        "--pack", default="pack", help="Resource pack directory (default: pack)"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Report every texture in scope, not only those the pack overrides",
+    )
+    parser.add_argument(
+        "--scope",
+        default=DEFAULT_SCOPE,
+        help="Glob (relative to assets/<namespace>/, '*' matches '/') selecting "
+        f"the textures to compare (default: {DEFAULT_SCOPE})",
+    )
+    parser.add_argument(
+        "--move-distance",
+        type=int,
+        default=DEFAULT_MOVE_DISTANCE,
+        help="Maximum perceptual hash distance for a renamed texture to count "
+        f"as moved (default: {DEFAULT_MOVE_DISTANCE})",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Decode textures on N worker processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--cache",
+        help="Hash cache file (default: .pack_cache/texture_hashes.json next to "
+        "the pack directory)",
+    )
+    parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    logger = setup_logging()
+    old_path = Path(args.old).expanduser().resolve()
+    new_path = Path(args.new).expanduser().resolve()
+    pack_dir = Path(args.pack).expanduser().resolve()
+    for path in (old_path, new_path):
+        if not path.exists():
+            logger.error(f"[ERROR] Not found: {path}")
+            sys.exit(1)
+
+    interesting = None
+    if not args.all:
+        if not (pack_dir / "assets").is_dir():
+            logger.error(f"[ERROR] Pack assets not found: {pack_dir / 'assets'}")
+            sys.exit(1)
+        interesting = pack_overrides(pack_dir / "assets")
+
+    cache_path = (
+        Path(args.cache).expanduser().resolve()
+        if args.cache
+        else pack_dir.parent / ".pack_cache" / "texture_hashes.json"
+    )
+    cache = HashCache(cache_path)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    extractor = ModAssetsExtractor(recursive=args.recursive)
+
+    try:
+        old = collect_textures(old_path, extractor, args.scope, logger)
+        new = collect_textures(new_path, extractor, args.scope, logger)
+    except FileNotFoundError as e:
+        logger.error(f"[ERROR] {e}")
+        sys.exit(1)
+    logger.info(f"[INFO] {len(old)} texture(s) before, {len(new)} after.")
+
+    report = diff_textures(
+        old, new, interesting, cache, jobs, args.move_distance, logger
+    )
+    cache.save()
+
+    print_report(report, logger)
+    counts = ", ".join(f"{len(items)} {kind}" for kind, items in report.items())
+    logger.info(f"[INFO] {counts}")
+    logger.info(f"[INFO] Hash cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=1), encoding="utf-8")
+        logger.info(f"[INFO] Report written to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
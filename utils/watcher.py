@@ -0,0 +1,175 @@
+"""
+Directory Watcher
+
+Tells the build tools when something under a directory tree changed. On
+Linux this uses inotify through ctypes, so an idle watch costs nothing;
+elsewhere (or when inotify is unavailable) it falls back to polling.
+
+The watcher only signals *that* something changed. Callers rescan the tree
+to find out *what* changed, which keeps both backends equally correct.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+# inotify(7) event masks.
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_IGNORED = 0x00008000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+
+# struct inotify_event without its name: wd, mask, cookie, len.
+_EVENT = struct.Struct("iIII")
+
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+class _Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._add_watch.restype = ctypes.c_int
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.fd = fd
+        self._watched = {}  # directory -> watch descriptor
+        self._paths = {}  # watch descriptor -> directory
+
+    def watch(self, directory: Path) -> None:
+        if directory in self._watched:
+            return
+        wd = self._add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed: {os.strerror(errno)}")
+        # A directory recreated under the same path is a new inode: the old
+        # watch is gone, so it must not keep the path marked as watched.
+        stale = self._paths.pop(wd, None)
+        if stale is not None and stale != directory:
+            self._watched.pop(stale, None)
+        self._watched[directory] = wd
+        self._paths[wd] = directory
+
+    def forget(self, directory: Path) -> None:
+        wd = self._watched.pop(directory, None)
+        if wd is not None:
+            self._paths.pop(wd, None)
+
+    def _dropped(self, wd: int) -> None:
+        """The kernel removed watch ``wd`` (its directory was deleted)."""
+        directory = self._paths.pop(wd, None)
+        if directory is not None and self._watched.get(directory) == wd:
+            del self._watched[directory]
+
+    def _handle(self, data: bytes) -> None:
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, name_len = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size + name_len
+            if mask & _IN_IGNORED:
+                self._dropped(wd)
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            self._handle(data)
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """Block until files under ``root`` may have changed.
+
+    ``backend`` is "inotify" or "polling". Pass ``polling=True`` to force the
+    fallback, e.g. for network filesystems where inotify sees no events.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        polling: bool = False,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        self.root = Path(root)
+        self.poll_interval = poll_interval
+        self._inotify = None
+        if not polling and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                self._inotify = None
+        self.backend = "inotify" if self._inotify else "polling"
+        self.update_dirs(Path(dirpath) for dirpath, _, _ in os.walk(self.root))
+
+    def update_dirs(self, directories: Iterable[Path]) -> None:
+        """Watch ``directories`` (new subdirectories appear after rescans)."""
+        if self._inotify is None:
+            return
+        for directory in directories:
+            try:
+                self._inotify.watch(Path(directory))
+            except OSError:
+                # Vanished between the scan and now; the next rescan sees it.
+                self._inotify.forget(Path(directory))
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Return True once something may have changed, False on timeout."""
+        if self._inotify is not None:
+            return self._inotify.wait(timeout)
+        time.sleep(self.poll_interval if timeout is None else timeout)
+        return True
+
+    def settle(self, quiet: float) -> None:
+        """Wait until no change has been seen for ``quiet`` seconds."""
+        if self._inotify is None:
+            time.sleep(quiet)
+            return
+        while self._inotify.wait(quiet):
+            pass
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,706 @@
+"""
+ZIP Helpers
+
+Low-level ZIP writing shared by the packing and extraction tools.
+
+``zipfile`` can only write entries by compressing them itself, which means the
+same bytes get deflated again for every archive they end up in. The helpers in
+this module compress an entry once into a ``CompressedEntry`` and let any number
+of ``ZipStreamWriter`` instances write those raw bytes unchanged.
+
+For reading, ``iter_central_directory`` and ``EntryReader`` walk an archive's
+directory and inflate its members one bounded chunk at a time, so memory does
+not depend on the size or entry count of the archive.
+"""
+
+import os
+import struct
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+# Deflate level used by ``zipfile`` when none is given.
+DEFAULT_LEVEL = 6
+
+_LOCAL_HEADER = struct.Struct("<4s2H3H3I2H")
+_CENTRAL_HEADER = struct.Struct("<4s6H3I5H2I")
+_END_RECORD = struct.Struct("<4s4H2IH")
+_ZIP64_LOCATOR = struct.Struct("<4sIQI")
+_ZIP64_END_RECORD = struct.Struct("<4sQ2H2I4Q")
+_MAX_COMMENT = 0xFFFF
+
+_UTF8_FLAG = 0x800
+_VERSION_NEEDED = 20
+_VERSION_MADE_BY = (3 << 8) | _VERSION_NEEDED  # Unix, ZIP 2.0
+_ZIP32_LIMIT = 0xFFFFFFFF
+_MAX_ENTRIES = 0xFFFF
+# Values above this get ZIP64 fields; like zipfile, stay clear of readers
+# that treat the 32-bit fields as signed.
+_ZIP64_THRESHOLD = (1 << 31) - 1
+_ZIP64_VERSION = 45
+_ZIP64_EXTRA = 0x0001
+# Bytes copied at a time when streaming entry data.
+_COPY_CHUNK = 1 << 20
+
+
+@dataclass(frozen=True)
+class CompressedEntry:
+    """An entry's payload as it appears inside an archive."""
+
+    crc: int
+    file_size: int
+    compress_type: int
+    payload: bytes
+
+    @property
+    def compress_size(self) -> int:
+        return len(self.payload)
+
+
+def compress_data(
+    data: bytes, compress_type: int = zipfile.ZIP_DEFLATED, level: int = DEFAULT_LEVEL
+) -> CompressedEntry:
+    """Compress ``data`` the way ``zipfile`` would store it."""
+    crc = zlib.crc32(data)
+    if compress_type == zipfile.ZIP_STORED:
+        return CompressedEntry(crc, len(data), compress_type, bytes(data))
+    if compress_type != zipfile.ZIP_DEFLATED:
+        raise NotImplementedError(f"Unsupported compression type: {compress_type}")
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    payload = compressor.compress(data) + compressor.flush()
+    return CompressedEntry(crc, len(data), compress_type, payload)
+
+
+def dos_date_time(timestamp: float) -> Tuple[int, int, int, int, int, int]:
+    """Convert a POSIX timestamp to a ZIP-compatible local date tuple."""
+    date_time = time.localtime(timestamp)[:6]
+    if date_time[0] < 1980:
+        return (1980, 1, 1, 0, 0, 0)
+    return date_time
+
+
+class CentralEntry(NamedTuple):
+    """One central directory record, as read by ``iter_central_directory``."""
+
+    name: str
+    flags: int
+    compress_type: int
+    crc: int
+    compress_size: int
+    file_size: int
+    header_offset: int
+    dos_time: int = 0
+    dos_date: int = 0
+    external_attr: int = 0
+
+    @property
+    def date_time(self) -> Tuple[int, int, int, int, int, int]:
+        """The modification time as ``zipfile.ZipInfo.date_time`` has it."""
+        return (
+            (self.dos_date >> 9) + 1980,
+            (self.dos_date >> 5) & 0xF,
+            self.dos_date & 0x1F,
+            self.dos_time >> 11,
+            (self.dos_time >> 5) & 0x3F,
+            (self.dos_time & 0x1F) * 2,
+        )
+
+
+# Central directory bytes read at once from archives on disk.
+_CD_BLOCK = 1 << 16
+
+
+class _BlockReader:
+    """Sequential reads from ``fp`` in blocks, safe to interleave with seeks.
+
+    Every refill seeks first, so callers may read member data from the same
+    file object between records.
+    """
+
+    def __init__(self, fp: BinaryIO, pos: int):
+        self._fp = fp
+        self._pos = pos
+        self._buf = b""
+
+    def read(self, size: int) -> bytes:
+        while len(self._buf) < size:
+            self._fp.seek(self._pos)
+            block = self._fp.read(max(_CD_BLOCK, size - len(self._buf)))
+            if not block:
+                raise zipfile.BadZipFile("Truncated central directory")
+            self._pos += len(block)
+            self._buf += block
+        data, self._buf = self._buf[:size], self._buf[size:]
+        return data
+
+
+def _zip64_end(read_at, end: int) -> Tuple[int, int, int]:
+    locator = end - _ZIP64_LOCATOR.size
+    if locator < 0:
+        raise zipfile.BadZipFile("Missing ZIP64 end of central directory locator")
+    sig, _, offset, _ = _ZIP64_LOCATOR.unpack(read_at(locator, _ZIP64_LOCATOR.size))
+    if sig != b"PK\x06\x07":
+        raise zipfile.BadZipFile("Missing ZIP64 end of central directory locator")
+    record = read_at(offset, _ZIP64_END_RECORD.size)
+    if len(record) != _ZIP64_END_RECORD.size:
+        raise zipfile.BadZipFile("Bad ZIP64 end of central directory record")
+    record = _ZIP64_END_RECORD.unpack(record)
+    if record[0] != b"PK\x06\x06":
+        raise zipfile.BadZipFile("Bad ZIP64 end of central directory record")
+    return record[7], record[8], record[9]
+
+
+def _zip64_extra(extra: bytes, values: List[int]) -> List[int]:
+    """Replace saturated sizes/offsets with their ZIP64 extra field values."""
+    pos = 0
+    while pos + 4 <= len(extra):
+        tag, size = struct.unpack_from("<2H", extra, pos)
+        if tag == 0x0001:
+            field = pos + 4
+            for i, value in enumerate(values):
+                if value == _ZIP32_LIMIT and field + 8 <= pos + 4 + size:
+                    values[i] = struct.unpack_from("<Q", extra, field)[0]
+                    field += 8
+            break
+        pos += 4 + size
+    return values
+
+
+def iter_central_directory(buf) -> Iterator[CentralEntry]:
+    """Yield the central directory records of the ZIP archive in ``buf``.
+
+    ``buf`` is any bytes-like object, usually an ``mmap``, or a seekable
+    binary file. Only the end record and the central directory are read,
+    one record at a time, so listing an archive costs the same however large
+    its members are, and memory stays flat however many entries it has.
+    """
+    try:
+        view = memoryview(buf)
+    except TypeError:
+        view = None  # a file object
+    if view is None:
+        size = buf.seek(0, os.SEEK_END)
+
+        def read_at(offset: int, length: int) -> bytes:
+            buf.seek(offset)
+            return buf.read(length)
+
+    else:
+        size = view.nbytes
+
+        def read_at(offset: int, length: int) -> bytes:
+            return bytes(view[offset : offset + length])
+
+    tail_start = max(0, size - _END_RECORD.size - _MAX_COMMENT)
+    end = read_at(tail_start, size - tail_start).rfind(b"PK\x05\x06")
+    if end < 0:
+        raise zipfile.BadZipFile("File is not a zip file")
+    end += tail_start
+    _, _, _, _, count, cd_size, cd_offset, _ = _END_RECORD.unpack(
+        read_at(end, _END_RECORD.size).ljust(_END_RECORD.size, b"\0")
+    )
+    cd_end = end
+    if count == _MAX_ENTRIES or _ZIP32_LIMIT in (cd_size, cd_offset):
+        count, cd_size, cd_offset = _zip64_end(read_at, end)
+        cd_end = end - _ZIP64_LOCATOR.size - _ZIP64_END_RECORD.size
+    # Bytes prepended to the archive (e.g. a launcher stub) shift every offset.
+    concat = cd_end - cd_size - cd_offset
+    if concat < 0:
+        raise zipfile.BadZipFile("Bad central directory offset")
+
+    if view is None:
+        read = _BlockReader(buf, cd_offset + concat).read
+    else:
+        pos = cd_offset + concat
+
+        def read(length: int) -> bytes:
+            nonlocal pos
+            data = bytes(view[pos : pos + length])
+            if len(data) != length:
+                raise zipfile.BadZipFile("Truncated central directory")
+            pos += length
+            return data
+
+    for _ in range(count):
+        record = _CENTRAL_HEADER.unpack(read(_CENTRAL_HEADER.size))
+        if record[0] != b"PK\x01\x02":
+            raise zipfile.BadZipFile("Bad magic number for central directory")
+        flags, compress_type = record[3], record[4]
+        dos_time, dos_date = record[5], record[6]
+        crc, compress_size, file_size = record[7], record[8], record[9]
+        name_len, extra_len, comment_len = record[10], record[11], record[12]
+        external_attr, offset = record[15], record[16]
+        variable = read(name_len + extra_len + comment_len)
+        raw_name = variable[:name_len]
+        try:
+            name = raw_name.decode("utf-8")
+        except UnicodeDecodeError:
+            name = raw_name.decode("cp437")
+        if _ZIP32_LIMIT in (file_size, compress_size, offset):
+            file_size, compress_size, offset = _zip64_extra(
+                variable[name_len : name_len + extra_len],
+                [file_size, compress_size, offset],
+            )
+        yield CentralEntry(
+            name,
+            flags,
+            compress_type,
+            crc,
+            compress_size,
+            file_size,
+            offset + concat,
+            dos_time,
+            dos_date,
+            external_attr,
+        )
+
+
+def entry_data(buf, entry: CentralEntry) -> memoryview:
+    """Return a zero-copy view of ``entry``'s compressed bytes in ``buf``."""
+    header = _LOCAL_HEADER.unpack_from(buf, entry.header_offset)
+    if header[0] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {entry.name}")
+    start = entry.header_offset + _LOCAL_HEADER.size + header[9] + header[10]
+    if start + entry.compress_size > len(buf):
+        raise zipfile.BadZipFile(f"Truncated data for {entry.name}")
+    return memoryview(buf)[start : start + entry.compress_size]
+
+
+def read_entry(buf, entry: CentralEntry):
+    """Return ``entry``'s uncompressed bytes from ``buf``.
+
+    Stored entries come back as a zero-copy view into ``buf``.
+    """
+    if entry.flags & 0x1:
+        raise NotImplementedError(f"Encrypted entry: {entry.name}")
+    view = entry_data(buf, entry)
+    if entry.compress_type == zipfile.ZIP_STORED:
+        return view
+    if entry.compress_type != zipfile.ZIP_DEFLATED:
+        raise NotImplementedError(
+            f"Unsupported compression type: {entry.compress_type}"
+        )
+    with view:
+        try:
+            data = zlib.decompress(view, -15)
+        except zlib.error as e:
+            raise zipfile.BadZipFile(f"Bad data for {entry.name}: {e}") from None
+    if zlib.crc32(data) != entry.crc:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for {entry.name}")
+    return data
+
+
+def entry_start(fp: BinaryIO, entry: CentralEntry) -> int:
+    """Return where ``entry``'s compressed bytes start in the archive ``fp``."""
+    fp.seek(entry.header_offset)
+    header = fp.read(_LOCAL_HEADER.size)
+    if len(header) != _LOCAL_HEADER.size or header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {entry.name}")
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    return entry.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+
+
+def iter_raw_chunks(
+    fp: BinaryIO, entry: CentralEntry, chunk_size: int = _COPY_CHUNK
+) -> Iterator[bytes]:
+    """Yield ``entry``'s compressed bytes from ``fp`` in bounded chunks.
+
+    Every chunk seeks first, so other reads may use ``fp`` in between.
+    """
+    pos = entry_start(fp, entry)
+    remaining = entry.compress_size
+    while remaining:
+        fp.seek(pos)
+        chunk = fp.read(min(chunk_size, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data for {entry.name}")
+        pos += len(chunk)
+        remaining -= len(chunk)
+        yield chunk
+
+
+class EntryReader:
+    """File-like reader inflating one stored or deflated entry on demand.
+
+    Memory use is bounded by the read size, not by the entry, and the CRC
+    is checked once the last byte has been read.
+    """
+
+    def __init__(self, fp: BinaryIO, entry: CentralEntry):
+        if entry.flags & 0x1:
+            raise NotImplementedError(f"Encrypted entry: {entry.name}")
+        if entry.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            raise NotImplementedError(
+                f"Unsupported compression type: {entry.compress_type}"
+            )
+        self.entry = entry
+        self._chunks = iter_raw_chunks(fp, entry)
+        self._inflater = (
+            zlib.decompressobj(-15)
+            if entry.compress_type == zipfile.ZIP_DEFLATED
+            else None
+        )
+        self._pending = b""
+        self._crc = 0
+        self._size = 0
+        self._eof = False
+
+    def _inflate(self, size: int) -> bytes:
+        """Up to ``size`` uncompressed bytes; b"" once the data runs out."""
+        if self._inflater is None:
+            if not self._pending:
+                self._pending = next(self._chunks, b"")
+            data, self._pending = self._pending[:size], self._pending[size:]
+            return data
+        while not self._inflater.eof:
+            source = self._inflater.unconsumed_tail or next(self._chunks, b"")
+            if not source:
+                break
+            try:
+                data = self._inflater.decompress(source, size)
+            except zlib.error as e:
+                raise zipfile.BadZipFile(
+                    f"Bad data for {self.entry.name}: {e}"
+                ) from None
+            if data:
+                return data
+        return b""
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(_COPY_CHUNK), b""))
+        if self._eof or size == 0:
+            return b""
+        data = self._inflate(size)
+        self._size += len(data)
+        self._crc = zlib.crc32(data, self._crc)
+        if self._size > self.entry.file_size:
+            raise zipfile.BadZipFile(f"Bad size for {self.entry.name}")
+        if not data:
+            self._eof = True
+            if self._size != self.entry.file_size:
+                raise zipfile.BadZipFile(f"Truncated data for {self.entry.name}")
+            if self._crc != self.entry.crc:
+                raise zipfile.BadZipFile(f"Bad CRC-32 for {self.entry.name}")
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self._chunks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+@dataclass
+class _CentralRecord:
+    name: bytes
+    flags: int
+    compress_type: int
+    crc: int
+    compress_size: int
+    file_size: int
+    dos_time: int
+    dos_date: int
+    external_attr: int
+    offset: int
+
+
+def _encode_name(arcname: str) -> Tuple[bytes, int]:
+    try:
+        return arcname.encode("ascii"), 0
+    except UnicodeEncodeError:
+        return arcname.encode("utf-8"), _UTF8_FLAG
+
+
+def _dos_fields(date_time: Tuple[int, int, int, int, int, int]) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = date_time
+    dos_time = (hour << 11) | (minute << 5) | (second // 2)
+    dos_date = ((year - 1980) << 9) | (month << 5) | day
+    return dos_time, dos_date
+
+
+def _zip64_sizes(file_size: int, compress_size: int) -> bool:
+    """Whether an entry's sizes need a ZIP64 extra field."""
+    return max(file_size, compress_size) > _ZIP64_THRESHOLD
+
+
+def _local_size(name: bytes, file_size: int, compress_size: int) -> int:
+    """Bytes taken by an entry written by ZipStreamWriter, header included."""
+    extra = 20 if _zip64_sizes(file_size, compress_size) else 0
+    return _LOCAL_HEADER.size + len(name) + extra + compress_size
+
+
+class ZipStreamWriter:
+    """Write pre-compressed entries sequentially into a new archive.
+
+    With ``append=True`` an existing archive is extended instead: new and
+    replaced entries go after its current end and a fresh central directory
+    is written on close. Superseded bytes stay in the file as dead space
+    (see ``dead_bytes``) until the archive is rebuilt.
+
+    ZIP64 fields are added where an entry, an offset or the entry count
+    outgrows the classic format, so archives have no size limit.
+    """
+
+    def __init__(self, path: Path, append: bool = False):
+        self.path = Path(path)
+        self._records: Dict[str, _CentralRecord] = {}
+        self._live_bytes = 0
+        self._append_start = None
+        if append:
+            self._load_records()
+            self._fp = open(self.path, "r+b")
+            self._append_start = self._fp.seek(0, os.SEEK_END)
+        else:
+            self._fp = open(self.path, "wb")
+
+    def _load_records(self) -> None:
+        with zipfile.ZipFile(self.path) as zf:
+            for info in zf.infolist():
+                name, _ = _encode_name(info.filename)
+                dos_time, dos_date = _dos_fields(info.date_time)
+                self._records[info.filename] = _CentralRecord(
+                    name,
+                    info.flag_bits,
+                    info.compress_type,
+                    info.CRC,
+                    info.compress_size,
+                    info.file_size,
+                    dos_time,
+                    dos_date,
+                    info.external_attr,
+                    info.header_offset,
+                )
+                self._live_bytes += _local_size(
+                    name, info.file_size, info.compress_size
+                )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, arcname: str) -> bool:
+        return arcname in self._records
+
+    @property
+    def dead_bytes(self) -> int:
+        """Bytes written so far that no current entry refers to."""
+        return self._fp.tell() - self._live_bytes
+
+    def remove(self, arcname: str) -> bool:
+        """Drop ``arcname`` from the central directory; False if absent."""
+        rec = self._records.pop(arcname, None)
+        if rec is None:
+            return False
+        self._live_bytes -= _local_size(rec.name, rec.file_size, rec.compress_size)
+        return True
+
+    def write_entry(
+        self,
+        arcname: str,
+        entry: CompressedEntry,
+        date_time: Tuple[int, int, int, int, int, int] = (1980, 1, 1, 0, 0, 0),
+        mode: int = 0o644,
+        replace: bool = False,
+    ) -> None:
+        """Append ``entry`` under ``arcname`` (a POSIX relative path).
+
+        An existing entry of the same name is an error unless ``replace``.
+        """
+        self.write_raw(
+            arcname,
+            (entry.payload,),
+            entry.crc,
+            entry.file_size,
+            entry.compress_type,
+            entry.compress_size,
+            date_time,
+            mode,
+            replace,
+        )
+
+    def write_raw(
+        self,
+        arcname: str,
+        chunks: Iterable[bytes],
+        crc: int,
+        file_size: int,
+        compress_type: int,
+        compress_size: int,
+        date_time: Tuple[int, int, int, int, int, int] = (1980, 1, 1, 0, 0, 0),
+        mode: int = 0o644,
+        replace: bool = False,
+    ) -> None:
+        """Append an entry whose compressed bytes arrive as ``chunks``.
+
+        Used to copy members between archives without holding them in
+        memory (see ``iter_raw_chunks``). If ``chunks`` fails or does not
+        add up to ``compress_size``, the partial entry is cut off again.
+        """
+        if arcname in self._records:
+            if not replace:
+                raise ValueError(f"Duplicate archive name: {arcname}")
+        offset = self._fp.tell()
+        name, flags = _encode_name(arcname)
+        dos_time, dos_date = _dos_fields(date_time)
+
+        if _zip64_sizes(file_size, compress_size):
+            extra = struct.pack("<2H2Q", _ZIP64_EXTRA, 16, file_size, compress_size)
+            version, sizes = _ZIP64_VERSION, (_ZIP32_LIMIT, _ZIP32_LIMIT)
+        else:
+            extra, version, sizes = b"", _VERSION_NEEDED, (compress_size, file_size)
+        self._fp.write(
+            _LOCAL_HEADER.pack(
+                b"PK\x03\x04",
+                version,
+                flags,
+                compress_type,
+                dos_time,
+                dos_date,
+                crc,
+                *sizes,
+                len(name),
+                len(extra),
+            )
+        )
+        self._fp.write(name)
+        self._fp.write(extra)
+        written = 0
+        try:
+            for chunk in chunks:
+                self._fp.write(chunk)
+                written += len(chunk)
+            if written != compress_size:
+                raise zipfile.BadZipFile(f"Wrong compressed size for {arcname}")
+        except BaseException:
+            self._fp.seek(offset)
+            self._fp.truncate()
+            raise
+
+        self.remove(arcname)
+        self._live_bytes += _local_size(name, file_size, compress_size)
+        self._records[arcname] = _CentralRecord(
+            name,
+            flags,
+            compress_type,
+            crc,
+            compress_size,
+            file_size,
+            dos_time,
+            dos_date,
+            (0o100000 | mode) << 16,
+            offset,
+        )
+
+    def close(self) -> None:
+        if self._fp is None:
+            return
+        cd_offset = self._fp.tell()
+        for rec in self._records.values():
+            # Values too large for their field move to the ZIP64 extra field,
+            # in this order, and the field itself is saturated.
+            values = [rec.file_size, rec.compress_size, rec.offset]
+            large = [value for value in values if value > _ZIP64_THRESHOLD]
+            extra = b""
+            if large:
+                values = [
+                    _ZIP32_LIMIT if value > _ZIP64_THRESHOLD else value
+                    for value in values
+                ]
+                extra = struct.pack(
+                    f"<2H{len(large)}Q", _ZIP64_EXTRA, 8 * len(large), *large
+                )
+            self._fp.write(
+                _CENTRAL_HEADER.pack(
+                    b"PK\x01\x02",
+                    _VERSION_MADE_BY,
+                    _ZIP64_VERSION if extra else _VERSION_NEEDED,
+                    rec.flags,
+                    rec.compress_type,
+                    rec.dos_time,
+                    rec.dos_date,
+                    rec.crc,
+                    values[1],
+                    values[0],
+                    len(rec.name),
+                    len(extra),
+                    0,
+                    0,
+                    0,
+                    rec.external_attr,
+                    values[2],
+                )
+            )
+            self._fp.write(rec.name)
+            self._fp.write(extra)
+        cd_size = self._fp.tell() - cd_offset
+        count = len(self._records)
+        if (
+            count >= _MAX_ENTRIES
+            or cd_size > _ZIP64_THRESHOLD
+            or cd_offset > _ZIP64_THRESHOLD
+        ):
+            zip64_offset = self._fp.tell()
+            self._fp.write(
+                _ZIP64_END_RECORD.pack(
+                    b"PK\x06\x06",
+                    _ZIP64_END_RECORD.size - 12,
+                    _VERSION_MADE_BY & 0xFF00 | _ZIP64_VERSION,
+                    _ZIP64_VERSION,
+                    0,
+                    0,
+                    count,
+                    count,
+                    cd_size,
+                    cd_offset,
+                )
+            )
+            self._fp.write(_ZIP64_LOCATOR.pack(b"PK\x06\x07", 0, zip64_offset, 1))
+            # Saturated, so readers look for the ZIP64 record.
+            count, cd_size, cd_offset = _MAX_ENTRIES, _ZIP32_LIMIT, _ZIP32_LIMIT
+        self._fp.write(
+            _END_RECORD.pack(
+                b"PK\x05\x06",
+                0,
+                0,
+                count,
+                count,
+                cd_size,
+                cd_offset,
+                0,
+            )
+        )
+        self._fp.close()
+        self._fp = None
+
+    def abort(self) -> None:
+        """Close without a central directory and delete the partial file.
+
+        In append mode the archive is cut back to its previous, intact state.
+        Does nothing once the archive was closed or aborted.
+        """
+        if self._fp is None:
+            return
+        if self._append_start is not None:
+            self._fp.truncate(self._append_start)
+        self._fp.close()
+        self._fp = None
+        if self._append_start is None:
+            self.path.unlink(missing_ok=True)